@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Excel export benchmark - wall time and peak RSS of the comparison sheet,
+in-memory styled workbook (previous implementation) vs streamed write-only
+Usage:
+  python benchmarks/bench_excel.py                      # 100/1k/10k materials
+  python benchmarks/bench_excel.py --sizes 100,2000
+Each measurement runs in a fresh interpreter so peak RSS is not shared.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from corpus import synthetic_corpus
+
+import mcp_materials
+
+
+def legacy_create_comparison_excel(materials_data, output_path, columns):
+    """The previous implementation: full Workbook, styles set cell by cell"""
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Materials Comparison"
+
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=12)
+    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    property_fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
+    property_font = Font(bold=True, size=11)
+    property_alignment = Alignment(horizontal="left", vertical="center")
+    data_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    side = Side(style='thin', color='000000')
+    border = Border(left=side, right=side, top=side, bottom=side)
+
+    ws.cell(1, 1, "Property").fill = header_fill
+    ws.cell(1, 1).font = header_font
+    ws.cell(1, 1).alignment = header_alignment
+    ws.cell(1, 1).border = border
+    for col_idx, mat in enumerate(materials_data, start=2):
+        cell = ws.cell(1, col_idx, f"{mat.get('Formula', 'N/A')} ({mat.get('Material_ID', 'N/A')})")
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = header_alignment
+        cell.border = border
+
+    for row_idx, prop in enumerate(columns, start=2):
+        cell = ws.cell(row_idx, 1, prop)
+        cell.fill = property_fill
+        cell.font = property_font
+        cell.alignment = property_alignment
+        cell.border = border
+        for col_idx, mat in enumerate(materials_data, start=2):
+            cell = ws.cell(row_idx, col_idx, mcp_materials._format_excel_value(mat.get(prop)))
+            cell.alignment = data_alignment
+            cell.border = border
+
+    ws.column_dimensions['A'].width = 30
+    for col_idx in range(2, len(materials_data) + 2):
+        ws.column_dimensions[get_column_letter(col_idx)].width = 25
+    ws.row_dimensions[1].height = 30
+    for row_idx in range(2, len(columns) + 2):
+        ws.row_dimensions[row_idx].height = 25
+    ws.freeze_panes = 'B2'
+    wb.save(output_path)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def run_case(implementation: str, size: int, base: int) -> dict:
+    """Export `size` materials once and report time and memory"""
+    documents = [mcp_materials.serialize_object(doc) for doc in synthetic_corpus(base, as_documents=False)]
+    columns = mcp_materials.EXCEL_COMPARISON_COLUMNS
+    table = mcp_materials.process_material_docs(
+        [documents[i % base] for i in range(size)], columns
+    )
+    data = table.to_records() if implementation == "legacy" else table
+    rss_before = peak_rss_mb()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "export.xlsx")
+        start = time.perf_counter()
+        if implementation == "legacy":
+            legacy_create_comparison_excel(data, path, columns)
+        else:
+            mcp_materials._create_comparison_excel(data, path, columns)
+        elapsed = time.perf_counter() - start
+        file_size = os.path.getsize(path)
+
+    return {
+        "implementation": implementation,
+        "materials": size,
+        "seconds": round(elapsed, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "export_rss_growth_mb": round(peak_rss_mb() - rss_before, 1),
+        "file_kb": round(file_size / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Excel comparison export")
+    parser.add_argument("--sizes", default="100,1000,10000", help="Comma-separated material counts")
+    parser.add_argument("--base", type=int, default=200, help="Distinct synthetic documents (default: 200)")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        implementation, size = args.case.split(":")
+        print(json.dumps(run_case(implementation, int(size), args.base)))
+        return
+
+    results = []
+    for size in args.sizes.split(","):
+        for implementation in ("legacy", "streaming"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--case", f"{implementation}:{size}", "--base", str(args.base)],
+                check=True, capture_output=True, text=True,
+            )
+            results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
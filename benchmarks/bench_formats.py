@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Response format benchmark - encoded size and encode time of tool responses
+Usage:
+  python benchmarks/bench_formats.py                       # synthetic corpus
+  python benchmarks/bench_formats.py --corpus corpus.pkl   # recorded corpus (see bench_serialize.py)
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+
+from corpus import load_corpus, synthetic_corpus
+
+import mcp_materials
+
+
+def representative_responses(docs, num_results: int) -> dict:
+    """Responses shaped like the search and comparison tools produce them"""
+    responses = {}
+    for level in mcp_materials.DETAIL_LEVELS:
+        columns = mcp_materials.columns_for_detail_level(level)
+        rows = [mcp_materials.process_material_doc(doc, columns) for doc in docs[:num_results]]
+        responses[f"search ({level}, {len(rows)} rows)"] = {
+            "status": "success",
+            "count": len(rows),
+            "data": rows,
+            "next_cursor": None,
+            "timestamp": datetime.now().isoformat(),
+        }
+    comparison = [mcp_materials.process_material_doc(doc, mcp_materials.COMPARISON_COLUMNS) for doc in docs[:10]]
+    responses[f"compare ({len(comparison)} materials)"] = {
+        "status": "success",
+        "num_materials": len(comparison),
+        "comparison": comparison,
+        "timestamp": datetime.now().isoformat(),
+    }
+    return responses
+
+
+def measure(response: dict, fmt: str, repeat: int) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encoded = mcp_materials.encode_response(response, fmt)
+        best = min(best, time.perf_counter() - start)
+    return {"bytes": len(encoded.encode()), "encode_ms": round(best * 1000, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tool response encodings")
+    parser.add_argument("--corpus", help="Pickled corpus recorded with bench_serialize.py --record")
+    parser.add_argument("--num-results", type=int, default=50, help="Rows per search response (default: 50)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions (default: 5)")
+    args = parser.parse_args()
+
+    docs = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.num_results)
+
+    report = {"orjson": mcp_materials.orjson is not None,
+              "max_bytes": mcp_materials.RESPONSE_MAX_BYTES, "responses": {}}
+    for name, response in representative_responses(docs, args.num_results).items():
+        results = {fmt: measure(response, fmt, args.repeat) for fmt in mcp_materials.RESPONSE_FORMATS}
+        baseline = results["json"]["bytes"]
+        for entry in results.values():
+            entry["size_vs_json"] = round(entry["bytes"] / baseline, 3)
+        report["responses"][name] = results
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Hull distance benchmark - pymatgen's per-entry get_decomp_and_e_above_hull
+loop vs the batched facet evaluation behind get_hull_distances
+Usage:
+  python benchmarks/bench_hull.py                              # Li-Fe-P-O, 500 candidates
+  python benchmarks/bench_hull.py --chemsys Li-Mn-Ni-Co-O --entries 800 --candidates 100,1000
+"""
+
+import argparse
+import json
+import random
+import time
+
+from corpus import synthetic_entries
+
+import mcp_materials
+
+
+def random_candidates(elements: list, count: int, seed: int) -> list:
+    """(composition, energy_per_atom) pairs scattered around the hull"""
+    from pymatgen.core import Composition
+
+    rng = random.Random(seed)
+    candidates = []
+    for _ in range(count):
+        present = rng.sample(elements, rng.randint(1, len(elements)))
+        composition = Composition({el: rng.randint(1, 8) for el in present})
+        candidates.append((composition, -3.0 - 3.0 * rng.random()))
+    return candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched hull distance evaluation")
+    parser.add_argument("--chemsys", default="Li-Fe-P-O", help="Chemical system (default: Li-Fe-P-O)")
+    parser.add_argument("--entries", type=int, default=400, help="Synthetic entries in the system (default: 400)")
+    parser.add_argument("--candidates", default="500,5000", help="Comma-separated candidate batch sizes")
+    args = parser.parse_args()
+
+    from pymatgen.entries.computed_entries import ComputedEntry
+
+    elements = args.chemsys.split("-")
+    record = mcp_materials._PhaseDiagramRecord(synthetic_entries(elements, args.entries), 0.0, None)
+    record.hull()
+    diagram = record.diagram
+
+    results = []
+    for count in (int(c) for c in args.candidates.split(",")):
+        candidates = random_candidates(elements, count, seed=count)
+
+        start = time.perf_counter()
+        expected = [
+            diagram.get_decomp_and_e_above_hull(
+                ComputedEntry(composition, energy * composition.num_atoms), allow_negative=True
+            )
+            for composition, energy in candidates
+        ]
+        per_entry = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _, above_hull, decompositions = record.evaluate(
+            [composition for composition, _ in candidates], [energy for _, energy in candidates]
+        )
+        batched = time.perf_counter() - start
+
+        for (decomposition, e_above_hull), actual, products in zip(expected, above_hull, decompositions):
+            reference = {entry.composition.reduced_formula: amount for entry, amount in decomposition.items()}
+            if abs(e_above_hull - actual) > 1e-6 or set(reference) != set(products) or any(
+                abs(reference[f] - products[f]) > 1e-6 for f in reference
+            ):
+                raise SystemExit(f"Batched result differs from pymatgen ({count} candidates)")
+
+        results.append({
+            "chemsys": args.chemsys,
+            "hull_entries": len(record.entries),
+            "facets": len(diagram.facets),
+            "candidates": count,
+            "per_entry_seconds": round(per_entry, 4),
+            "batched_seconds": round(batched, 4),
+            "speedup": round(per_entry / batched, 2),
+        })
+
+    print(json.dumps({"hull_seconds": round(record.hull_seconds, 4), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Local index benchmark - search_materials_by_property answered from the
+synced local index vs upstream, on the replay backend with a fixed latency
+Usage:
+  python benchmarks/bench_index.py                          # 5000 synthetic materials, 50 ms upstream
+  python benchmarks/bench_index.py --synthetic 20000 --latency-ms 100 --detail-levels summary,standard
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+QUERIES = [
+    {"property_name": "band_gap", "min_value": 1.0, "max_value": 3.0},
+    {"property_name": "energy_above_hull", "max_value": 0.05},
+    {"property_name": "density", "min_value": 2.0, "max_value": 4.0, "elements": "O"},
+    {"property_name": "bulk_modulus", "min_value": 100, "max_value": 200},
+    {"filters": "band_gap=1..3,energy_above_hull<=0.05,bulk_modulus>=100,is_stable=true"},
+    {"filters": "is_stable=true", "elements": "O", "sort_by": "band_gap", "order": "desc", "top_k": 20},
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local index vs upstream property searches")
+    parser.add_argument("--synthetic", type=int, default=5000, help="Synthetic materials (default: 5000)")
+    parser.add_argument("--latency-ms", default="50", help="Replay latency per upstream call (default: 50)")
+    parser.add_argument("--num-results", type=int, default=100, help="Results per search (default: 100)")
+    parser.add_argument("--detail-levels", default="summary,standard", help="Comma-separated detail levels")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions, best kept (default: 3)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = os.path.join(tmp, "fixtures")
+        subprocess.run(
+            [sys.executable, os.path.join(HERE, "record_fixtures.py"), fixtures, "--synthetic", str(args.synthetic)],
+            check=True, capture_output=True,
+        )
+        os.environ.update(MP_BACKEND="replay", MP_FIXTURES_DIR=fixtures, MP_CACHE_ENABLED="0",
+                          MP_REPLAY_LATENCY_MS=args.latency_ms, MP_INDEX_PATH=os.path.join(tmp, "index.npz"))
+        import mcp_materials
+
+        sync = mcp_materials._local_index.sync()
+        report = {"sync": sync, "index_bytes": os.path.getsize(sync["path"]), "queries": []}
+        for level in args.detail_levels.split(","):
+            for query in QUERIES:
+                timings = {}
+                for local in (False, True):
+                    best = float("inf")
+                    for _ in range(args.repeat):
+                        start = time.perf_counter()
+                        result = json.loads(asyncio.run(mcp_materials.search_materials_by_property(
+                            **query, num_results=args.num_results, detail_level=level,
+                            use_local_index=local, format="compact",
+                        )))
+                        best = min(best, time.perf_counter() - start)
+                    timings["local_ms" if local else "upstream_ms"] = round(best * 1000, 2)
+                    timings["count"] = result["count"]
+                timings["speedup"] = round(timings["upstream_ms"] / timings["local_ms"], 1)
+                report["queries"].append({"detail_level": level, **query, **timings})
+        report["index"] = mcp_materials._local_index.snapshot()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
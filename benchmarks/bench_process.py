@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Document processing benchmark - per-document process_material_doc loop vs
+the batch process_material_docs path
+Usage:
+  python benchmarks/bench_process.py                          # 1k/10k/100k docs
+  python benchmarks/bench_process.py --sizes 1000,5000 --detail-levels full
+"""
+
+import argparse
+import json
+import time
+
+from corpus import synthetic_corpus
+
+import mcp_materials
+
+
+def tiled_corpus(size: int, base: list) -> list:
+    """
+    `size` documents cycling through `base`; building 100k distinct pymatgen
+    structures would dominate the run.
+    """
+    return [base[i % len(base)] for i in range(size)]
+
+
+def timed(fn) -> tuple:
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-document vs batch document processing")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated corpus sizes")
+    parser.add_argument("--base", type=int, default=500, help="Distinct synthetic documents (default: 500)")
+    parser.add_argument("--detail-levels", default="summary,standard",
+                        help="Comma-separated detail levels to process (default: summary,standard)")
+    args = parser.parse_args()
+
+    documents = synthetic_corpus(args.base)
+    bases = {
+        # As returned by mp-api, and as read back from the summary cache
+        "documents": documents,
+        "dicts": [mcp_materials.serialize_object(doc) for doc in documents],
+    }
+
+    results = []
+    for level in args.detail_levels.split(","):
+        columns = mcp_materials.columns_for_detail_level(level)
+        for size in (int(s) for s in args.sizes.split(",")):
+            for shape, base in bases.items():
+                docs = tiled_corpus(size, base)
+
+                rows, per_doc = timed(lambda: [mcp_materials.process_material_doc(doc, columns) for doc in docs])
+                table, batch = timed(lambda: mcp_materials.process_material_docs(docs, columns))
+                records, materialize = timed(table.to_records)
+                if records != rows:
+                    raise SystemExit(f"Batch output differs from process_material_doc ({level}, {shape}, {size})")
+
+                results.append({
+                    "detail_level": level,
+                    "input": shape,
+                    "documents": size,
+                    "per_doc_seconds": round(per_doc, 4),
+                    "batch_seconds": round(batch, 4),
+                    "speedup": round(per_doc / batch, 2),
+                    "to_records_seconds": round(materialize, 4),
+                })
+                del rows, table, records
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+End-to-end tool benchmark on the offline replay backend - search,
+comparison, Excel export and phase diagram tools against recorded fixtures
+with a fixed synthetic upstream latency, so runs are deterministic and need
+no network or API key
+Usage:
+  python benchmarks/bench_replay.py                                # synthetic fixtures
+  python benchmarks/bench_replay.py --fixtures fixtures/ --latency-ms 0,50 --per-doc-ms 0.1
+  python benchmarks/bench_replay.py --sizes 100,1000 --formats json,compact
+Each latency setting runs in a fresh interpreter, since it is read at import.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+
+def run_case(sizes: list, formats: list, repeat: int) -> dict:
+    """Time each tool call on the backend configured in the environment"""
+    import mcp_materials
+
+    def timed(tool, **kwargs) -> tuple:
+        best, response = float("inf"), None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = asyncio.run(tool(**kwargs))
+            best = min(best, time.perf_counter() - start)
+        result = json.loads(response)
+        if result.get("status") != "success":
+            raise SystemExit(f"{tool.__name__} failed: {result.get('message')}")
+        return best, result, len(response.encode())
+
+    fixtures = mcp_materials.ReplayFixtures.load(os.path.abspath(mcp_materials.FIXTURES_DIR))
+    results = []
+    for size in sizes:
+        for fmt in formats:
+            seconds, result, size_bytes = timed(
+                mcp_materials.fetch_full_material_data, num_results=size, format=fmt
+            )
+            results.append({"tool": "fetch_full_material_data", "materials": result["count"], "format": fmt,
+                            "seconds": round(seconds, 4), "materials_per_second": round(result["count"] / seconds),
+                            "bytes": size_bytes})
+        ids = ",".join(doc["material_id"] for doc in fixtures.docs[:min(size, 50)])
+        seconds, result, size_bytes = timed(mcp_materials.compare_materials, material_ids=ids)
+        results.append({"tool": "compare_materials", "materials": result["num_materials"],
+                        "seconds": round(seconds, 4), "bytes": size_bytes})
+        with tempfile.TemporaryDirectory() as tmp:
+            seconds, result, _ = timed(
+                mcp_materials.export_to_excel, num_results=size,
+                output_filename=os.path.join(tmp, "replay.xlsx"),
+            )
+        results.append({"tool": "export_to_excel", "materials": size, "seconds": round(seconds, 4),
+                        "materials_per_second": round(size / seconds)})
+    if fixtures.entries:
+        for system in sorted({"-".join(sorted(els)) for els in fixtures.entry_elements if len(els) > 2}):
+            seconds, result, size_bytes = timed(mcp_materials.get_phase_diagram_info, chemsys=system)
+            results.append({"tool": "get_phase_diagram_info", "chemsys": system,
+                            "entries": result["num_entries"], "seconds": round(seconds, 4)})
+    return {
+        "latency_ms": mcp_materials.REPLAY_LATENCY_MS,
+        "per_doc_ms": mcp_materials.REPLAY_LATENCY_PER_DOC_MS,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tools end to end on the replay backend")
+    parser.add_argument("--fixtures", help="Fixtures directory (default: synthetic fixtures in a temp dir)")
+    parser.add_argument("--synthetic", type=int, default=1000, help="Synthetic documents when recording (default: 1000)")
+    parser.add_argument("--sizes", default="10,100,1000", help="Comma-separated result counts")
+    parser.add_argument("--formats", default="json,compact", help="Comma-separated response formats")
+    parser.add_argument("--latency-ms", default="0,50", help="Comma-separated per-call latencies")
+    parser.add_argument("--per-doc-ms", type=float, default=0.0, help="Latency per returned document (default: 0)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions, best kept (default: 3)")
+    parser.add_argument("--case", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    if args.case:
+        print(json.dumps(run_case(sizes, args.formats.split(","), args.repeat)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = args.fixtures
+        if fixtures is None:
+            fixtures = os.path.join(tmp, "fixtures")
+            subprocess.run(
+                [sys.executable, os.path.join(HERE, "record_fixtures.py"), fixtures,
+                 "--synthetic", str(args.synthetic)],
+                check=True, capture_output=True,
+            )
+        report = []
+        for latency in args.latency_ms.split(","):
+            env = dict(os.environ, MP_BACKEND="replay", MP_FIXTURES_DIR=fixtures, MP_CACHE_ENABLED="0",
+                       MP_REPLAY_LATENCY_MS=latency, MP_REPLAY_LATENCY_PER_DOC_MS=str(args.per_doc_ms))
+            out = subprocess.run(
+                [sys.executable, __file__, "--case", "--sizes", args.sizes, "--formats", args.formats,
+                 "--repeat", str(args.repeat)],
+                env=env, check=True, capture_output=True, text=True,
+            )
+            report.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
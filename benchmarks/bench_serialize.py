@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Serializer benchmark - per-document throughput of serialize_object
+Usage:
+  python benchmarks/bench_serialize.py                       # synthetic corpus
+  python benchmarks/bench_serialize.py --record corpus.pkl   # record real docs (needs MP_API_KEY)
+  python benchmarks/bench_serialize.py --corpus corpus.pkl   # benchmark a recorded corpus
+"""
+
+import argparse
+import json
+import time
+
+from corpus import load_corpus, record_corpus, synthetic_corpus
+
+import mcp_materials
+
+
+def legacy_serialize_object(obj):
+    """The original recursive hasattr-probing serializer, kept as the baseline"""
+    if obj is None:
+        return None
+    if isinstance(obj, (str, int, float, bool)):
+        return obj
+    if isinstance(obj, (list, tuple)):
+        return [legacy_serialize_object(item) for item in obj]
+    if isinstance(obj, dict):
+        return {str(k): legacy_serialize_object(v) for k, v in obj.items()}
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, 'symbol') and hasattr(obj, 'Z'):
+        return str(obj.symbol)
+    if hasattr(obj, 'as_dict'):
+        return legacy_serialize_object(obj.as_dict())
+    if hasattr(obj, '__dict__'):
+        return legacy_serialize_object(obj.__dict__)
+    return str(obj)
+
+
+def throughput(fn, docs, repeat: int) -> float:
+    """Best-of-`repeat` documents per second"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for doc in docs:
+            fn(doc)
+        best = min(best, time.perf_counter() - start)
+    return len(docs) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark summary document serialization")
+    parser.add_argument("--corpus", help="Pickled corpus recorded with --record")
+    parser.add_argument("--record", help="Record a corpus from the live API to this path and exit")
+    parser.add_argument("--num-docs", type=int, default=500, help="Documents to record/generate (default: 500)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions (default: 5)")
+    args = parser.parse_args()
+
+    if args.record:
+        count = record_corpus(args.record, args.num_docs)
+        print(f"Recorded {count} documents to {args.record}")
+        return
+
+    docs = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.num_docs)
+
+    before = throughput(legacy_serialize_object, docs, args.repeat)
+    after = throughput(mcp_materials.serialize_object, docs, args.repeat)
+
+    print(json.dumps({
+        "corpus": args.corpus or f"synthetic ({len(docs)} docs)",
+        "documents": len(docs),
+        "legacy_docs_per_second": round(before, 1),
+        "dispatch_docs_per_second": round(after, 1),
+        "speedup": round(after / before, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
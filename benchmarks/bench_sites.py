@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Structure response benchmark - time and encoded size of the site encodings
+of get_structure_details, against the previous per-site conversion
+Usage:
+  python benchmarks/bench_sites.py                    # 50/500/5000-site supercells
+  python benchmarks/bench_sites.py --sizes 500 --repeat 10
+"""
+
+import argparse
+import json
+import time
+
+import corpus  # noqa: F401 - puts the repository on sys.path
+
+import mcp_materials
+
+
+def legacy_sites(structure) -> list:
+    """The previous implementation: NumPy coordinates converted site by site"""
+    return [
+        {
+            "species": str(site.specie),
+            "coords_fractional": list(site.frac_coords),
+            "coords_cartesian": list(site.coords),
+            "properties": mcp_materials.serialize_object(site.properties) if site.properties else {}
+        }
+        for site in structure.sites
+    ]
+
+
+def supercell(num_sites: int):
+    """A perovskite supercell of about `num_sites` sites"""
+    from pymatgen.core import Lattice, Structure
+
+    cell = Structure.from_spacegroup("Pm-3m", Lattice.cubic(3.9), ["Sr", "Ti", "O"],
+                                     [[0, 0, 0], [0.5, 0.5, 0.5], [0.5, 0.5, 0]])
+    n = max(1, round((num_sites / len(cell)) ** (1 / 3)))
+    return cell * [n, n, max(1, round(num_sites / (len(cell) * n * n)))]
+
+
+def measure(build, repeat: int) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encoded = mcp_materials.encode_response({"status": "success", "sites": build()}, "compact")
+        best = min(best, time.perf_counter() - start)
+    return {"ms": round(best * 1000, 2), "kb": round(len(encoded) / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark structure site encodings")
+    parser.add_argument("--sizes", default="50,500,5000", help="Comma-separated approximate site counts")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions (default: 5)")
+    args = parser.parse_args()
+
+    report = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        structure = supercell(size)
+        modes = {"legacy records": lambda: legacy_sites(structure)}
+        for site_format in mcp_materials.SITE_FORMATS:
+            for dtype in (("float64", "float32") if site_format == "base64" else ("float64",)):
+                for cartesian in (True, False):
+                    name = f"{site_format}{' ' + dtype if site_format == 'base64' else ''}" \
+                           f"{'' if cartesian else ' no-cartesian'}"
+                    if site_format == "records":
+                        modes[name] = lambda c=cartesian: mcp_materials._site_records(structure, c)
+                    else:
+                        modes[name] = (lambda f=site_format, d=dtype, c=cartesian:
+                                       mcp_materials._site_arrays(structure, f, d, c))
+        results = {name: measure(build, args.repeat) for name, build in modes.items()}
+        baseline = results["legacy records"]
+        for entry in results.values():
+            entry["speedup"] = round(baseline["ms"] / entry["ms"], 2)
+            entry["size_vs_legacy"] = round(entry["kb"] / baseline["kb"], 3)
+        report.append({"sites": len(structure), "modes": results})
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
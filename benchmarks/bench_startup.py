@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Server cold-start benchmark - module import time, time to the first tool
+list over stdio and time to the first tool result, with and without the
+MP_PREWARM background warm-up
+Usage:
+  MP_API_KEY=x python benchmarks/bench_startup.py
+  python benchmarks/bench_startup.py --tool get_structure_details --arguments '{"material_id": "mp-149"}'
+The default tool (get_server_diagnostics) needs no network; pass a real tool
+and MP_API_KEY to include the first Materials Project query.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+from fastmcp import Client
+from fastmcp.client.transports import StdioTransport
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_profile(top: int) -> dict:
+    """`python -X importtime` of the server module: total and slowest top-level imports"""
+    env = dict(os.environ, MP_API_KEY=os.environ.get("MP_API_KEY", "x"), MP_CACHE_ENABLED="0")
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import mcp_materials"],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    modules = {}
+    for line in out.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        # Nesting depth 1 (two spaces of indent) are the module's own imports
+        if match and len(match.group(3)) <= 3:
+            modules[match.group(4)] = int(match.group(2)) / 1e6
+    total = modules.pop("mcp_materials", None)
+    slowest = sorted(modules.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return {
+        "import_seconds": round(total, 3) if total is not None else None,
+        "process_seconds": round(wall, 3),
+        "slowest_imports": {name: round(seconds, 3) for name, seconds in slowest},
+    }
+
+
+async def first_contact(prewarm: bool, tool: str, arguments: dict, settle: float) -> dict:
+    """Spawn the server over stdio and time the handshake, tool list and first result"""
+    env = dict(os.environ, MP_API_KEY=os.environ.get("MP_API_KEY", "x"),
+               MP_CACHE_ENABLED="0", MP_PREWARM="1" if prewarm else "0")
+    transport = StdioTransport(sys.executable, [os.path.join(ROOT, "mcp_materials.py")], env=env, cwd=ROOT)
+
+    start = time.perf_counter()
+    async with Client(transport) as client:
+        connected = time.perf_counter() - start
+        tools = await client.list_tools()
+        listed = time.perf_counter() - start
+        if settle:
+            # Give the warm-up time to run, as an idle client would
+            await asyncio.sleep(settle)
+        call_start = time.perf_counter()
+        await client.call_tool(tool, arguments, raise_on_error=False)
+        first_call = time.perf_counter() - call_start
+        diagnostics = await client.call_tool("get_server_diagnostics", {"format": "compact"})
+    return {
+        "prewarm": prewarm,
+        "tools": len(tools),
+        "initialize_seconds": round(connected, 3),
+        "first_tool_list_seconds": round(listed, 3),
+        "first_result_seconds": round(listed + settle + first_call, 3),
+        "first_call_seconds": round(first_call, 3),
+        "prewarm_state": json.loads(diagnostics.content[0].text)["prewarm"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark server import and first-contact latency")
+    parser.add_argument("--tool", default="get_server_diagnostics", help="Tool timed as the first call")
+    parser.add_argument("--arguments", default="{}", help="JSON arguments of the first call")
+    parser.add_argument("--settle", type=float, default=0.0,
+                        help="Seconds idle between the tool list and the first call (default: 0)")
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to report (default: 8)")
+    args = parser.parse_args()
+
+    report = {"imports": import_profile(args.top), "stdio": []}
+    for prewarm in (False, True):
+        report["stdio"].append(asyncio.run(
+            first_contact(prewarm, args.tool, json.loads(args.arguments), args.settle)
+        ))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Structure analysis benchmark - symmetry analysis of a batch of structures
+in the calling thread vs spread over the get_structures worker processes
+Usage:
+  python benchmarks/bench_structures.py                          # 200 structures, 1/2/4 workers
+  python benchmarks/bench_structures.py --count 500 --workers 2,8
+Worker start-up (spawning and importing the server module) is reported
+separately from the warm timings.
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import wait
+
+import corpus  # noqa: F401 - puts the repository on sys.path
+
+import mcp_materials
+
+
+def prototype_structures(count: int) -> list:
+    """Symmetric supercells (rocksalt, perovskite, diamond) of 2 to 160 sites"""
+    from pymatgen.core import Lattice, Structure
+
+    prototypes = [
+        Structure.from_spacegroup("Fm-3m", Lattice.cubic(4.2), ["Mg", "O"], [[0, 0, 0], [0.5, 0.5, 0.5]]),
+        Structure.from_spacegroup("Pm-3m", Lattice.cubic(3.9), ["Sr", "Ti", "O"],
+                                  [[0, 0, 0], [0.5, 0.5, 0.5], [0.5, 0.5, 0]]),
+        Structure.from_spacegroup("Fd-3m", Lattice.cubic(5.43), ["Si"], [[0, 0, 0]]),
+    ]
+    scalings = [[1, 1, 1], [2, 1, 1], [2, 2, 1], [2, 2, 2]]
+    return [
+        prototypes[i % len(prototypes)] * scalings[(i // len(prototypes)) % len(scalings)]
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched structure symmetry analysis")
+    parser.add_argument("--count", type=int, default=200, help="Structures per batch (default: 200)")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker process counts")
+    args = parser.parse_args()
+
+    structures = prototype_structures(args.count)
+
+    start = time.perf_counter()
+    for structure in structures:
+        mcp_materials._symmetry_info(structure)
+    in_thread = time.perf_counter() - start
+
+    results = [{"mode": "thread", "structures": args.count, "seconds": round(in_thread, 3)}]
+    for workers in (int(w) for w in args.workers.split(",")):
+        pool = mcp_materials.AnalysisProcessPool(workers)
+        start = time.perf_counter()
+        wait([pool.submit(mcp_materials._symmetry_batch, [], 0.01, 5.0) for _ in range(workers)])
+        startup = time.perf_counter() - start
+
+        # As get_structures does: cells sent in one batch per worker
+        start = time.perf_counter()
+        cells = [mcp_materials._structure_cell(structure) for structure in structures]
+        size = -(-len(cells) // workers)
+        wait([pool.submit(mcp_materials._symmetry_batch, cells[i:i + size], 0.01, 5.0)
+              for i in range(0, len(cells), size)])
+        elapsed = time.perf_counter() - start
+        pool.shutdown()
+        results.append({
+            "mode": f"{workers} processes",
+            "structures": args.count,
+            "seconds": round(elapsed, 3),
+            "speedup": round(in_thread / elapsed, 2),
+            "startup_seconds": round(startup, 3),
+        })
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
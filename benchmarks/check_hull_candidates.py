@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Regression check for get_hull_distances candidate parsing - a batch mixing
+valid candidates with a bad formula, foreign elements and non-numeric
+energies must evaluate the valid ones and report an error on each bad row
+only, on the replay backend
+Usage:
+  python benchmarks/check_hull_candidates.py
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+CANDIDATES = [
+    ("LiFePO4:-6.9", None),
+    ("LiFePO4:abc", "non-numeric energy_per_atom"),
+    ("Li2O:-4.5", None),
+    ("Xx2O:-4.0", "Xx"),
+    ("NaCl:-3.0", "are not in"),
+    ("FePO4:nan", "non-numeric energy_per_atom"),
+    ("Fe2O3:-6.0", None),
+]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = os.path.join(tmp, "fixtures")
+        subprocess.run(
+            [sys.executable, os.path.join(HERE, "record_fixtures.py"), fixtures, "--synthetic", "50",
+             "--chemsys", "Li-Fe-P-O"],
+            check=True, capture_output=True,
+        )
+        os.environ.update(MP_BACKEND="replay", MP_FIXTURES_DIR=fixtures, MP_CACHE_ENABLED="0")
+        import mcp_materials
+
+        result = json.loads(asyncio.run(mcp_materials.get_hull_distances(
+            chemsys="Li-Fe-P-O", candidates=",".join(item for item, _ in CANDIDATES), format="compact"
+        )))
+    if result.get("status") != "success":
+        raise SystemExit(f"Batch failed: {result.get('message')}")
+
+    report, failed = [], False
+    for (item, expected_error), row in zip(CANDIDATES, result["results"]):
+        error = row.get("error")
+        if expected_error is None:
+            ok = error is None and "e_above_hull" in row
+        else:
+            ok = error is not None and expected_error in error and "e_above_hull" not in row
+        failed |= not ok
+        report.append({"candidate": item, "error": error, "e_above_hull": row.get("e_above_hull"), "ok": ok})
+    failed |= len(result["results"]) != len(CANDIDATES)
+    print(json.dumps(report, indent=2))
+    if failed:
+        raise SystemExit("Candidates were not evaluated or rejected individually")
+
+
+if __name__ == "__main__":
+    main()
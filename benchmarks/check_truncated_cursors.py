@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Regression check for format="truncated" paging - following the rewound
+next_cursor of size-capped responses must return the same materials as one
+untruncated call, including searches whose predicates are evaluated locally
+Usage:
+  python benchmarks/check_truncated_cursors.py
+  python benchmarks/check_truncated_cursors.py --synthetic 2000 --max-bytes 1200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+SEARCHES = [
+    {"filters": "band_gap=0..10,is_magnetic=true"},
+    {"filters": "band_gap=1..3,energy_above_hull<=0.05"},
+    {"filters": "is_stable=true", "sort_by": "bulk_modulus", "order": "desc"},
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check truncated responses resume without skipping materials")
+    parser.add_argument("--synthetic", type=int, default=500, help="Synthetic materials (default: 500)")
+    parser.add_argument("--max-bytes", default="1500", help="MP_RESPONSE_MAX_BYTES (default: 1500)")
+    parser.add_argument("--num-results", type=int, default=6, help="Results per page (default: 6)")
+    parser.add_argument("--total", type=int, default=40, help="Materials compared per search (default: 40)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = os.path.join(tmp, "fixtures")
+        subprocess.run(
+            [sys.executable, os.path.join(HERE, "record_fixtures.py"), fixtures, "--synthetic", str(args.synthetic)],
+            check=True, capture_output=True,
+        )
+        os.environ.update(MP_BACKEND="replay", MP_FIXTURES_DIR=fixtures, MP_CACHE_ENABLED="0",
+                          MP_RESPONSE_MAX_BYTES=args.max_bytes)
+        import mcp_materials
+
+        def search(**kwargs) -> dict:
+            return json.loads(asyncio.run(mcp_materials.search_materials_by_property(
+                detail_level="summary", **kwargs
+            )))
+
+        report, failed = [], False
+        for query in SEARCHES:
+            expected = [row["Material_ID"] for row in
+                        search(**query, num_results=args.total, format="compact")["data"]]
+            returned, cursor, pages, omitted = [], None, 0, 0
+            while len(returned) < len(expected):
+                result = search(cursor=cursor, num_results=args.num_results, format="truncated") if cursor \
+                    else search(**query, num_results=args.num_results, format="truncated")
+                if result.get("status") != "success":
+                    raise SystemExit(f"{query} failed: {result.get('message')}")
+                if not result["data"]:
+                    raise SystemExit(f"{query}: no row fits in {args.max_bytes} bytes; raise --max-bytes")
+                returned += [row["Material_ID"] for row in result["data"]]
+                omitted += result.get("truncated", {}).get("omitted", 0)
+                pages += 1
+                cursor = result["next_cursor"]
+                if not cursor:
+                    break
+            ok = returned[:len(expected)] == expected
+            failed |= not ok
+            report.append({**query, "pages": pages, "omitted": omitted, "materials": len(expected), "ok": ok})
+    print(json.dumps(report, indent=2))
+    if failed:
+        raise SystemExit("Truncated cursors skipped or repeated materials")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark corpora of Materials Project summary documents.
+
+A corpus is either recorded from the live API (pickled so that pymatgen,
+emmet and numpy types survive) or generated synthetically with the same
+shape as a summary document.
+"""
+
+import os
+import pickle
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The benchmarks never talk to the live cache
+os.environ.setdefault("MP_CACHE_ENABLED", "0")
+
+CHEMISTRIES = [
+    ["Si"], ["Fe", "O"], ["Li", "Fe", "O"], ["Ti", "O"], ["Cd", "S"],
+    ["Li", "Fe", "P", "O"], ["Ga", "As"], ["Ba", "Ti", "O"],
+]
+CRYSTAL_SYSTEMS = ["Triclinic", "Monoclinic", "Orthorhombic", "Tetragonal",
+                   "Trigonal", "Hexagonal", "Cubic"]
+
+
+def _synthetic_structure(elements, nsites, rng):
+    from pymatgen.core import Lattice, Structure
+
+    species = [elements[i % len(elements)] for i in range(nsites)]
+    coords = [[rng.random(), rng.random(), rng.random()] for _ in range(nsites)]
+    lattice = Lattice.from_parameters(
+        4 + rng.random() * 6, 4 + rng.random() * 6, 4 + rng.random() * 6, 90, 90, 90
+    )
+    return Structure(lattice, species, coords)
+
+
+def synthetic_doc(i: int, rng: random.Random) -> dict:
+    """A summary-shaped dictionary with realistic field types"""
+    elements = rng.choice(CHEMISTRIES)
+    nsites = rng.choice([2, 4, 8, 16, 24, 48])
+    structure = _synthetic_structure(elements, nsites, rng)
+    has_elastic = rng.random() < 0.3
+    return {
+        "material_id": f"mp-{i}",
+        "formula_pretty": "".join(elements),
+        "formula_anonymous": "ABC"[:len(elements)],
+        "chemsys": "-".join(sorted(elements)),
+        "composition": structure.composition,
+        "composition_reduced": structure.composition.reduced_composition,
+        "elements": sorted(elements),
+        "nelements": len(elements),
+        "nsites": nsites,
+        "volume": structure.volume,
+        "density": structure.density,
+        "density_atomic": structure.volume / nsites,
+        "symmetry": {
+            "crystal_system": rng.choice(CRYSTAL_SYSTEMS),
+            "symbol": "Fm-3m",
+            "number": rng.randint(1, 230),
+            "point_group": "m-3m",
+            "symprec": 0.1,
+            "angle_tolerance": 5.0,
+            "version": "2.5.0",
+        },
+        "structure": structure,
+        "energy_per_atom": -rng.random() * 8,
+        "formation_energy_per_atom": -rng.random() * 3,
+        "energy_above_hull": rng.random() * 0.3,
+        "is_stable": rng.random() < 0.2,
+        "equilibrium_reaction_energy_per_atom": -rng.random() * 0.1,
+        "decomposes_to": None,
+        "band_gap": rng.random() * 6,
+        "cbm": rng.random() * 5,
+        "vbm": rng.random() * 2,
+        "efermi": rng.random() * 4,
+        "is_gap_direct": rng.random() < 0.5,
+        "is_metal": rng.random() < 0.3,
+        "is_magnetic": rng.random() < 0.3,
+        "ordering": rng.choice(["NM", "FM", "AFM", "FiM"]),
+        "total_magnetization": rng.random() * 5,
+        "total_magnetization_normalized_vol": rng.random() * 0.1,
+        "total_magnetization_normalized_formula_units": rng.random() * 3,
+        "num_magnetic_sites": rng.randint(0, nsites),
+        "num_unique_magnetic_sites": rng.randint(0, 3),
+        "bulk_modulus": {"voigt": 150.0, "reuss": 140.0, "vrh": 145.0} if has_elastic else None,
+        "shear_modulus": {"voigt": 80.0, "reuss": 70.0, "vrh": 75.0} if has_elastic else None,
+        "universal_anisotropy": rng.random() if has_elastic else None,
+        "homogeneous_poisson": rng.random() * 0.5 if has_elastic else None,
+        "e_total": rng.random() * 20,
+        "e_ionic": rng.random() * 10,
+        "e_electronic": rng.random() * 10,
+        "n": 1 + rng.random() * 3,
+        "e_ij_max": None,
+        "weighted_surface_energy_EV_PER_ANG2": rng.random() * 0.2,
+        "weighted_surface_energy": rng.random() * 3,
+        "weighted_work_function": 3 + rng.random() * 3,
+        "surface_anisotropy": rng.random(),
+        "shape_factor": rng.random() * 6,
+        "has_reconstructed": rng.random() < 0.1,
+        "possible_species": [f"{el}0+" for el in elements],
+        "has_props": {"elasticity": has_elastic, "dielectric": True},
+        "theoretical": rng.random() < 0.5,
+        "database_IDs": {"icsd": [f"icsd-{rng.randint(1, 99999)}"]},
+    }
+
+
+def synthetic_corpus(n: int, seed: int = 0, as_documents: bool = True) -> list:
+    """
+    Generate `n` synthetic summary documents. With `as_documents` they are
+    validated into emmet SummaryDoc models (as mp-api returns them) when
+    emmet-core is installed; otherwise plain dictionaries are returned.
+    """
+    rng = random.Random(seed)
+    docs = [synthetic_doc(i, rng) for i in range(1, n + 1)]
+    if not as_documents:
+        return docs
+    try:
+        from emmet.core.summary import SummaryDoc
+    except ImportError:
+        return docs
+    return [SummaryDoc.model_validate(doc) for doc in docs]
+
+
+def record_corpus(path: str, num_docs: int, **search_params):
+    """Record real summary documents from Materials Project (needs MP_API_KEY)"""
+    from mp_api.client import MPRester
+    from mcp_materials import SUMMARY_FIELDS
+
+    with MPRester(os.environ["MP_API_KEY"]) as mpr:
+        docs = mpr.materials.summary.search(
+            fields=SUMMARY_FIELDS, num_chunks=1, chunk_size=num_docs, **search_params
+        )
+    with open(path, "wb") as f:
+        pickle.dump(list(docs), f)
+    return len(docs)
+
+
+def load_corpus(path: str) -> list:
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def synthetic_entries(elements: list, num_entries: int, seed: int = 0) -> list:
+    """
+    ComputedEntry objects of one chemical system: the elemental references
+    plus random stoichiometries with negative formation energies
+    """
+    from pymatgen.core import Composition
+    from pymatgen.entries.computed_entries import ComputedEntry
+
+    rng = random.Random(seed)
+    references = {el: -2.0 - 3.0 * rng.random() for el in elements}
+    entries = [ComputedEntry(el, references[el], entry_id=f"ref-{el}") for el in elements]
+    for i in range(num_entries):
+        present = rng.sample(elements, rng.randint(2, len(elements)))
+        composition = Composition({el: rng.randint(1, 6) for el in present})
+        reference = sum(references[el] * composition.get_atomic_fraction(el) for el in present)
+        energy_per_atom = reference - 1.5 * rng.random()
+        entries.append(ComputedEntry(composition, energy_per_atom * composition.num_atoms, entry_id=f"syn-{i}"))
+    return entries
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Record fixtures for the offline replay backend (MP_BACKEND=replay)
+Usage:
+  python benchmarks/record_fixtures.py fixtures/                       # synthetic, no network
+  python benchmarks/record_fixtures.py fixtures/ --synthetic 2000 --chemsys Li-Fe-P-O,Ba-Ti-O
+  python benchmarks/record_fixtures.py fixtures/ --live --num-docs 500 --elements Li,O   # needs MP_API_KEY
+Serve them with MP_BACKEND=replay MP_FIXTURES_DIR=fixtures/.
+"""
+
+import argparse
+import json
+import os
+
+from corpus import synthetic_corpus, synthetic_entries
+
+import mcp_materials
+
+
+def record_live(num_docs: int, chemsys: list, elements: list) -> tuple:
+    """Summary documents and chemsys entries from Materials Project"""
+    from mp_api.client import MPRester
+
+    search_params = {"elements": elements} if elements else {}
+    with MPRester(os.environ["MP_API_KEY"]) as mpr:
+        docs = mpr.materials.summary.search(
+            fields=mcp_materials.SUMMARY_FIELDS, num_chunks=1, chunk_size=num_docs, **search_params
+        )
+        entries = [entry for system in chemsys for entry in mpr.get_entries_in_chemsys(system)]
+        return list(docs), entries, getattr(mpr, "db_version", None)
+
+
+def record_synthetic(num_docs: int, chemsys: list, num_entries: int) -> tuple:
+    docs = synthetic_corpus(num_docs, as_documents=False)
+    entries = [
+        entry
+        for seed, system in enumerate(chemsys)
+        for entry in synthetic_entries(system.split("-"), num_entries, seed=seed)
+    ]
+    return docs, entries, "synthetic"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record replay backend fixtures")
+    parser.add_argument("directory", help="Fixtures directory to write")
+    parser.add_argument("--live", action="store_true", help="Record from Materials Project (needs MP_API_KEY)")
+    parser.add_argument("--synthetic", type=int, default=500, help="Synthetic documents (default: 500)")
+    parser.add_argument("--num-docs", type=int, default=500, help="Live documents to record (default: 500)")
+    parser.add_argument("--elements", help="Comma-separated elements the live documents must contain")
+    parser.add_argument("--chemsys", default="Li-Fe-P-O,Ba-Ti-O",
+                        help="Comma-separated chemical systems whose entries are recorded")
+    parser.add_argument("--entries", type=int, default=200, help="Synthetic entries per chemical system")
+    args = parser.parse_args()
+
+    chemsys = args.chemsys.split(",") if args.chemsys else []
+    if args.live:
+        elements = args.elements.split(",") if args.elements else None
+        docs, entries, db_version = record_live(args.num_docs, chemsys, elements)
+    else:
+        docs, entries, db_version = record_synthetic(args.synthetic, chemsys, args.entries)
+
+    mcp_materials.ReplayFixtures.write(args.directory, docs, entries, db_version)
+    print(json.dumps({"directory": args.directory, "documents": len(docs),
+                      "entries": len(entries), "db_version": db_version}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
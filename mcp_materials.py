@@ -3,55 +3,2205 @@ Materials Project MCP Server
 Provides full material data access via mp-api with complete field extraction
 """
 
+import asyncio
+import atexit
+import base64
+import contextvars
+import csv
+import functools
+import gc
+import gzip
+import hashlib
+import heapq
+import importlib
+import itertools
 import json
+import multiprocessing
 import os
-from typing import Optional, Any, List
+import random
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional, Any, Awaitable, Callable, Iterator, List, NamedTuple
 from datetime import datetime
+from enum import Enum
 
-from fastmcp import FastMCP
-from mp_api.client import MPRester
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl.utils import get_column_letter
+from fastmcp import Context, FastMCP
+from fastmcp.server.middleware import Middleware
+import numpy as np
 
-API_KEY = os.environ.get("MP_API_KEY")
-if not API_KEY:
-    raise ValueError("MP_API_KEY environment variable is required")
+# Materials Project API key. It is resolved when a tool first needs a client,
+# not at import, so the server can start and list tools before one is set.
+# MP_API_KEY_FILE is re-read whenever it changes, which rotates the key
+# without a restart; HTTP deployments may pass a per-request key in a header.
+API_KEY_FILE = os.environ.get("MP_API_KEY_FILE")
+API_KEY_HEADER = os.environ.get("MP_API_KEY_HEADER", "x-mp-api-key").lower()
+MAX_KEY_POOLS = int(os.environ.get("MP_MAX_KEY_POOLS", "8"))
 
-mcp = FastMCP("materials-project")
 
+@functools.lru_cache(maxsize=None)
+def _lazy_import(module: str, name: Optional[str] = None) -> Any:
+    """
+    `name` from `module` (or the module itself), imported on first use.
+    mp-api, pymatgen and openpyxl take seconds to import, so they stay out of
+    server start-up and are bound once rather than re-imported in hot functions.
+    """
+    imported = importlib.import_module(module)
+    return imported if name is None else getattr(imported, name)
+
+
+# MPRester client pool settings
+POOL_SIZE = int(os.environ.get("MP_POOL_SIZE", "4"))
+POOL_IDLE_TIMEOUT = float(os.environ.get("MP_POOL_IDLE_TIMEOUT", "300"))
+POOL_MAX_AGE = float(os.environ.get("MP_POOL_MAX_AGE", "3600"))
+# Consecutive failed requests after which a client is replaced
+POOL_MAX_FAILURES = int(os.environ.get("MP_POOL_MAX_FAILURES", "3"))
+
+# Upstream backend behind the client pool: "live" queries Materials Project
+# through mp-api, "replay" serves fixtures recorded to MP_FIXTURES_DIR
+BACKEND = os.environ.get("MP_BACKEND", "live").lower()
+FIXTURES_DIR = os.environ.get("MP_FIXTURES_DIR", "fixtures")
+# Synthetic latency of the replay backend: per call, plus per returned document
+REPLAY_LATENCY_MS = float(os.environ.get("MP_REPLAY_LATENCY_MS", "0"))
+REPLAY_LATENCY_PER_DOC_MS = float(os.environ.get("MP_REPLAY_LATENCY_PER_DOC_MS", "0"))
+
+# Import the heavy dependencies and open a pooled client in the background
+# once a client has connected, so the first tool call does not pay for them
+PREWARM = os.environ.get("MP_PREWARM", "0").lower() in ("1", "true", "yes")
+PREWARM_MODULES = (
+    ("mp_api.client", "MPRester"),
+    ("pymatgen.core", "Structure"),
+    ("pymatgen.symmetry.analyzer", "SpacegroupAnalyzer"),
+    ("pymatgen.analysis.phase_diagram", "PhaseDiagram"),
+    ("openpyxl", "Workbook"),
+)
+
+
+class _PooledClient:
+    """An MPRester instance plus the bookkeeping the pool needs"""
+
+    def __init__(self, client: Any, setup_seconds: float):
+        self.client = client
+        self.setup_seconds = setup_seconds
+        self.created = time.monotonic()
+        self.last_used = self.created
+        self.failures = 0
+
+    def is_healthy(self, now: float) -> bool:
+        """A client is reusable until it keeps failing or goes stale"""
+        if self.failures >= POOL_MAX_FAILURES:
+            return False
+        if now - self.last_used > POOL_IDLE_TIMEOUT:
+            return False
+        return now - self.created <= POOL_MAX_AGE
+
+    def close(self):
+        """Close the client's HTTP session, which its sub-resters share"""
+        session = getattr(self.client, "session", None)
+        try:
+            if hasattr(session, "close"):
+                session.close()
+        except Exception:
+            pass
+
+
+class MPResterPool:
+    """
+    Server-lifetime pool of MPRester clients shared by all tools.
+
+    Constructing an MPRester performs endpoint discovery and opens a new HTTP
+    session, so tools borrow an already initialised client instead. At most
+    `size` clients exist at once; callers block until one is returned.
+    Idle, expired or repeatedly failing clients are evicted on the next
+    borrow, and clients that fail with a connection error are discarded
+    rather than returned.
+    """
 
-def serialize_object(obj: Any) -> Any:
-    """Recursively serialize objects to JSON-compatible format"""
-    if obj is None:
+    def __init__(self, api_key: str, size: int = POOL_SIZE):
+        self.api_key = api_key
+        self.size = max(1, size)
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._idle: List[_PooledClient] = []
+        self._lock = threading.Lock()
+        self.retired = False
+        self.stats = {
+            "created": 0,
+            "reused": 0,
+            "evicted": 0,
+            "discarded": 0,
+            "setup_seconds_total": 0.0,
+        }
+
+    def _create(self) -> _PooledClient:
+        start = time.perf_counter()
+        client = BACKENDS[BACKEND].create(self.api_key)
+        pooled = _PooledClient(client, time.perf_counter() - start)
+        with self._lock:
+            self.stats["created"] += 1
+            self.stats["setup_seconds_total"] += pooled.setup_seconds
+        return pooled
+
+    def evict_idle(self):
+        """Close idle clients that are no longer healthy"""
+        now = time.monotonic()
+        with self._lock:
+            stale = [c for c in self._idle if not c.is_healthy(now)]
+            self._idle = [c for c in self._idle if c not in stale]
+            self.stats["evicted"] += len(stale)
+        for pooled in stale:
+            pooled.close()
+
+    def _checkout(self) -> tuple:
+        self.evict_idle()
+        with self._lock:
+            pooled = self._idle.pop() if self._idle else None
+            if pooled is not None:
+                self.stats["reused"] += 1
+        if pooled is not None:
+            return pooled, True
+        return self._create(), False
+
+    def _checkin(self, pooled: _PooledClient):
+        pooled.last_used = time.monotonic()
+        with self._lock:
+            if not self.retired:
+                self._idle.append(pooled)
+                return
+        # The key was rotated out while this client was borrowed
+        pooled.close()
+
+    @contextmanager
+    def client(self):
+        """Borrow a client; yields (mpr, reused)"""
+        self._slots.acquire()
+        pooled = None
+        try:
+            pooled, reused = self._checkout()
+            yield pooled.client, reused
+            pooled.failures = 0
+        except OSError:
+            # requests' connection errors subclass OSError; drop the client
+            if pooled is not None:
+                with self._lock:
+                    self.stats["discarded"] += 1
+                pooled.close()
+                pooled = None
+            raise
+        except Exception:
+            if pooled is not None:
+                pooled.failures += 1
+            raise
+        finally:
+            if pooled is not None:
+                self._checkin(pooled)
+            self._slots.release()
+
+    def average_setup_seconds(self) -> float:
+        with self._lock:
+            created = self.stats["created"]
+            return self.stats["setup_seconds_total"] / created if created else 0.0
+
+    def close(self):
+        """Close all idle clients; the pool stays usable and refills lazily"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            pooled.close()
+
+    def retire(self):
+        """Close idle clients now and borrowed ones as they are returned"""
+        with self._lock:
+            self.retired = True
+        self.close()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            info = dict(self.stats)
+            info["idle"] = len(self._idle)
+        info["setup_seconds_total"] = round(info["setup_seconds_total"], 4)
+        info["size"] = self.size
+        info["average_setup_ms"] = round(self.average_setup_seconds() * 1000, 2)
+        return info
+
+
+def _key_fingerprint(api_key: str) -> str:
+    """Short, non-reversible label of a key for diagnostics"""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:12]
+
+
+# Key supplied with the current request; copied into worker threads with the context
+_request_api_key: contextvars.ContextVar = contextvars.ContextVar("mp_request_api_key", default=None)
+
+
+class APIKeyResolver:
+    """
+    Resolves the API key of the current call: the per-request key if one was
+    supplied, else MP_API_KEY_FILE (re-read when its mtime changes), else the
+    MP_API_KEY environment variable. Missing keys surface as a ValueError on
+    the tool call that needed one rather than at server start.
+    """
+
+    def __init__(self, key_file: Optional[str] = API_KEY_FILE):
+        self.key_file = key_file
+        self._lock = threading.Lock()
+        self._file_mtime: Optional[float] = None
+        self._file_key: Optional[str] = None
+        self.stats = {"file_reads": 0, "rotations": 0, "request_keys": 0, "missing": 0}
+
+    def _read_file(self) -> Optional[str]:
+        try:
+            mtime = os.stat(self.key_file).st_mtime
+        except OSError:
+            return None
+        with self._lock:
+            if mtime != self._file_mtime:
+                with open(self.key_file) as f:
+                    key = f.read().strip() or None
+                if self._file_key is not None and key != self._file_key:
+                    self.stats["rotations"] += 1
+                self._file_mtime, self._file_key = mtime, key
+                self.stats["file_reads"] += 1
+            return self._file_key
+
+    def default_key(self) -> Optional[str]:
+        """The server-wide key, without any per-request override"""
+        if self.key_file:
+            key = self._read_file()
+            if key:
+                return key
+        return os.environ.get("MP_API_KEY") or None
+
+    def scope(self) -> Optional[str]:
+        """Fingerprint of the key the current call would use (None when there is none)"""
+        key = _request_api_key.get() or self.default_key()
+        return _key_fingerprint(key) if key else None
+
+    def resolve(self) -> str:
+        key = _request_api_key.get()
+        if key:
+            with self._lock:
+                self.stats["request_keys"] += 1
+            return key
+        key = self.default_key()
+        if not key:
+            with self._lock:
+                self.stats["missing"] += 1
+            raise ValueError(
+                "No Materials Project API key: set MP_API_KEY or MP_API_KEY_FILE, "
+                f"or send one in the {API_KEY_HEADER} request header"
+            )
+        return key
+
+    def snapshot(self) -> dict:
+        key = self.default_key()
+        with self._lock:
+            info = dict(self.stats)
+        info["configured"] = key is not None
+        info["source"] = "file" if self.key_file and self._file_key else ("env" if key else None)
+        info["fingerprint"] = _key_fingerprint(key) if key else None
+        return info
+
+
+class ClientPools:
+    """
+    One MPResterPool per API key, so tenants never share clients.
+
+    At most `max_pools` keys keep a pool; the least recently used is retired
+    beyond that. When the server-wide key rotates, the pool of the previous
+    key is retired straight away instead of idling until eviction.
+    """
+
+    def __init__(self, resolver: APIKeyResolver, max_pools: int = MAX_KEY_POOLS):
+        self.resolver = resolver
+        self.max_pools = max(1, max_pools)
+        self._pools: "OrderedDict[str, MPResterPool]" = OrderedDict()
+        self._default_key: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def get(self, api_key: Optional[str] = None) -> MPResterPool:
+        """Pool of `api_key`, or of the key resolved for the current call"""
+        if api_key is None:
+            api_key = self.resolver.resolve() if BACKENDS[BACKEND].requires_key else BACKEND
+        default_key = self.resolver.default_key()
+        retired = []
+        with self._lock:
+            if default_key != self._default_key:
+                if self._default_key is not None and self._default_key in self._pools:
+                    retired.append(self._pools.pop(self._default_key))
+                self._default_key = default_key
+            pool = self._pools.get(api_key)
+            if pool is None:
+                pool = self._pools[api_key] = MPResterPool(api_key)
+            self._pools.move_to_end(api_key)
+            while len(self._pools) > self.max_pools:
+                retired.append(self._pools.popitem(last=False)[1])
+        for old in retired:
+            old.retire()
+        return pool
+
+    @contextmanager
+    def client(self):
+        """Borrow a client of the current call's key; yields (mpr, reused)"""
+        with self.get().client() as borrowed:
+            yield borrowed
+
+    def average_setup_seconds(self) -> float:
+        with self._lock:
+            pools = list(self._pools.values())
+        created = sum(p.stats["created"] for p in pools)
+        total = sum(p.stats["setup_seconds_total"] for p in pools)
+        return total / created if created else 0.0
+
+    def close(self):
+        with self._lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            pool.close()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            pools = list(self._pools.items())
+        return {
+            "api_key": self.resolver.snapshot(),
+            "max_pools": self.max_pools,
+            "pools": {_key_fingerprint(key): pool.snapshot() for key, pool in pools},
+        }
+
+
+# Fixture files of the replay backend, optionally gzipped (".jsonl.gz")
+FIXTURE_SUMMARY = "summary.jsonl"
+FIXTURE_ENTRIES = "entries.jsonl"
+FIXTURE_META = "meta.json"
+
+
+def _read_jsonl(directory: str, name: str) -> List[dict]:
+    for path, opener in ((os.path.join(directory, name + ".gz"), gzip.open),
+                         (os.path.join(directory, name), open)):
+        if os.path.exists(path):
+            with opener(path, "rt") as f:
+                return [json.loads(line) for line in f if line.strip()]
+    return []
+
+
+class ReplayFixtures:
+    """
+    Summary documents and chemsys entries recorded to a fixtures directory.
+
+    summary.jsonl holds one serialized summary document per line (as stored
+    in the summary cache), entries.jsonl one ComputedEntry.as_dict() per line
+    and meta.json the database version they were recorded from. Loaded once
+    per directory and shared by all replay clients.
+    """
+
+    def __init__(self, directory: str):
+        if not os.path.isdir(directory):
+            raise ValueError(f"MP_FIXTURES_DIR '{directory}' does not exist; record fixtures first")
+        self.directory = directory
+        self.docs = _read_jsonl(directory, FIXTURE_SUMMARY)
+        self.by_id = {str(doc.get("material_id")): doc for doc in self.docs}
+        decode = _lazy_import("monty.json", "MontyDecoder")().process_decoded
+        self.entries = [decode(entry) for entry in _read_jsonl(directory, FIXTURE_ENTRIES)]
+        self.entry_elements = [frozenset(str(el) for el in e.composition.elements) for e in self.entries]
+        meta_path = os.path.join(directory, FIXTURE_META)
+        meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        self.db_version = meta.get("db_version", "replay")
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4)
+    def load(directory: str) -> "ReplayFixtures":
+        return ReplayFixtures(directory)
+
+    @staticmethod
+    def write(directory: str, docs: list, entries: list, db_version: Optional[str] = None):
+        """Record summary documents and entries in the layout `load` reads"""
+        os.makedirs(directory, exist_ok=True)
+        with gzip.open(os.path.join(directory, FIXTURE_SUMMARY + ".gz"), "wt") as f:
+            for doc in docs:
+                f.write(json.dumps(serialize_object(doc), default=str) + "\n")
+        with gzip.open(os.path.join(directory, FIXTURE_ENTRIES + ".gz"), "wt") as f:
+            for entry in entries:
+                f.write(json.dumps(entry.as_dict() if hasattr(entry, "as_dict") else entry, default=str) + "\n")
+        with open(os.path.join(directory, FIXTURE_META), "w") as f:
+            json.dump({"db_version": db_version or "replay", "recorded": datetime.now().isoformat()}, f)
+
+
+def _replay_match(doc: dict, name: str, value: Any) -> bool:
+    """Whether a serialized summary document satisfies one search filter"""
+    if name == "material_ids":
+        return doc.get("material_id") in value
+    if name == "formula":
+        formulas = value if isinstance(value, list) else [value]
+        reduced = _lazy_import("pymatgen.core", "Composition")
+        return doc.get("formula_pretty") in {reduced(f).reduced_formula for f in formulas}
+    if name == "chemsys":
+        systems = value if isinstance(value, list) else value.split(",")
+        return doc.get("chemsys") in {"-".join(sorted(c.strip().split("-"))) for c in systems}
+    if name == "elements":
+        return set(value) <= set(doc.get("elements") or ())
+    if name == "exclude_elements":
+        return not set(value) & set(doc.get("elements") or ())
+    if isinstance(value, (tuple, list)):
+        # Search parameters named after a differently named document field
+        field = {f.param: f.field for f in PROPERTY_FILTERS.values() if f.param}.get(name, name)
+        actual = doc.get(field)
+        if isinstance(actual, dict):
+            # Elastic moduli are stored as {"voigt", "reuss", "vrh"}
+            actual = actual.get("vrh")
+        return actual is not None and value[0] <= actual <= value[1]
+    if isinstance(value, bool):
+        return doc.get(name) is value
+    raise ValueError(f"The replay backend cannot filter on '{name}'")
+
+
+class _ReplaySummary:
+    def __init__(self, client: "ReplayMPRester"):
+        self._client = client
+
+    def search(self, **params) -> List[dict]:
+        """summary.search over the recorded documents, in recorded order"""
+        fields = params.pop("fields", None)
+        page, chunk_size, num_chunks = (params.pop(k, None) for k in ("_page", "chunk_size", "num_chunks"))
+        sort_fields = params.pop("_sort_fields", None)
+        fixtures = self._client.fixtures
+        if list(params) == ["material_ids"]:
+            docs = [fixtures.by_id[mid] for mid in params["material_ids"] if mid in fixtures.by_id]
+        else:
+            docs = [doc for doc in fixtures.docs if all(_replay_match(doc, k, v) for k, v in params.items())]
+        for name in reversed((sort_fields or "").split(",")):
+            if name.strip():
+                # Stable sorts from the last key; missing values order lowest, as in MongoDB
+                field = name.strip().lstrip("-")
+                docs.sort(key=lambda doc: (doc.get(field) is not None, doc.get(field) or 0),
+                          reverse=name.strip().startswith("-"))
+        if chunk_size and num_chunks:
+            start = ((page or 1) - 1) * chunk_size
+            docs = docs[start:start + chunk_size * num_chunks]
+        if fields:
+            docs = [{k: doc[k] for k in fields if k in doc} for doc in docs]
+        self._client.wait(len(docs))
+        return docs
+
+
+class _ReplayMaterials:
+    def __init__(self, client: "ReplayMPRester"):
+        self.summary = _ReplaySummary(client)
+
+
+class ReplayMPRester:
+    """
+    Offline stand-in for the parts of MPRester the tools use, served from
+    ReplayFixtures with a deterministic synthetic latency (MP_REPLAY_LATENCY_MS
+    per call plus MP_REPLAY_LATENCY_PER_DOC_MS per returned document).
+    """
+
+    def __init__(self, api_key: Optional[str] = None, directory: str = FIXTURES_DIR,
+                 latency_ms: float = REPLAY_LATENCY_MS, per_doc_ms: float = REPLAY_LATENCY_PER_DOC_MS):
+        self.fixtures = ReplayFixtures.load(os.path.abspath(directory))
+        self.db_version = self.fixtures.db_version
+        self.latency = latency_ms / 1000
+        self.per_doc = per_doc_ms / 1000
+        self.session = True
+        self.materials = _ReplayMaterials(self)
+
+    def wait(self, num_docs: int):
+        delay = self.latency + num_docs * self.per_doc
+        if delay > 0:
+            time.sleep(delay)
+
+    def get_structure_by_material_id(self, material_id: str):
+        doc = self.fixtures.by_id.get(material_id)
+        if doc is None or doc.get("structure") is None:
+            raise ValueError(f"No structure recorded for {material_id}")
+        self.wait(1)
+        return _as_structure(doc["structure"])
+
+    def get_entries_in_chemsys(self, chemsys) -> list:
+        elements = set(chemsys.split("-") if isinstance(chemsys, str) else chemsys)
+        entries = [e for e, els in zip(self.fixtures.entries, self.fixtures.entry_elements) if els <= elements]
+        self.wait(len(entries))
+        return entries
+
+    def __exit__(self, *exc):
         return None
-    if isinstance(obj, (str, int, float, bool)):
-        return obj
-    if isinstance(obj, (list, tuple)):
-        return [serialize_object(item) for item in obj]
-    if isinstance(obj, dict):
-        return {str(k): serialize_object(v) for k, v in obj.items()}
 
-    # Handle numpy arrays
-    if hasattr(obj, 'tolist'):
-        return obj.tolist()
 
-    # Handle pymatgen Element objects - extract symbol directly
-    if hasattr(obj, 'symbol') and hasattr(obj, 'Z'):
-        # This is likely a pymatgen Element object
-        return str(obj.symbol)
+class Backend(NamedTuple):
+    """How the client pool creates upstream clients"""
+    create: Callable[[str], Any]
+    requires_key: bool
+
+
+def _live_client(api_key: str) -> Any:
+    return _lazy_import("mp_api.client", "MPRester")(api_key)
+
+
+BACKENDS = {
+    "live": Backend(_live_client, requires_key=True),
+    "replay": Backend(ReplayMPRester, requires_key=False),
+}
+
+if BACKEND not in BACKENDS:
+    raise ValueError(f"MP_BACKEND must be one of {list(BACKENDS)}")
+
+
+class ToolMetrics:
+    """Per-tool latency counters, including client setup time"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tools = {}
+
+    def record(self, tool: str, total: float, setup: float, reused: bool):
+        with self._lock:
+            m = self._tools.setdefault(tool, {
+                "calls": 0,
+                "total_seconds": 0.0,
+                "max_seconds": 0.0,
+                "setup_seconds": 0.0,
+                "pooled_calls": 0,
+            })
+            m["calls"] += 1
+            m["total_seconds"] += total
+            m["max_seconds"] = max(m["max_seconds"], total)
+            m["setup_seconds"] += setup
+            if reused:
+                m["pooled_calls"] += 1
+
+    def snapshot(self, average_setup_seconds: float) -> dict:
+        """Summarise latency; saved setup is estimated from the pool's mean client construction time"""
+        with self._lock:
+            tools = {name: dict(m) for name, m in self._tools.items()}
+        summary = {}
+        for name, m in tools.items():
+            calls = m["calls"]
+            summary[name] = {
+                "calls": calls,
+                "mean_ms": round(m["total_seconds"] / calls * 1000, 2),
+                "max_ms": round(m["max_seconds"] * 1000, 2),
+                "mean_setup_ms": round(m["setup_seconds"] / calls * 1000, 2),
+                "pooled_calls": m["pooled_calls"],
+                "estimated_setup_saved_ms": round(m["pooled_calls"] * average_setup_seconds * 1000, 2),
+            }
+        return summary
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical upstream requests.
+
+    The first caller of `do` for a (kind, key) pair runs `fn`; callers
+    arriving while it is in flight wait for and share its result, which must
+    therefore be treated as read-only. Requests are only shared within the
+    `scope` of the calling tenant (its API key fingerprint), so a call with a
+    missing or revoked key is never answered with another key's result. A
+    failure is not shared: waiting callers then run `fn` themselves, so one
+    tenant's bad key or a transient error does not fail everyone else's call.
+    """
+
+    def __init__(self, scope: Optional[Callable[[], Any]] = None):
+        self._scope = scope
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.stats = {}
+
+    def _stats(self, kind: str) -> dict:
+        return self.stats.setdefault(kind, {"upstream": 0, "coalesced": 0, "retried": 0})
+
+    def do(self, kind: str, key: Any, fn: Callable[[], Any]) -> tuple:
+        """Returns (result, shared); `shared` is True when another caller's request was reused"""
+        if self._scope is not None:
+            key = (self._scope(), key)
+        with self._lock:
+            future = self._calls.get((kind, key))
+            if future is None:
+                future = self._calls[(kind, key)] = Future()
+                self._stats(kind)["upstream"] += 1
+                leader = True
+            else:
+                self._stats(kind)["coalesced"] += 1
+                leader = False
+
+        if not leader:
+            try:
+                return future.result(), True
+            except Exception:
+                with self._lock:
+                    self._stats(kind)["retried"] += 1
+                return fn(), False
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._calls[(kind, key)]
+        return result, False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = {kind: dict(s) for kind, s in self.stats.items()}
+            in_flight = {}
+            for kind, _ in self._calls:
+                in_flight[kind] = in_flight.get(kind, 0) + 1
+        for kind, s in stats.items():
+            s["in_flight"] = in_flight.get(kind, 0)
+        return stats
+
+
+# Client-side rate limiting of Materials Project calls: token bucket refilled
+# at MP_RATE_LIMIT calls per second (0 disables it) holding up to MP_RATE_BURST
+RATE_LIMIT = float(os.environ.get("MP_RATE_LIMIT", "20"))
+RATE_BURST = float(os.environ.get("MP_RATE_BURST", "20"))
+# Retries of calls failing with 429 or a 5xx status, after jittered exponential backoff
+RETRY_MAX = int(os.environ.get("MP_RETRY_MAX", "4"))
+RETRY_BASE_SECONDS = float(os.environ.get("MP_RETRY_BASE", "0.5"))
+RETRY_MAX_SECONDS = float(os.environ.get("MP_RETRY_MAX_DELAY", "30"))
+
+# Scheduling priority of each tool's upstream calls (lower is served first);
+# tools not listed are interactive
+PRIORITY_CLASSES = {"interactive": 0, "bulk": 1}
+TOOL_PRIORITIES = {
+    "export_to_excel": "bulk",
+    "export_materials": "bulk",
+    "get_structures": "bulk",
+    "sync_index": "bulk",
+}
+
+_STATUS_PATTERN = re.compile(r"status code (\d{3})|too many (\d{3}) error responses")
+
+
+def _upstream_status(error: Exception) -> Optional[int]:
+    """HTTP status behind an mp-api or requests error, if there is one"""
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return int(status)
+    match = _STATUS_PATTERN.search(str(error))
+    return int(match.group(1) or match.group(2)) if match else None
+
+
+class RequestScheduler:
+    """
+    Central scheduler of every Materials Project call.
+
+    Calls draw from a token bucket, one token per client call (an mp-api
+    call may page through a few HTTP requests internally). Waiting calls are
+    served in priority order, then FIFO, so interactive lookups overtake
+    queued bulk exports. Calls failing with 429 or 5xx are retried after a
+    jittered exponential backoff (or the server's Retry-After); a 429 also
+    halves the refill rate, which then recovers additively on success.
+    """
+
+    def __init__(self, rate: float = RATE_LIMIT, burst: float = RATE_BURST, max_retries: int = RETRY_MAX,
+                 base_delay: float = RETRY_BASE_SECONDS, max_delay: float = RETRY_MAX_SECONDS):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._waiting: list = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._classes = {}
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority: int) -> float:
+        """Block until this call may go upstream; returns the seconds waited"""
+        if self.max_rate <= 0:
+            return 0.0
+        start = time.monotonic()
+        with self._cond:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiting, ticket)
+            while True:
+                self._refill(time.monotonic())
+                if self._waiting[0] == ticket and self._tokens >= 1:
+                    heapq.heappop(self._waiting)
+                    self._tokens -= 1
+                    # Let the next caller in line check the bucket
+                    self._cond.notify_all()
+                    break
+                # The head of the queue sleeps until its token is due; the rest until woken
+                self._cond.wait((1 - self._tokens) / self.rate if self._waiting[0] == ticket else None)
+        return time.monotonic() - start
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = getattr(getattr(error, "response", None), "headers", None) or {}
+        try:
+            return min(self.max_delay, float(retry_after.get("Retry-After")))
+        except (TypeError, ValueError):
+            pass
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _adapt(self, throttled: bool):
+        if self.max_rate <= 0:
+            return
+        with self._cond:
+            if throttled:
+                self.rate = max(self.max_rate / 16, self.rate / 2)
+                self._tokens = min(self._tokens, 0.0)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def _stats(self, tool: str) -> dict:
+        priority = TOOL_PRIORITIES.get(tool, "interactive")
+        return self._classes.setdefault(priority, {
+            "calls": 0,
+            "retries": 0,
+            "throttled": 0,
+            "server_errors": 0,
+            "failed": 0,
+            "wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "upstream_seconds": 0.0,
+            "max_upstream_seconds": 0.0,
+            "backoff_seconds": 0.0,
+        })
+
+    def call(self, tool: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run one upstream call of `tool` under the rate budget, retrying 429/5xx"""
+        priority = PRIORITY_CLASSES[TOOL_PRIORITIES.get(tool, "interactive")]
+        attempt = 0
+        while True:
+            waited = self.acquire(priority)
+            start = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+                error = None
+            except Exception as e:
+                result, error = None, e
+            elapsed = time.monotonic() - start
+            status = _upstream_status(error) if error is not None else None
+            retry = status is not None and (status == 429 or status >= 500) and attempt < self.max_retries
+            delay = self._backoff(attempt, error) if retry else 0.0
+            with self._cond:
+                stats = self._stats(tool)
+                stats["calls"] += 1
+                stats["wait_seconds"] += waited
+                stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+                stats["upstream_seconds"] += elapsed
+                stats["max_upstream_seconds"] = max(stats["max_upstream_seconds"], elapsed)
+                if status == 429:
+                    stats["throttled"] += 1
+                elif status is not None and status >= 500:
+                    stats["server_errors"] += 1
+                if retry:
+                    stats["retries"] += 1
+                    stats["backoff_seconds"] += delay
+                elif error is not None:
+                    stats["failed"] += 1
+            if error is None or status == 429:
+                self._adapt(throttled=status == 429)
+            if not retry:
+                if error is not None:
+                    raise error
+                return result
+            time.sleep(delay)
+            attempt += 1
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            self._refill(time.monotonic())
+            classes = {name: dict(s) for name, s in self._classes.items()}
+            info = {
+                "rate_limit": self.max_rate,
+                "current_rate": round(self.rate, 3),
+                "burst": self.burst,
+                "tokens": round(self._tokens, 3),
+                "waiting": len(self._waiting),
+            }
+        for s in classes.values():
+            calls = s["calls"]
+            s["mean_wait_ms"] = round(s.pop("wait_seconds") / calls * 1000, 2) if calls else 0.0
+            s["mean_upstream_ms"] = round(s.pop("upstream_seconds") / calls * 1000, 2) if calls else 0.0
+            s["max_wait_ms"] = round(s.pop("max_wait_seconds") * 1000, 2)
+            s["max_upstream_ms"] = round(s.pop("max_upstream_seconds") * 1000, 2)
+            s["backoff_seconds"] = round(s["backoff_seconds"], 3)
+        info["classes"] = classes
+        return info
+
+
+class _ScheduledClient:
+    """
+    View of a pooled client whose method calls, at any depth (e.g.
+    mpr.materials.summary.search), go through the request scheduler
+    """
+
+    _PLAIN = (str, bytes, int, float, bool, type(None), dict, list, tuple, set, frozenset)
+
+    def __init__(self, target: Any, tool: str):
+        self._target = target
+        self._tool = tool
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._target, name)
+        if callable(value):
+            return functools.partial(_scheduler.call, self._tool, value)
+        if isinstance(value, self._PLAIN):
+            return value
+        return _ScheduledClient(value, self._tool)
+
+
+# Maximum number of tool calls executing blocking work at once
+MAX_CONCURRENCY = int(os.environ.get("MP_MAX_CONCURRENCY", "8"))
+
+# Pagination: documents per upstream page and pages fetched ahead concurrently
+PAGE_SIZE = int(os.environ.get("MP_PAGE_SIZE", "500"))
+PAGE_CONCURRENCY = int(os.environ.get("MP_PAGE_CONCURRENCY", "4"))
+
+# Bulk structure retrieval: material IDs per upstream query and symmetry analysis processes
+STRUCTURE_CHUNK_SIZE = int(os.environ.get("MP_STRUCTURE_CHUNK_SIZE", "100"))
+# (one core is left to the server process; single-core hosts analyse in threads)
+SYMMETRY_WORKERS = int(os.environ.get("MP_SYMMETRY_WORKERS", str(min(4, (os.cpu_count() or 1) - 1))))
+
+
+class BlockingDispatcher:
+    """
+    Runs blocking tool bodies on a bounded thread pool so one slow
+    Materials Project query does not stall the event loop.
+
+    Calls beyond `max_workers` wait in the executor queue; per-tool queue
+    depth and queue wait time are tracked for diagnostics.
+    """
+
+    def __init__(self, max_workers: int = MAX_CONCURRENCY):
+        self.max_workers = max(1, max_workers)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._tools = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="mp-tool"
+                )
+            return self._executor
+
+    def _stats(self, tool: str) -> dict:
+        return self._tools.setdefault(tool, {
+            "queued": 0,
+            "running": 0,
+            "max_queue_depth": 0,
+            "completed": 0,
+            "wait_seconds": 0.0,
+        })
+
+    def submit(self, tool: str, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Queue `fn` on the worker pool and return its future"""
+        # Carry context variables (e.g. the calling tool) into the worker thread
+        ctx = contextvars.copy_context()
+        enqueued = time.perf_counter()
+        with self._lock:
+            stats = self._stats(tool)
+            stats["queued"] += 1
+            stats["max_queue_depth"] = max(stats["max_queue_depth"], stats["queued"])
+
+        def call():
+            with self._lock:
+                stats["queued"] -= 1
+                stats["running"] += 1
+                stats["wait_seconds"] += time.perf_counter() - enqueued
+            try:
+                return ctx.run(fn, *args, **kwargs)
+            finally:
+                with self._lock:
+                    stats["running"] -= 1
+                    stats["completed"] += 1
+
+        def on_done(future: Future):
+            if future.cancelled():
+                with self._lock:
+                    stats["queued"] -= 1
+
+        future = self._get_executor().submit(call)
+        future.add_done_callback(on_done)
+        return future
+
+    async def run(self, tool: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        return await asyncio.wrap_future(self.submit(tool, fn, *args, **kwargs))
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            tools = {name: dict(m) for name, m in self._tools.items()}
+        for m in tools.values():
+            started = m["completed"] + m["running"]
+            m["mean_queue_wait_ms"] = round(m.pop("wait_seconds") / started * 1000, 2) if started else 0.0
+        return {"max_workers": self.max_workers, "tools": tools}
+
+
+class AnalysisProcessPool:
+    """
+    Lazily started process pool for CPU-bound analysis that would otherwise
+    hold the GIL. Workers are spawned rather than forked, since the server
+    process already runs client and worker threads. With `max_workers` 0
+    callers run the analysis in their own thread.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max(0, max_workers)
+        self._executor = None
+        self._lock = threading.Lock()
+        self.stats = {"submitted": 0, "restarts": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0
+
+    def submit(self, fn: Callable[..., Any], *args) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            self.stats["submitted"] += 1
+            return self._executor.submit(fn, *args)
+
+    def restart(self):
+        """Drop a pool broken by a crashed worker; the next submit starts a fresh one"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self.stats["restarts"] += 1
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            info = dict(self.stats)
+            info["running"] = self._executor is not None
+        info["max_workers"] = self.max_workers
+        return info
+
+
+# On-disk summary document cache
+CACHE_ENABLED = os.environ.get("MP_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+CACHE_DIR = os.environ.get(
+    "MP_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "mcp-materials-project")
+)
+CACHE_MAX_MB = float(os.environ.get("MP_CACHE_MAX_MB", "256"))
+CACHE_TTL = float(os.environ.get("MP_CACHE_TTL", str(7 * 24 * 3600)))
+CACHE_VERSION_CHECK_INTERVAL = float(os.environ.get("MP_CACHE_VERSION_CHECK", "3600"))
+
+
+class SummaryCache:
+    """
+    SQLite-backed cache of serialized summary documents.
+
+    Documents are content-addressed by material_id plus the requested field
+    set; a separate query index maps normalized search parameters to the
+    ordered material IDs they returned. Every entry is tagged with the
+    Materials Project database version and the whole cache is dropped when
+    a new release is seen. Entries also expire after `ttl` seconds, and the
+    least recently used ones, across all tables, are evicted once the cache
+    exceeds `max_bytes`.
+
+    Symmetry analyses are kept in their own small table, keyed by
+    material_id or structure hash plus tolerances. They do not expire;
+    only the material-keyed ones are dropped with a new release.
+    """
+
+    # Tables whose entries count against `max_bytes`
+    TABLES = ("docs", "queries", "symmetry")
+
+    def __init__(self, path: Optional[str], max_bytes: int, ttl: float):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.db_version = None
+        self._version_checked = 0.0
+        self._lock = threading.Lock()
+        self._conn = None
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "query_hits": 0,
+            "query_misses": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "symmetry_hits": 0,
+            "symmetry_misses": 0,
+        }
+        if path:
+            try:
+                self._open(path)
+            except (OSError, sqlite3.Error):
+                self._conn = None
+
+    def _open(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            "key TEXT PRIMARY KEY, material_id TEXT, db_version TEXT, payload TEXT, "
+            "size INTEGER, created REAL, last_access REAL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS queries ("
+            "key TEXT PRIMARY KEY, material_ids TEXT, db_version TEXT, "
+            "size INTEGER, created REAL, last_access REAL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS symmetry ("
+            "key TEXT PRIMARY KEY, db_version TEXT, payload TEXT, created REAL, "
+            "size INTEGER, last_access REAL)"
+        )
+        # Symmetry tables written before it was size-bounded lack the LRU columns
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(symmetry)")}
+        if "size" not in columns:
+            conn.execute("ALTER TABLE symmetry ADD COLUMN size INTEGER")
+            conn.execute("ALTER TABLE symmetry ADD COLUMN last_access REAL")
+            conn.execute("UPDATE symmetry SET size = LENGTH(payload), last_access = created")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        for table in self.TABLES:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_lru ON {table} (last_access)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'db_version'").fetchone()
+        self.db_version = row[0] if row else None
+        self._conn = conn
+
+    @property
+    def enabled(self) -> bool:
+        return self._conn is not None
+
+    @staticmethod
+    def doc_key(material_id: str, fields: List[str]) -> str:
+        raw = f"{material_id}|{','.join(sorted(fields))}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    @staticmethod
+    def query_key(search_params: dict) -> str:
+        """Hash of the search parameters with order-insensitive values normalized"""
+        normalized = {}
+        for k, v in search_params.items():
+            if isinstance(v, (list, set)) and k != "material_ids":
+                v = sorted(str(x) for x in v)
+            elif isinstance(v, tuple):
+                v = list(v)
+            normalized[k] = v
+        raw = json.dumps(normalized, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def version_check_due(self) -> bool:
+        return self.enabled and time.monotonic() - self._version_checked > CACHE_VERSION_CHECK_INTERVAL
+
+    def set_db_version(self, db_version: Optional[str]):
+        """Record the live database version, invalidating entries from older releases"""
+        if not self.enabled or not db_version:
+            return
+        with self._lock:
+            self._version_checked = time.monotonic()
+            if db_version == self.db_version:
+                return
+            if self.db_version is not None:
+                self.stats["invalidations"] += 1
+            self._conn.execute("DELETE FROM docs")
+            self._conn.execute("DELETE FROM queries")
+            # Analyses of a material's structure are tied to a release; those keyed by structure hash are not
+            self._conn.execute("DELETE FROM symmetry WHERE key LIKE 'id:%'")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('db_version', ?)", (db_version,)
+            )
+            self.db_version = db_version
+
+    def _fresh(self, created: float, db_version: Optional[str]) -> bool:
+        return db_version == self.db_version and time.time() - created <= self.ttl
+
+    def _lookup(self, key: str) -> Optional[dict]:
+        row = self._conn.execute(
+            "SELECT payload, created, db_version FROM docs WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if not self._fresh(row[1], row[2]):
+            self._conn.execute("DELETE FROM docs WHERE key = ?", (key,))
+            return None
+        self._conn.execute("UPDATE docs SET last_access = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def get_docs(self, material_ids: List[str], fields: List[str]) -> dict:
+        """Return {material_id: doc} for cached IDs; full-field entries also serve projections"""
+        found = {}
+        if not self.enabled:
+            return found
+        with self._lock:
+            for mid in material_ids:
+                doc = self._lookup(self.doc_key(mid, fields))
+                if doc is None and sorted(fields) != sorted(SUMMARY_FIELDS):
+                    doc = self._lookup(self.doc_key(mid, SUMMARY_FIELDS))
+                    if doc is not None:
+                        doc = {k: v for k, v in doc.items() if k in fields}
+                if doc is None:
+                    self.stats["misses"] += 1
+                else:
+                    self.stats["hits"] += 1
+                    found[mid] = doc
+        return found
+
+    def put_docs(self, docs: List[dict], fields: List[str]):
+        if not self.enabled or not docs:
+            return
+        now = time.time()
+        with self._lock:
+            for doc in docs:
+                mid = str(doc.get("material_id", ""))
+                payload = json.dumps(doc, default=str)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (self.doc_key(mid, fields), mid, self.db_version, payload, len(payload), now, now)
+                )
+            self._evict()
+
+    def get_query(self, key: str, fields: List[str]) -> Optional[List[dict]]:
+        """Resolve a cached query to its documents; None if any part is missing"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT material_ids, created, db_version FROM queries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and not self._fresh(row[1], row[2]):
+                self._conn.execute("DELETE FROM queries WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.stats["query_misses"] += 1
+                return None
+            ids = json.loads(row[0])
+        docs = self.get_docs(ids, fields)
+        with self._lock:
+            if len(docs) < len(ids):
+                self.stats["query_misses"] += 1
+                return None
+            self.stats["query_hits"] += 1
+            self._conn.execute("UPDATE queries SET last_access = ? WHERE key = ?", (time.time(), key))
+        return [docs[mid] for mid in ids]
+
+    def put_query(self, key: str, docs: List[dict], fields: List[str]):
+        if not self.enabled:
+            return
+        self.put_docs(docs, fields)
+        ids = json.dumps([str(doc.get("material_id", "")) for doc in docs])
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO queries VALUES (?, ?, ?, ?, ?, ?)",
+                (key, ids, self.db_version, len(ids), now, now)
+            )
+            self._evict()
+
+    def get_symmetry(self, keys: List[str]) -> dict:
+        """Return {key: symmetry} for the cached keys"""
+        found = {}
+        if not self.enabled or not keys:
+            return found
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute("SELECT payload FROM symmetry WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    found[key] = json.loads(row[0])
+                    self._conn.execute("UPDATE symmetry SET last_access = ? WHERE key = ?", (now, key))
+            self.stats["symmetry_hits"] += len(found)
+            self.stats["symmetry_misses"] += len(keys) - len(found)
+        return found
+
+    def put_symmetry(self, results: dict):
+        if not self.enabled or not results:
+            return
+        now = time.time()
+        rows = []
+        for key, value in results.items():
+            payload = json.dumps(value)
+            rows.append((key, self.db_version, payload, now, len(payload), now))
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO symmetry VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._evict()
+
+    def _size(self) -> int:
+        return sum(
+            self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+            for table in self.TABLES
+        )
+
+    def _evict(self):
+        """Drop least recently used entries of any table until the cache fits its budget"""
+        total = self._size()
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute(" UNION ALL ".join(
+            f"SELECT '{table}', key, COALESCE(size, 0), last_access FROM {table}" for table in self.TABLES
+        ) + " ORDER BY 4").fetchall()
+        victims = {table: [] for table in self.TABLES}
+        for table, key, size, _ in rows:
+            if total <= target:
+                break
+            victims[table].append((key,))
+            total -= size
+        for table, keys in victims.items():
+            self._conn.executemany(f"DELETE FROM {table} WHERE key = ?", keys)
+            self.stats["evictions"] += len(keys)
+
+    def snapshot(self) -> dict:
+        info = {"enabled": self.enabled, "path": self.path}
+        with self._lock:
+            info.update(self.stats)
+            if self.enabled:
+                info["documents"] = self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+                info["queries"] = self._conn.execute("SELECT COUNT(*) FROM queries").fetchone()[0]
+                info["symmetry"] = self._conn.execute("SELECT COUNT(*) FROM symmetry").fetchone()[0]
+                info["size_mb"] = round(self._size() / 1e6, 3)
+            info["db_version"] = self.db_version
+        lookups = info["hits"] + info["misses"]
+        info["hit_rate"] = round(info["hits"] / lookups, 3) if lookups else None
+        return info
+
+
+# Opt-in local snapshot of the summary collection's scalar fields, refreshed by
+# `mcp-materials-project sync-index`. With MP_LOCAL_INDEX=1 (or per call)
+# search_materials_by_property answers range queries from it.
+LOCAL_INDEX = os.environ.get("MP_LOCAL_INDEX", "0").lower() in ("1", "true", "yes")
+INDEX_PATH = os.environ.get("MP_INDEX_PATH", os.path.join(CACHE_DIR, "materials_index.npz"))
+# Material IDs per upstream query when syncing changed materials
+INDEX_SYNC_CHUNK = int(os.environ.get("MP_INDEX_SYNC_CHUNK", "1000"))
+
+# Range-searchable columns of the local index: column -> summary field
+# (elastic moduli are stored by their VRH average)
+INDEX_NUMERIC = {
+    "band_gap": "band_gap",
+    "formation_energy_per_atom": "formation_energy_per_atom",
+    "energy_above_hull": "energy_above_hull",
+    "density": "density",
+    "volume": "volume",
+    "bulk_modulus": "bulk_modulus",
+    "shear_modulus": "shear_modulus",
+    "total_magnetization": "total_magnetization",
+    "nelements": "nelements",
+}
+INDEX_FLAGS = ("is_stable", "is_metal", "is_magnetic")
+INDEX_STRINGS = ("material_id", "formula_pretty", "chemsys", "last_updated")
+CRYSTAL_SYSTEMS = ("Triclinic", "Monoclinic", "Orthorhombic", "Tetragonal", "Trigonal", "Hexagonal", "Cubic")
+INDEX_FIELDS = ["material_id", "formula_pretty", "chemsys", "elements", "symmetry", "last_updated",
+                *INDEX_NUMERIC.values(), *INDEX_FLAGS]
+
+# Output columns the index can build exactly, without fetching documents
+LOCAL_INDEX_COLUMNS = {
+    "Material_ID", "Formula", "Chemical_System", "N_Elements", "Band_Gap_eV", "Formation_Energy_eV_Atom",
+    "Energy_Above_Hull_eV_Atom", "Is_Stable", "Is_Metal", "Is_Magnetic", "Density_g_cm3", "Volume_A3",
+    "Bulk_Modulus_VRH_GPa", "Shear_Modulus_VRH_GPa", "Total_Magnetization", "Space_Group_Symbol",
+    "Crystal_System",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _element_bit(symbol: str) -> int:
+    return 1 << (_lazy_import("pymatgen.core", "Element")(symbol).Z - 1)
+
+
+def _elements_mask(elements: Any) -> tuple:
+    """(low, high) 64-bit words of an element set, bit Z-1 per element"""
+    mask = 0
+    for symbol in elements or ():
+        mask |= _element_bit(str(symbol))
+    return mask & 0xFFFFFFFFFFFFFFFF, mask >> 64
+
+
+def _material_id_key(material_id: str) -> tuple:
+    """Natural sort key: mp-149 before mp-1234"""
+    prefix, _, number = material_id.rpartition("-")
+    return (prefix, int(number)) if number.isdigit() else (material_id, -1)
+
+
+def _index_columns(docs: List[dict]) -> dict:
+    """Index column arrays of serialized summary documents"""
+    def number(value):
+        if isinstance(value, dict):
+            value = value.get("vrh")
+        return np.nan if value is None else float(value)
+
+    def flag(value):
+        return -1 if value is None else int(bool(value))
+
+    columns = {name: np.array([str(d.get(name) or "") for d in docs], dtype=str) for name in INDEX_STRINGS}
+    for column, field in INDEX_NUMERIC.items():
+        columns[column] = np.array([number(d.get(field)) for d in docs], dtype=np.float64)
+    for name in INDEX_FLAGS:
+        columns[name] = np.array([flag(d.get(name)) for d in docs], dtype=np.int8)
+    masks = [_elements_mask(d.get("elements")) for d in docs]
+    columns["elements_lo"] = np.array([m[0] for m in masks], dtype=np.uint64)
+    columns["elements_hi"] = np.array([m[1] for m in masks], dtype=np.uint64)
+    symmetry = [d.get("symmetry") or {} for d in docs]
+    columns["spacegroup"] = np.array([str(s.get("symbol") or "") for s in symmetry], dtype=str)
+    columns["crystal_system"] = np.array([
+        CRYSTAL_SYSTEMS.index(str(s.get("crystal_system")).capitalize())
+        if str(s.get("crystal_system")).capitalize() in CRYSTAL_SYSTEMS else -1
+        for s in symmetry
+    ], dtype=np.int8)
+    return columns
+
+
+class LocalIndex:
+    """
+    Columnar snapshot of the summary collection's scalar fields in one .npz
+    file: a row per material (ordered by ID), float64 property columns with
+    NaN for missing values, a 2 x 64-bit element bitmask, and per numeric
+    column an argsort order so a range is two binary searches.
+
+    The file is re-read when its mtime changes, so a `sync-index` run by
+    another process is picked up without restarting the server.
+    """
+
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._data: Optional[dict] = None
+        self._sorted: dict = {}
+        self.meta: dict = {}
+        self.stats = {"loads": 0, "queries": 0, "rows_matched": 0, "query_seconds": 0.0}
+
+    def load(self) -> Optional[dict]:
+        """The index arrays, or None when no index has been synced"""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return None
+        with self._lock:
+            if mtime != self._mtime:
+                with np.load(self.path) as z:
+                    data = {name: z[name] for name in z.files}
+                self.meta = json.loads(str(data.pop("meta")))
+                # Sorted copies of the numeric columns for searchsorted
+                self._sorted = {c: data[c][data["order_" + c]] for c in INDEX_NUMERIC if c in data}
+                self._data, self._mtime = data, mtime
+                self.stats["loads"] += 1
+            return self._data
+
+    def supports(self, column: str) -> bool:
+        return (column in INDEX_NUMERIC or column in INDEX_FLAGS) and self.load() is not None
+
+    def _bounds(self, column: str, low: Optional[float], high: Optional[float]) -> tuple:
+        """Slice of the column's sort order holding values in [low, high] (None is open)"""
+        values = self._sorted[column]
+        first = 0 if low is None else np.searchsorted(values, low, "left")
+        # NaN sorts last, so an open upper bound stops at the first missing value
+        last = np.searchsorted(values, np.inf if high is None else high, "right")
+        return first, max(first, last)
+
+    def selectivity(self, column: str, constraint: Any) -> Optional[float]:
+        """Fraction of indexed materials satisfying a (low, high) range or a flag, or None"""
+        data = self.load()
+        if data is None or not len(data["material_id"]):
+            return None
+        if column in INDEX_FLAGS:
+            return float(np.count_nonzero(data[column] == int(constraint))) / len(data[column])
+        first, last = self._bounds(column, *constraint)
+        return (last - first) / len(data[column])
+
+    def query(
+        self,
+        ranges: Optional[dict] = None,
+        elements: Optional[List[str]] = None,
+        flags: Optional[dict] = None
+    ) -> np.ndarray:
+        """
+        Row numbers (in material ID order) matching every (low, high) range
+        and flag and containing `elements`. Ranges are intersected smallest
+        first, so the cost follows the most selective one.
+        """
+        start = time.perf_counter()
+        data = self.load()
+        if data is None:
+            raise ValueError("No local index; run `mcp-materials-project sync-index` first")
+        spans = sorted(
+            ((column, *self._bounds(column, *bounds)) for column, bounds in (ranges or {}).items()),
+            key=lambda span: span[2] - span[1]
+        )
+        rows = None
+        for column, first, last in spans:
+            hits = data["order_" + column][first:last]
+            rows = np.sort(hits) if rows is None else np.intersect1d(rows, hits, assume_unique=True)
+            if not len(rows):
+                break
+        if rows is None:
+            rows = np.arange(len(data["material_id"]))
+        for column, value in (flags or {}).items():
+            rows = rows[data[column][rows] == int(value)]
+        if elements:
+            low, high = (np.uint64(word) for word in _elements_mask(elements))
+            keep = ((data["elements_lo"][rows] & low) == low) & ((data["elements_hi"][rows] & high) == high)
+            rows = rows[keep]
+        with self._lock:
+            self.stats["queries"] += 1
+            self.stats["rows_matched"] += len(rows)
+            self.stats["query_seconds"] += time.perf_counter() - start
+        return rows
+
+    def rank(self, rows: np.ndarray, column: str, descending: bool = False) -> np.ndarray:
+        """`rows` ordered by `column`, ties in material ID order, without missing values"""
+        values = self.load()[column][rows]
+        keep = ~np.isnan(values)
+        rows, values = rows[keep], values[keep]
+        return rows[np.argsort(-values if descending else values, kind="stable")]
+
+    def documents(self, rows: np.ndarray) -> List[dict]:
+        """Summary-shaped documents of `rows` holding the indexed fields"""
+        data = self.load()
+        docs = []
+        for row in rows.tolist():
+            doc = {name: data[name][row].item() or None for name in INDEX_STRINGS}
+            for column, field in INDEX_NUMERIC.items():
+                value = data[column][row].item()
+                value = None if value != value else value
+                doc[field] = {"vrh": value} if field in ("bulk_modulus", "shear_modulus") and value is not None else value
+            if doc["nelements"] is not None:
+                doc["nelements"] = int(doc["nelements"])
+            for name in INDEX_FLAGS:
+                value = data[name][row].item()
+                doc[name] = None if value < 0 else bool(value)
+            code = data["crystal_system"][row].item()
+            doc["symmetry"] = {
+                "symbol": data["spacegroup"][row].item() or None,
+                "crystal_system": CRYSTAL_SYSTEMS[code] if code >= 0 else None,
+            }
+            docs.append(doc)
+        return docs
+
+    def write(self, columns: dict, meta: dict):
+        """Order rows by material ID, build the sort orders and replace the file atomically"""
+        order = sorted(range(len(columns["material_id"])), key=lambda i: _material_id_key(columns["material_id"][i]))
+        order = np.array(order, dtype=np.int64)
+        columns = {name: values[order] for name, values in columns.items()}
+        for column in INDEX_NUMERIC:
+            columns["order_" + column] = np.argsort(columns[column], kind="stable").astype(np.int32)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, meta=np.array(json.dumps(meta)), **columns)
+        os.replace(tmp, self.path)
+
+    def sync(self, tool: str = "sync_index", full: bool = False) -> dict:
+        """
+        Refresh the index from Materials Project: list every material's
+        last_updated, fetch the index fields of new or changed materials only
+        and drop materials that no longer exist.
+        """
+        start = time.perf_counter()
+        existing = None if full else self.load()
+        with _mp_session(tool) as mpr:
+            db_version = getattr(mpr, "db_version", None)
+            listing = [serialize_object(doc) for doc in mpr.materials.summary.search(fields=["material_id", "last_updated"])]
+        current = {str(doc.get("material_id")): str(doc.get("last_updated") or "") for doc in listing}
+
+        known, updated = {}, []
+        if existing is not None:
+            known = {mid: row for row, mid in enumerate(existing["material_id"].tolist())}
+            updated = existing["last_updated"].tolist()
+        changed = [mid for mid, stamp in current.items() if mid not in known or updated[known[mid]] != stamp]
+        unchanged = set(current).difference(changed)
+        kept = np.array(sorted(known[mid] for mid in unchanged if mid in known), dtype=np.int64)
+
+        docs = []
+        for i in range(0, len(changed), max(1, INDEX_SYNC_CHUNK)):
+            with _mp_session(tool) as mpr:
+                docs.extend(serialize_object(doc) for doc in mpr.materials.summary.search(
+                    material_ids=changed[i:i + INDEX_SYNC_CHUNK], fields=INDEX_FIELDS
+                ))
+        fresh = _index_columns(docs)
+        if existing is not None and len(kept):
+            columns = {name: np.concatenate([existing[name][kept], fresh[name]]) for name in fresh}
+        else:
+            columns = fresh
+
+        meta = {"version": 1, "db_version": db_version, "synced": datetime.now().isoformat()}
+        self.write(columns, meta)
+        return {
+            "path": self.path,
+            "materials": len(columns["material_id"]),
+            "fetched": len(docs),
+            "unchanged": len(kept),
+            "removed": len(set(known).difference(current)),
+            "db_version": db_version,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+
+    def snapshot(self) -> dict:
+        data = self.load()
+        with self._lock:
+            info = dict(self.stats)
+        info["query_seconds"] = round(info["query_seconds"], 4)
+        info["enabled"] = LOCAL_INDEX
+        info["path"] = self.path
+        info["materials"] = None if data is None else len(data["material_id"])
+        info["synced"] = self.meta.get("synced")
+        info["db_version"] = self.meta.get("db_version")
+        return info
+
+
+# In-memory phase diagram cache
+PD_CACHE_SIZE = int(os.environ.get("MP_PD_CACHE_SIZE", "16"))
+
+
+def _entry_elements(entry: Any) -> frozenset:
+    return frozenset(el.symbol for el in entry.composition.elements)
+
+
+class _PhaseDiagramRecord:
+    """Entries of one chemical system and, once built, their convex hull and per-entry analysis"""
+
+    # Candidate x facet x element barycentric weights evaluated per chunk
+    EVALUATION_CHUNK = 4_000_000
+
+    def __init__(self, entries: list, fetch_seconds: float, db_version: Optional[str]):
+        self.entries = entries
+        self.fetch_seconds = fetch_seconds
+        self.db_version = db_version
+        self.created = time.time()
+        self.diagram = None
+        self.analysis = None
+        self.hull_seconds = 0.0
+        self.decomposition_seconds = 0.0
+        self._facets = None
+        self._lock = threading.RLock()
+
+    @property
+    def built(self) -> bool:
+        return self.analysis is not None
+
+    def hull(self) -> bool:
+        """Construct the phase diagram and its facet arrays; False if already built"""
+        with self._lock:
+            if self.diagram is not None:
+                return False
+            start = time.perf_counter()
+            diagram = _lazy_import("pymatgen.analysis.phase_diagram", "PhaseDiagram")(self.entries)
+            elements = list(diagram.elements)
+            vertices = np.array([
+                [[entry.composition.get_atomic_fraction(el) for el in elements]
+                 for entry in (diagram.qhull_entries[i] for i in facet)]
+                for facet in diagram.facets
+            ], dtype=float).reshape(len(diagram.facets), len(elements), len(elements))
+            energies = np.array([
+                [diagram.get_form_energy_per_atom(diagram.qhull_entries[i]) for i in facet]
+                for facet in diagram.facets
+            ], dtype=float).reshape(len(diagram.facets), len(elements))
+            self._facets = (
+                elements,
+                np.array([diagram.el_refs[el].energy_per_atom for el in elements]),
+                np.linalg.inv(vertices),
+                energies,
+                [[diagram.qhull_entries[i] for i in facet] for facet in diagram.facets],
+            )
+            self.diagram = diagram
+            self.hull_seconds = time.perf_counter() - start
+            return True
+
+    def evaluate(self, compositions: list, energies_per_atom: np.ndarray) -> tuple:
+        """
+        Hull distance and decomposition of many compositions in one pass.
+
+        Barycentric weights of every composition in every facet come from one
+        batched product with the inverted facet vertex matrices; each
+        composition takes the first facet in which no weight is negative.
+        Returns (formation energies per atom, energies above hull,
+        decompositions as {formula: atomic fraction}).
+        """
+        self.hull()
+        elements, references, inverses, facet_energies, facet_entries = self._facets
+        tolerance = self.diagram.numerical_tol / 10
+        fractions = np.array(
+            [[composition.get_atomic_fraction(el) for el in elements] for composition in compositions],
+            dtype=float
+        ).reshape(len(compositions), len(elements))
+        formation = np.asarray(energies_per_atom, dtype=float) - fractions @ references
+
+        above_hull = np.full(len(compositions), np.nan)
+        decompositions = [None] * len(compositions)
+        chunk = max(1, self.EVALUATION_CHUNK // max(1, inverses.shape[0] * len(elements)))
+        for lo in range(0, len(compositions), chunk):
+            weights = np.einsum("mn,fnk->mfk", fractions[lo:lo + chunk], inverses)
+            inside = (weights >= -tolerance).all(axis=2)
+            found = inside.any(axis=1)
+            facet = inside.argmax(axis=1)
+            rows = np.arange(len(facet))
+            chosen = weights[rows, facet]
+            hull_energy = np.einsum("mk,mk->m", chosen, facet_energies[facet])
+            above_hull[lo:lo + chunk] = np.where(found, formation[lo:lo + chunk] - hull_energy, np.nan)
+            for i in np.flatnonzero(found):
+                products = facet_entries[facet[i]]
+                decompositions[lo + i] = {
+                    products[k].composition.reduced_formula: float(w)
+                    for k, w in enumerate(chosen[i]) if w > tolerance
+                }
+        return formation, above_hull, decompositions
+
+    def analyse(self) -> bool:
+        """Hull distance and decomposition of every entry; False if already done"""
+        with self._lock:
+            if self.analysis is not None:
+                return False
+            self.hull()
+            start = time.perf_counter()
+            stable = self.diagram.stable_entries
+            formation, above_hull, decompositions = self.evaluate(
+                [entry.composition for entry in self.entries],
+                [entry.energy_per_atom for entry in self.entries]
+            )
+            self.analysis = [
+                {
+                    "formation_energy_per_atom": float(formation[i]),
+                    "e_above_hull": max(float(above_hull[i]), 0.0),
+                    "is_stable": entry in stable,
+                    "decomposition": decompositions[i],
+                }
+                for i, entry in enumerate(self.entries)
+            ]
+            self.decomposition_seconds = time.perf_counter() - start
+            return True
+
+
+class PhaseDiagramCache:
+    """
+    In-memory LRU of entry sets and convex hulls keyed by chemical system.
+
+    The entries of a system include those of all its subsystems, and the
+    hull restricted to a face of the composition simplex is that face's
+    hull, so a cached system also answers requests for any of its
+    subsystems without fetching or rebuilding. Larger systems are always
+    fetched whole: mixed GGA(+U)/r2SCAN energies are only on a common
+    scale within the system they were retrieved for.
+    """
+
+    def __init__(self, max_systems: int, ttl: float):
+        self.max_systems = max_systems
+        self.ttl = ttl
+        self._systems = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "subsystem_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    def _fresh(self, record: _PhaseDiagramRecord, db_version: Optional[str]) -> bool:
+        if time.time() - record.created > self.ttl:
+            return False
+        return db_version is None or record.db_version in (None, db_version)
+
+    def lookup(self, elements: frozenset, db_version: Optional[str]) -> tuple:
+        """Return (source elements, record) of the smallest cached system covering `elements`"""
+        with self._lock:
+            for key in [k for k, r in self._systems.items() if not self._fresh(r, db_version)]:
+                del self._systems[key]
+                self.stats["expirations"] += 1
+            covering = [key for key in self._systems if elements <= key]
+            if not covering:
+                self.stats["misses"] += 1
+                return None, None
+            source = min(covering, key=lambda k: (len(k), len(self._systems[k].entries)))
+            self._systems.move_to_end(source)
+            self.stats["hits" if source == elements else "subsystem_hits"] += 1
+            return source, self._systems[source]
+
+    def store(self, elements: frozenset, record: _PhaseDiagramRecord):
+        with self._lock:
+            self._systems[elements] = record
+            self._systems.move_to_end(elements)
+            # Subsystems are now answered by the larger system
+            for key in [k for k in self._systems if k < elements]:
+                del self._systems[key]
+            while len(self._systems) > self.max_systems:
+                self._systems.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            info = dict(self.stats)
+            info["systems"] = {
+                "-".join(sorted(key)): {
+                    "entries": len(record.entries),
+                    "hull_built": record.diagram is not None,
+                    "fetch_seconds": round(record.fetch_seconds, 4),
+                    "hull_seconds": round(record.hull_seconds, 4),
+                    "decomposition_seconds": round(record.decomposition_seconds, 4),
+                }
+                for key, record in self._systems.items()
+            }
+        info["max_systems"] = self.max_systems
+        return info
+
+
+class Prewarmer:
+    """
+    Imports PREWARM_MODULES and, when a server-wide key is configured, opens
+    one pooled client on a daemon thread.
+
+    Started after the MCP handshake so the client sees the tool
+    list straight away; a tool call arriving mid-warm-up simply imports
+    whatever is still missing itself (imports are serialised by Python's
+    import lock, so nothing is loaded twice).
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.seconds: dict = {}
+        self.error: Optional[str] = None
+        self.done = False
+
+    def start(self) -> None:
+        with self._lock:
+            if not self.enabled or self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="mp-prewarm", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            for module, name in PREWARM_MODULES:
+                start = time.perf_counter()
+                _lazy_import(module, name)
+                self.seconds[module] = time.perf_counter() - start
+            # Pre-started servers may not have a key yet; imports alone still help
+            api_key = _client_pools.resolver.default_key()
+            if api_key:
+                start = time.perf_counter()
+                with _client_pools.get(api_key).client():
+                    pass
+                self.seconds["client"] = time.perf_counter() - start
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.done = True
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "started": self._thread is not None,
+            "done": self.done,
+            "seconds": {k: round(v, 4) for k, v in self.seconds.items()},
+            "error": self.error,
+        }
 
-    # Handle pymatgen objects with as_dict
-    if hasattr(obj, 'as_dict'):
-        return serialize_object(obj.as_dict())
 
-    # Handle objects with __dict__
+class _PrewarmMiddleware(Middleware):
+    """
+    Starts the pre-warm once the first client message (initialize, or
+    server/discover for clients that skip it) has been answered
+    """
+
+    async def on_message(self, context, call_next):
+        result = await call_next(context)
+        _prewarmer.start()
+        return result
+
+
+class _APIKeyMiddleware(Middleware):
+    """Binds the API key sent in the API_KEY_HEADER HTTP header to the tool call"""
+
+    async def on_call_tool(self, context, call_next):
+        get_http_headers = _lazy_import("fastmcp.server.dependencies", "get_http_headers")
+        api_key = get_http_headers(include={API_KEY_HEADER}).get(API_KEY_HEADER)
+        if not api_key:
+            return await call_next(context)
+        token = _request_api_key.set(api_key.strip())
+        try:
+            return await call_next(context)
+        finally:
+            _request_api_key.reset(token)
+
+
+_client_pools = ClientPools(APIKeyResolver())
+_tool_metrics = ToolMetrics()
+_dispatcher = BlockingDispatcher()
+_page_fetcher = BlockingDispatcher(PAGE_CONCURRENCY)
+_analysis_pool = AnalysisProcessPool(SYMMETRY_WORKERS)
+_summary_cache = SummaryCache(
+    os.path.join(CACHE_DIR, "summary.sqlite") if CACHE_ENABLED else None,
+    int(CACHE_MAX_MB * 1e6),
+    CACHE_TTL
+)
+_phase_diagram_cache = PhaseDiagramCache(PD_CACHE_SIZE, CACHE_TTL)
+_prewarmer = Prewarmer(PREWARM)
+_single_flight = SingleFlight(scope=lambda: _client_pools.resolver.scope())
+_scheduler = RequestScheduler()
+_local_index = LocalIndex()
+
+
+@contextmanager
+def _mp_session(tool: str):
+    """
+    Borrow a pooled MPRester of the call's API key and record its latency;
+    its calls are rate limited and retried by the request scheduler
+    """
+    start = time.perf_counter()
+    with _client_pools.client() as (mpr, reused):
+        setup = time.perf_counter() - start
+        try:
+            yield _ScheduledClient(mpr, tool)
+        finally:
+            _tool_metrics.record(tool, time.perf_counter() - start, setup, reused)
+
+
+def _offload(fn: Callable[..., str]) -> Callable[..., Awaitable[str]]:
+    """Wrap a blocking tool body in a coroutine that runs it on the worker pool"""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await _dispatcher.run(fn.__name__, fn, *args, **kwargs)
+    return wrapper
+
+
+@asynccontextmanager
+async def _server_lifespan(server):
+    """Close pooled clients and worker threads when the MCP server shuts down"""
+    try:
+        yield {}
+    finally:
+        _dispatcher.shutdown()
+        _page_fetcher.shutdown()
+        _analysis_pool.shutdown()
+        _client_pools.close()
+
+
+atexit.register(_client_pools.close)
+
+mcp = FastMCP("materials-project", lifespan=_server_lifespan)
+mcp.add_middleware(_PrewarmMiddleware())
+mcp.add_middleware(_APIKeyMiddleware())
+
+
+def _identity(obj: Any) -> Any:
+    return obj
+
+
+# Types that are already JSON-compatible and returned as-is
+_PRIMITIVE_TYPES = frozenset((type(None), str, int, float, bool))
+
+
+def _serialize_sequence(obj: Any) -> list:
+    return [item if type(item) in _PRIMITIVE_TYPES else serialize_object(item) for item in obj]
+
+
+def _serialize_mapping(obj: Any) -> dict:
+    return {
+        (k if type(k) is str else str(k)): (v if type(v) in _PRIMITIVE_TYPES else serialize_object(v))
+        for k, v in obj.items()
+    }
+
+
+def _serialize_enum(obj: Enum) -> Any:
+    return serialize_object(obj.value)
+
+
+def _serialize_tolist(obj: Any) -> Any:
+    # numpy arrays and scalars
+    return obj.tolist()
+
+
+def _serialize_element(obj: Any) -> str:
+    return str(obj.symbol)
+
+
+def _serialize_as_dict(obj: Any) -> Any:
+    # pymatgen objects such as Structure, Lattice and Composition
+    return serialize_object(obj.as_dict())
+
+
+def _serialize_attributes(obj: Any) -> Any:
+    # pydantic documents and other plain objects
+    return _serialize_mapping(vars(obj))
+
+
+def _serialize_composition(obj: Any) -> dict:
+    amounts = {}
+    for species, amount in obj.items():
+        key = str(species)
+        amounts[key] = amounts.get(key, 0.0) + amount
+    return amounts
+
+
+def _serialize_structure(obj: Any) -> dict:
+    """
+    Same layout as Structure.as_dict(), built in one pass over the coordinate
+    arrays instead of via per-site as_dict() calls that each re-serialize the
+    lattice.
+    """
+    lattice = obj.lattice
+    lattice_dict = {"matrix": lattice.matrix.tolist(), "pbc": list(lattice.pbc)}
+    lattice_dict.update(lattice.params_dict)
+    lattice_dict["volume"] = lattice.volume
+
+    sites = []
+    for site, abc, xyz in zip(obj, obj.frac_coords.tolist(), obj.cart_coords.tolist()):
+        species = []
+        for sp, occu in site.species.items():
+            if type(sp) is _Element:
+                species.append({"element": sp.symbol, "occu": occu})
+            else:
+                sp_dict = {k: v for k, v in sp.as_dict().items() if k not in ("@module", "@class")}
+                sp_dict["occu"] = occu
+                species.append(serialize_object(sp_dict))
+        sites.append({
+            "species": species,
+            "abc": abc,
+            "properties": _serialize_mapping(site.properties),
+            "label": site.label,
+            "xyz": xyz,
+        })
+
+    return {
+        "@module": type(obj).__module__,
+        "@class": type(obj).__name__,
+        "charge": obj.charge,
+        "lattice": lattice_dict,
+        "properties": _serialize_mapping(obj.properties),
+        "sites": sites,
+    }
+
+
+# pymatgen's Element class, bound on first use so pymatgen is not imported eagerly
+_Element = None
+
+
+def _pymatgen_serializer(obj: Any) -> Optional[Callable[[Any], Any]]:
+    """Direct serializers for the pymatgen types found in summary documents"""
+    global _Element
+    if not type(obj).__module__.startswith("pymatgen.core"):
+        return None
+    _Element = _lazy_import("pymatgen.core", "Element")
+    if isinstance(obj, _lazy_import("pymatgen.core", "IStructure")):
+        return _serialize_structure
+    if isinstance(obj, _lazy_import("pymatgen.core", "Composition")):
+        return _serialize_composition
+    return None
+
+
+# Serializer registry keyed on concrete type. Types not listed are resolved
+# once by _resolve_serializer and cached here, so each document field costs a
+# single dict lookup instead of a chain of hasattr probes.
+_SERIALIZERS = {t: _identity for t in _PRIMITIVE_TYPES}
+_SERIALIZERS.update({list: _serialize_sequence, tuple: _serialize_sequence, dict: _serialize_mapping})
+
+
+def register_serializer(cls: type, handler: Callable[[Any], Any]):
+    """Register a JSON serializer for a concrete type"""
+    _SERIALIZERS[cls] = handler
+
+
+def _resolve_serializer(obj: Any) -> Callable[[Any], Any]:
+    """Pick the serializer for an unregistered type from a sample instance"""
+    if isinstance(obj, Enum):
+        return _serialize_enum
+    if isinstance(obj, str):
+        # str subclasses such as MPID
+        return str
+    if isinstance(obj, (int, float)):
+        return _identity
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return _serialize_sequence
+    if isinstance(obj, dict):
+        return _serialize_mapping
+    if hasattr(obj, 'tolist'):
+        return _serialize_tolist
+    # pymatgen Element/Species - extract symbol directly
+    if hasattr(obj, 'symbol') and hasattr(obj, 'Z'):
+        return _serialize_element
+    if hasattr(obj, 'as_dict'):
+        return _pymatgen_serializer(obj) or _serialize_as_dict
     if hasattr(obj, '__dict__'):
-        return serialize_object(obj.__dict__)
+        return _serialize_attributes
+    return str
+
 
-    return str(obj)
+def serialize_object(obj: Any) -> Any:
+    """Serialize objects to JSON-compatible format using a per-type serializer"""
+    handler = _SERIALIZERS.get(type(obj))
+    if handler is None:
+        handler = _resolve_serializer(obj)
+        _SERIALIZERS[type(obj)] = handler
+    return handler(obj)
+
+
+# Tool response encodings; MP_RESPONSE_FORMAT sets the server default, tools
+# accept a per-call `format` override
+RESPONSE_FORMATS = ("json", "compact", "table", "truncated")
+RESPONSE_FORMAT = os.environ.get("MP_RESPONSE_FORMAT", "json").lower()
+RESPONSE_MAX_BYTES = int(os.environ.get("MP_RESPONSE_MAX_BYTES", "65536"))
+
+if RESPONSE_FORMAT not in RESPONSE_FORMATS:
+    raise ValueError(f"MP_RESPONSE_FORMAT must be one of {list(RESPONSE_FORMATS)}")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps_compact(obj: Any) -> str:
+    """JSON without whitespace, via orjson when it is installed"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                obj, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            ).decode()
+        except TypeError:
+            pass  # e.g. integers wider than 64 bits
+    return json.dumps(obj, separators=(",", ":"), default=str)
+
+
+def _tabulate(output: dict) -> dict:
+    """Rewrite top-level lists of records as {"columns": [...], "rows": [[...], ...]}"""
+    table = dict(output)
+    for key, value in output.items():
+        if isinstance(value, list) and value and all(isinstance(row, dict) for row in value):
+            columns = list(dict.fromkeys(name for row in value for name in row))
+            table[key] = {
+                "columns": columns,
+                "rows": [[row.get(name) for name in columns] for row in value],
+            }
+    return table
+
+
+def _truncate(output: dict, max_bytes: int) -> str:
+    """
+    Compact JSON of `output`, dropping trailing items of its largest list
+    until it fits in `max_bytes`. A `truncated` entry records what was
+    dropped and `next_cursor` is rewound so the dropped rows are not lost.
+    When the response is over the cap even without any item, the entry says
+    so with `cap_exceeded`.
+    """
+    public = dict(output)
+    if "next_cursor" in public:
+        public["next_cursor"] = _public_cursor(public["next_cursor"])
+    encoded = _dumps_compact(public)
+    if len(encoded.encode()) <= max_bytes:
+        return encoded
+    lists = [key for key, value in output.items() if isinstance(value, list) and value]
+    if not lists:
+        return _dumps_compact(dict(public, truncated={"cap_exceeded": True, "max_bytes": max_bytes}))
+
+    key = max(lists, key=lambda k: len(output[k]))
+    items = output[key]
+
+    def encode_kept(kept: int, cap_exceeded: bool = False) -> str:
+        omitted = len(items) - kept
+        trimmed = dict(output)
+        trimmed[key] = items[:kept]
+        if trimmed.get("count") == len(items):
+            trimmed["count"] = kept
+        if trimmed.get("next_cursor"):
+            trimmed["next_cursor"] = _rewind_cursor(trimmed["next_cursor"], kept, omitted) if omitted \
+                else _public_cursor(trimmed["next_cursor"])
+        trimmed["truncated"] = {"field": key, "returned": kept, "omitted": omitted, "max_bytes": max_bytes}
+        if cap_exceeded:
+            trimmed["truncated"]["cap_exceeded"] = True
+        return _dumps_compact(trimmed)
+
+    # Largest number of kept items that still fits
+    low, high = 0, len(items) - 1
+    while low < high:
+        mid = (low + high + 1) // 2
+        if len(encode_kept(mid).encode()) <= max_bytes:
+            low = mid
+        else:
+            high = mid - 1
+    encoded = encode_kept(low)
+    if len(encoded.encode()) > max_bytes:
+        # Nothing else is dropped; say the cap could not be met
+        return encode_kept(low, cap_exceeded=True)
+    return encoded
+
+
+def encode_response(output: dict, format: Optional[str] = None) -> str:
+    """
+    Encode a tool response.
+
+    "json" is indented JSON, "compact" drops all whitespace, "table" also
+    turns lists of records and MaterialTables into a header row plus value
+    rows, and
+    "truncated" is compact JSON capped at MP_RESPONSE_MAX_BYTES.
+    """
+    fmt = (format or RESPONSE_FORMAT).lower()
+    if fmt != "truncated" and output.get("next_cursor"):
+        output = dict(output, next_cursor=_public_cursor(output["next_cursor"]))
+    if fmt == "table":
+        return _dumps_compact(_tabulate({
+            key: value.to_table() if isinstance(value, MaterialTable) else value
+            for key, value in output.items()
+        }))
+
+    output = {
+        key: value.to_records() if isinstance(value, MaterialTable) else value
+        for key, value in output.items()
+    }
+    if fmt == "json":
+        return json.dumps(output, indent=2, default=str)
+    if fmt == "compact":
+        return _dumps_compact(output)
+    if fmt == "truncated":
+        return _truncate(output, RESPONSE_MAX_BYTES)
+    return json.dumps({
+        "status": "error",
+        "message": f"Invalid format '{format}'. Valid options: {list(RESPONSE_FORMATS)}",
+        "timestamp": datetime.now().isoformat()
+    }, indent=2)
+
+
+def _serialize_fields(doc: Any, fields: Optional[frozenset]) -> dict:
+    """
+    serialize_object(doc) restricted to the top-level `fields` (all when
+    None), so nested data nobody reads is never walked.
+    """
+    if fields is not None:
+        handler = _SERIALIZERS.get(type(doc))
+        if handler is None:
+            handler = _SERIALIZERS[type(doc)] = _resolve_serializer(doc)
+        if handler is _serialize_mapping:
+            source = doc
+        elif handler is _serialize_attributes:
+            source = vars(doc)
+        else:
+            source = None
+        if source is not None:
+            return {
+                str(k): v if type(v) in _PRIMITIVE_TYPES else serialize_object(v)
+                for k, v in source.items() if k in fields
+            }
+    return serialize_object(doc)
 
 
 def flatten_dict(d: dict, parent_key: str = '', sep: str = '_') -> dict:
@@ -195,145 +2345,1261 @@ def format_structure_string(structure_dict: dict) -> str:
     return '\n'.join(parts)
 
 
-def process_material_doc(doc: Any) -> dict:
-    """Process a material document into flat dictionary with all fields"""
-    doc_dict = serialize_object(doc)
+# Sentinel returned by column extractors when a column should be left out
+_SKIP = object()
 
-    # Special handling for structure field
-    structure_data = doc_dict.get('structure', {})
-    structure_str = format_structure_string(structure_data)
 
-    # Special handling for symmetry
-    symmetry_data = doc_dict.get('symmetry', {})
+class ColumnSpec(NamedTuple):
+    """
+    An output column: its name, the summary fields it reads, how to extract
+    it, and its value kind in typed exports ("float", "int", "bool", "string"
+    or "json")
+    """
+    name: str
+    fields: tuple
+    extract: Callable[[dict], Any]
+    kind: str = "float"
 
-    # Build result dict with organized fields
-    result = {}
 
-    # Core identifiers
-    result['Material_ID'] = doc_dict.get('material_id', '')
-    result['Formula'] = doc_dict.get('formula_pretty', '')
-    result['Formula_Anonymous'] = doc_dict.get('formula_anonymous', '')
-    result['Chemical_System'] = doc_dict.get('chemsys', '')
+def _parent_values(parent: str, dicts: List[dict], parents: dict) -> list:
+    """d[parent] for every document, looked up once per batch and shared by sibling columns"""
+    values = parents.get(parent)
+    if values is None:
+        values = parents[parent] = [d.get(parent, {}) for d in dicts]
+    return values
 
-    # Handle elements - can be list of strings or list of Element objects
-    elements = doc_dict.get('elements', [])
-    if elements:
-        # After serialize_object, Element objects should be converted to strings
-        # But we still need to handle various formats
-        element_symbols = []
-        for e in elements:
-            if isinstance(e, str):
-                element_symbols.append(e)
-            elif isinstance(e, dict):
-                # Try to extract element symbol from dict
-                if 'symbol' in e:
-                    element_symbols.append(str(e['symbol']))
-                elif 'element' in e:
-                    element_symbols.append(str(e['element']))
-                elif '_value_' in e:
-                    element_symbols.append(str(e['_value_']))
-                else:
-                    # Fallback to string representation
-                    element_symbols.append(str(e))
+
+class _Field:
+    """Read d[name], '' when absent"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __call__(self, d: dict) -> Any:
+        return d.get(self.name, '')
+
+    def batch(self, dicts: List[dict], parents: dict) -> list:
+        name = self.name
+        return [d.get(name, '') for d in dicts]
+
+
+class _SubField:
+    """Read d[parent][key]; non-dict parents are passed through or skipped"""
+
+    def __init__(self, parent: str, key: str, scalar_fallback: bool = False):
+        self.parent = parent
+        self.key = key
+        self.scalar_fallback = scalar_fallback
+
+    def __call__(self, d: dict) -> Any:
+        value = d.get(self.parent, {})
+        if isinstance(value, dict):
+            return value.get(self.key, '')
+        return value if self.scalar_fallback else _SKIP
+
+    def batch(self, dicts: List[dict], parents: dict) -> list:
+        key, scalar_fallback = self.key, self.scalar_fallback
+        return [
+            value.get(key, '') if isinstance(value, dict) else (value if scalar_fallback else _SKIP)
+            for value in _parent_values(self.parent, dicts, parents)
+        ]
+
+
+def _json_field(name: str) -> Callable[[dict], Any]:
+    return lambda d: json.dumps(d.get(name), default=str) if d.get(name) else ''
+
+
+def _joined_field(name: str) -> Callable[[dict], Any]:
+    return lambda d: ', '.join(d.get(name)) if d.get(name) else ''
+
+
+class _DatabaseIds:
+    """Comma-joined external database IDs of one kind"""
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def _join(self, db_ids: Any) -> Any:
+        if not isinstance(db_ids, dict):
+            return _SKIP
+        ids = db_ids.get(self.key)
+        return ', '.join(str(x) for x in ids) if ids else ''
+
+    def __call__(self, d: dict) -> Any:
+        return self._join(d.get('database_IDs', {}))
+
+    def batch(self, dicts: List[dict], parents: dict) -> list:
+        return [self._join(db_ids) for db_ids in _parent_values('database_IDs', dicts, parents)]
+
+
+def _extract_elements(d: dict) -> str:
+    """Elements can be a list of strings or of serialized Element objects"""
+    elements = d.get('elements', [])
+    if not elements:
+        return ''
+    element_symbols = []
+    for e in elements:
+        if isinstance(e, str):
+            element_symbols.append(e)
+        elif isinstance(e, dict):
+            # Try to extract element symbol from dict
+            if 'symbol' in e:
+                element_symbols.append(str(e['symbol']))
+            elif 'element' in e:
+                element_symbols.append(str(e['element']))
+            elif '_value_' in e:
+                element_symbols.append(str(e['_value_']))
             else:
+                # Fallback to string representation
                 element_symbols.append(str(e))
-        result['Elements'] = ', '.join(element_symbols)
-    else:
-        result['Elements'] = ''
+        else:
+            element_symbols.append(str(e))
+    return ', '.join(element_symbols)
+
 
-    result['N_Elements'] = doc_dict.get('nelements', '')
-    result['N_Sites'] = doc_dict.get('nsites', '')
+# Declarative mapping from output columns to Materials Project summary fields.
+# process_material_doc builds rows from it and the tools derive their field
+# projections from it, so the two cannot drift apart.
+MATERIAL_COLUMNS = [
+    # Core identifiers
+    ColumnSpec('Material_ID', ('material_id',), _Field('material_id'), 'string'),
+    ColumnSpec('Formula', ('formula_pretty',), _Field('formula_pretty'), 'string'),
+    ColumnSpec('Formula_Anonymous', ('formula_anonymous',), _Field('formula_anonymous'), 'string'),
+    ColumnSpec('Chemical_System', ('chemsys',), _Field('chemsys'), 'string'),
+    ColumnSpec('Elements', ('elements',), _extract_elements, 'string'),
+    ColumnSpec('N_Elements', ('nelements',), _Field('nelements'), 'int'),
+    ColumnSpec('N_Sites', ('nsites',), _Field('nsites'), 'int'),
 
     # Thermodynamics
-    result['Energy_Per_Atom_eV'] = doc_dict.get('energy_per_atom', '')
-    result['Formation_Energy_eV_Atom'] = doc_dict.get('formation_energy_per_atom', '')
-    result['Energy_Above_Hull_eV_Atom'] = doc_dict.get('energy_above_hull', '')
-    result['Is_Stable'] = doc_dict.get('is_stable', '')
-    result['Equilibrium_Reaction_Energy'] = doc_dict.get('equilibrium_reaction_energy_per_atom', '')
-    decomposes = doc_dict.get('decomposes_to', [])
-    result['Decomposes_To'] = json.dumps(decomposes, default=str) if decomposes else ''
+    ColumnSpec('Energy_Per_Atom_eV', ('energy_per_atom',), _Field('energy_per_atom')),
+    ColumnSpec('Formation_Energy_eV_Atom', ('formation_energy_per_atom',), _Field('formation_energy_per_atom')),
+    ColumnSpec('Energy_Above_Hull_eV_Atom', ('energy_above_hull',), _Field('energy_above_hull')),
+    ColumnSpec('Is_Stable', ('is_stable',), _Field('is_stable'), 'bool'),
+    ColumnSpec('Equilibrium_Reaction_Energy', ('equilibrium_reaction_energy_per_atom',),
+               _Field('equilibrium_reaction_energy_per_atom')),
+    ColumnSpec('Decomposes_To', ('decomposes_to',), _json_field('decomposes_to'), 'string'),
 
     # Electronic
-    result['Band_Gap_eV'] = doc_dict.get('band_gap', '')
-    result['CBM_eV'] = doc_dict.get('cbm', '')
-    result['VBM_eV'] = doc_dict.get('vbm', '')
-    result['Fermi_Energy_eV'] = doc_dict.get('efermi', '')
-    result['Is_Gap_Direct'] = doc_dict.get('is_gap_direct', '')
-    result['Is_Metal'] = doc_dict.get('is_metal', '')
+    ColumnSpec('Band_Gap_eV', ('band_gap',), _Field('band_gap')),
+    ColumnSpec('CBM_eV', ('cbm',), _Field('cbm')),
+    ColumnSpec('VBM_eV', ('vbm',), _Field('vbm')),
+    ColumnSpec('Fermi_Energy_eV', ('efermi',), _Field('efermi')),
+    ColumnSpec('Is_Gap_Direct', ('is_gap_direct',), _Field('is_gap_direct'), 'bool'),
+    ColumnSpec('Is_Metal', ('is_metal',), _Field('is_metal'), 'bool'),
 
     # Magnetism
-    result['Is_Magnetic'] = doc_dict.get('is_magnetic', '')
-    result['Magnetic_Ordering'] = doc_dict.get('ordering', '')
-    result['Total_Magnetization'] = doc_dict.get('total_magnetization', '')
-    result['Magnetization_Per_Volume'] = doc_dict.get('total_magnetization_normalized_vol', '')
-    result['Magnetization_Per_Formula'] = doc_dict.get('total_magnetization_normalized_formula_units', '')
-    result['N_Magnetic_Sites'] = doc_dict.get('num_magnetic_sites', '')
-    result['N_Unique_Magnetic_Sites'] = doc_dict.get('num_unique_magnetic_sites', '')
+    ColumnSpec('Is_Magnetic', ('is_magnetic',), _Field('is_magnetic'), 'bool'),
+    ColumnSpec('Magnetic_Ordering', ('ordering',), _Field('ordering'), 'string'),
+    ColumnSpec('Total_Magnetization', ('total_magnetization',), _Field('total_magnetization')),
+    ColumnSpec('Magnetization_Per_Volume', ('total_magnetization_normalized_vol',),
+               _Field('total_magnetization_normalized_vol')),
+    ColumnSpec('Magnetization_Per_Formula', ('total_magnetization_normalized_formula_units',),
+               _Field('total_magnetization_normalized_formula_units')),
+    ColumnSpec('N_Magnetic_Sites', ('num_magnetic_sites',), _Field('num_magnetic_sites'), 'int'),
+    ColumnSpec('N_Unique_Magnetic_Sites', ('num_unique_magnetic_sites',), _Field('num_unique_magnetic_sites'), 'int'),
 
     # Elasticity
-    bulk_mod = doc_dict.get('bulk_modulus', {})
-    shear_mod = doc_dict.get('shear_modulus', {})
-    if isinstance(bulk_mod, dict):
-        result['Bulk_Modulus_VRH_GPa'] = bulk_mod.get('vrh', '')
-        result['Bulk_Modulus_Voigt_GPa'] = bulk_mod.get('voigt', '')
-        result['Bulk_Modulus_Reuss_GPa'] = bulk_mod.get('reuss', '')
-    else:
-        result['Bulk_Modulus_VRH_GPa'] = bulk_mod
-    if isinstance(shear_mod, dict):
-        result['Shear_Modulus_VRH_GPa'] = shear_mod.get('vrh', '')
-        result['Shear_Modulus_Voigt_GPa'] = shear_mod.get('voigt', '')
-        result['Shear_Modulus_Reuss_GPa'] = shear_mod.get('reuss', '')
-    else:
-        result['Shear_Modulus_VRH_GPa'] = shear_mod
-    result['Universal_Anisotropy'] = doc_dict.get('universal_anisotropy', '')
-    result['Poisson_Ratio'] = doc_dict.get('homogeneous_poisson', '')
+    ColumnSpec('Bulk_Modulus_VRH_GPa', ('bulk_modulus',), _SubField('bulk_modulus', 'vrh', scalar_fallback=True)),
+    ColumnSpec('Bulk_Modulus_Voigt_GPa', ('bulk_modulus',), _SubField('bulk_modulus', 'voigt')),
+    ColumnSpec('Bulk_Modulus_Reuss_GPa', ('bulk_modulus',), _SubField('bulk_modulus', 'reuss')),
+    ColumnSpec('Shear_Modulus_VRH_GPa', ('shear_modulus',), _SubField('shear_modulus', 'vrh', scalar_fallback=True)),
+    ColumnSpec('Shear_Modulus_Voigt_GPa', ('shear_modulus',), _SubField('shear_modulus', 'voigt')),
+    ColumnSpec('Shear_Modulus_Reuss_GPa', ('shear_modulus',), _SubField('shear_modulus', 'reuss')),
+    ColumnSpec('Universal_Anisotropy', ('universal_anisotropy',), _Field('universal_anisotropy')),
+    ColumnSpec('Poisson_Ratio', ('homogeneous_poisson',), _Field('homogeneous_poisson')),
 
     # Dielectric
-    result['Dielectric_Total'] = doc_dict.get('e_total', '')
-    result['Dielectric_Ionic'] = doc_dict.get('e_ionic', '')
-    result['Dielectric_Electronic'] = doc_dict.get('e_electronic', '')
-    result['Refractive_Index_n'] = doc_dict.get('n', '')
-    result['Piezoelectric_Max'] = doc_dict.get('e_ij_max', '')
+    ColumnSpec('Dielectric_Total', ('e_total',), _Field('e_total')),
+    ColumnSpec('Dielectric_Ionic', ('e_ionic',), _Field('e_ionic')),
+    ColumnSpec('Dielectric_Electronic', ('e_electronic',), _Field('e_electronic')),
+    ColumnSpec('Refractive_Index_n', ('n',), _Field('n')),
+    ColumnSpec('Piezoelectric_Max', ('e_ij_max',), _Field('e_ij_max')),
 
     # Physical properties
-    result['Volume_A3'] = doc_dict.get('volume', '')
-    result['Density_g_cm3'] = doc_dict.get('density', '')
-    result['Density_Atomic'] = doc_dict.get('density_atomic', '')
+    ColumnSpec('Volume_A3', ('volume',), _Field('volume')),
+    ColumnSpec('Density_g_cm3', ('density',), _Field('density')),
+    ColumnSpec('Density_Atomic', ('density_atomic',), _Field('density_atomic')),
 
     # Surface properties
-    result['Surface_Energy_J_m2'] = doc_dict.get('weighted_surface_energy', '')
-    result['Surface_Energy_eV_A2'] = doc_dict.get('weighted_surface_energy_EV_PER_ANG2', '')
-    result['Work_Function_eV'] = doc_dict.get('weighted_work_function', '')
-    result['Surface_Anisotropy'] = doc_dict.get('surface_anisotropy', '')
-    result['Shape_Factor'] = doc_dict.get('shape_factor', '')
-    result['Has_Reconstructed'] = doc_dict.get('has_reconstructed', '')
+    ColumnSpec('Surface_Energy_J_m2', ('weighted_surface_energy',), _Field('weighted_surface_energy')),
+    ColumnSpec('Surface_Energy_eV_A2', ('weighted_surface_energy_EV_PER_ANG2',),
+               _Field('weighted_surface_energy_EV_PER_ANG2')),
+    ColumnSpec('Work_Function_eV', ('weighted_work_function',), _Field('weighted_work_function')),
+    ColumnSpec('Surface_Anisotropy', ('surface_anisotropy',), _Field('surface_anisotropy')),
+    ColumnSpec('Shape_Factor', ('shape_factor',), _Field('shape_factor')),
+    ColumnSpec('Has_Reconstructed', ('has_reconstructed',), _Field('has_reconstructed'), 'bool'),
 
     # Symmetry
-    if isinstance(symmetry_data, dict):
-        result['Space_Group_Symbol'] = symmetry_data.get('symbol', '')
-        result['Space_Group_Number'] = symmetry_data.get('number', '')
-        result['Crystal_System'] = symmetry_data.get('crystal_system', '')
-        result['Point_Group'] = symmetry_data.get('point_group', '')
+    ColumnSpec('Space_Group_Symbol', ('symmetry',), _SubField('symmetry', 'symbol'), 'string'),
+    ColumnSpec('Space_Group_Number', ('symmetry',), _SubField('symmetry', 'number'), 'int'),
+    ColumnSpec('Crystal_System', ('symmetry',), _SubField('symmetry', 'crystal_system'), 'string'),
+    ColumnSpec('Point_Group', ('symmetry',), _SubField('symmetry', 'point_group'), 'string'),
 
     # Structure (formatted string)
-    result['Structure_Details'] = structure_str
+    ColumnSpec('Structure_Details', ('structure',),
+               lambda d: format_structure_string(d.get('structure', {})), 'string'),
 
     # Metadata
-    result['Possible_Species'] = ', '.join(doc_dict.get('possible_species', [])) if doc_dict.get('possible_species') else ''
-    result['Has_Properties'] = json.dumps(doc_dict.get('has_props', []), default=str) if doc_dict.get('has_props') else ''
-    result['Is_Theoretical'] = doc_dict.get('theoretical', '')
+    ColumnSpec('Possible_Species', ('possible_species',), _joined_field('possible_species'), 'string'),
+    ColumnSpec('Has_Properties', ('has_props',), _json_field('has_props'), 'string'),
+    ColumnSpec('Is_Theoretical', ('theoretical',), _Field('theoretical'), 'bool'),
+    ColumnSpec('ICSD_IDs', ('database_IDs',), _DatabaseIds('icsd'), 'string'),
+    ColumnSpec('COD_IDs', ('database_IDs',), _DatabaseIds('cod'), 'string'),
+
+    # Full raw data for reference, as a nested object (only built at detail_level="full")
+    ColumnSpec('Full_Properties', tuple(SUMMARY_FIELDS), lambda d: d, 'json'),
+]
+
+_COLUMNS_BY_NAME = {spec.name: spec for spec in MATERIAL_COLUMNS}
+
+# Output detail levels accepted by the search and export tools
+DETAIL_LEVELS = ("summary", "standard", "full")
+
+# Columns returned at detail_level="summary"
+SUMMARY_DETAIL_COLUMNS = [
+    "Material_ID",
+    "Formula",
+    "Chemical_System",
+    "Band_Gap_eV",
+    "Formation_Energy_eV_Atom",
+    "Energy_Above_Hull_eV_Atom",
+    "Is_Stable",
+    "Density_g_cm3",
+    "Space_Group_Symbol",
+    "Crystal_System",
+]
+
+# Columns returned at detail_level="standard": everything except the raw document
+STANDARD_COLUMNS = [spec.name for spec in MATERIAL_COLUMNS if spec.name != 'Full_Properties']
+
+# Columns emitted by compare_materials
+COMPARISON_COLUMNS = [
+    "Material_ID",
+    "Formula",
+    "Band_Gap_eV",
+    "Is_Metal",
+    "Formation_Energy_eV_Atom",
+    "Energy_Above_Hull_eV_Atom",
+    "Is_Stable",
+    "Density_g_cm3",
+    "Volume_A3",
+    "N_Sites",
+    "Is_Magnetic",
+    "Total_Magnetization",
+    "Bulk_Modulus_VRH_GPa",
+    "Shear_Modulus_VRH_GPa",
+    "Space_Group_Symbol",
+    "Crystal_System",
+]
+
+# Rows of the horizontal comparison Excel sheet
+EXCEL_COMPARISON_COLUMNS = [
+    'Material_ID',
+    'Formula',
+    'Band_Gap_eV',
+    'Energy_Above_Hull_eV_Atom',
+    'Is_Stable',
+    'Is_Metal',
+    'Is_Magnetic',
+    'Formation_Energy_eV_Atom',
+    'Density_g_cm3',
+    'Volume_A3',
+    'N_Sites',
+    'N_Elements',
+    'Elements',
+    'Space_Group_Symbol',
+    'Space_Group_Number',
+    'Crystal_System',
+    'Point_Group',
+    'CBM_eV',
+    'VBM_eV',
+    'Fermi_Energy_eV',
+    'Is_Gap_Direct',
+    'Total_Magnetization',
+    'Magnetic_Ordering',
+    'Bulk_Modulus_VRH_GPa',
+    'Shear_Modulus_VRH_GPa',
+    'Poisson_Ratio',
+    'Dielectric_Total',
+    'Refractive_Index_n',
+    'Surface_Energy_J_m2',
+    'Work_Function_eV',
+]
+
+
+def resolve_columns(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Resolve a caller-supplied, comma-separated `fields` argument to output columns.
+
+    Each name may be an output column (e.g. "Band_Gap_eV") or a Materials
+    Project summary field (e.g. "band_gap"), which selects every column derived
+    from it. Returns None when no projection was requested.
+    """
+    if not fields:
+        return None
+
+    lookup = {name.lower(): name for name in _COLUMNS_BY_NAME}
+    columns = []
+    for raw in fields.split(","):
+        name = raw.strip()
+        if not name:
+            continue
+        if name.lower() in lookup:
+            matched = [lookup[name.lower()]]
+        elif name in SUMMARY_FIELDS:
+            matched = [spec.name for spec in MATERIAL_COLUMNS
+                       if name in spec.fields and spec.name != 'Full_Properties']
+        else:
+            raise ValueError(
+                f"Unknown field '{name}'. Valid options: {list(_COLUMNS_BY_NAME.keys())}"
+            )
+        columns.extend(c for c in matched if c not in columns)
+
+    if 'Material_ID' not in columns:
+        columns.insert(0, 'Material_ID')
+    return columns
+
+
+def columns_for_detail_level(
+    detail_level: str,
+    fields: Optional[str] = None,
+    standard_columns: List[str] = STANDARD_COLUMNS
+) -> List[str]:
+    """
+    Output columns for a `detail_level` and optional `fields` projection.
+
+    "summary" selects a handful of key properties, "standard" the given
+    standard columns and "full" adds the raw document as Full_Properties.
+    An explicit `fields` list replaces the level's columns, but "full" still
+    appends Full_Properties to it.
+    """
+    level = (detail_level or "standard").lower()
+    if level not in DETAIL_LEVELS:
+        raise ValueError(f"Invalid detail_level '{detail_level}'. Valid options: {list(DETAIL_LEVELS)}")
+
+    columns = resolve_columns(fields)
+    if columns is None:
+        columns = list(SUMMARY_DETAIL_COLUMNS if level == "summary" else standard_columns)
+    if level == "full" and 'Full_Properties' not in columns:
+        columns.append('Full_Properties')
+    return columns
 
-    db_ids = doc_dict.get('database_IDs', {})
-    if isinstance(db_ids, dict):
-        result['ICSD_IDs'] = ', '.join(str(x) for x in db_ids.get('icsd', [])) if db_ids.get('icsd') else ''
-        result['COD_IDs'] = ', '.join(str(x) for x in db_ids.get('cod', [])) if db_ids.get('cod') else ''
 
-    # Full raw data for reference
-    result['Full_Properties'] = json.dumps(doc_dict, indent=2, default=str)
+def fields_for_columns(columns: Optional[List[str]]) -> List[str]:
+    """Minimal list of summary fields needed to build the given output columns"""
+    if columns is None:
+        return SUMMARY_FIELDS
+    needed = {"material_id"}
+    for name in columns:
+        needed.update(_COLUMNS_BY_NAME[name].fields)
+    return [f for f in SUMMARY_FIELDS if f in needed]
+
+
+def process_material_doc(doc: Any, columns: Optional[List[str]] = None) -> dict:
+    """
+    Process a material document into flat dictionary with all fields.
+    When `columns` is given only those output columns are built.
+    """
+    doc_dict = serialize_object(doc)
+
+    wanted = set(columns) if columns is not None else None
+    result = {}
+    for spec in MATERIAL_COLUMNS:
+        if wanted is not None and spec.name not in wanted:
+            continue
+        value = spec.extract(doc_dict)
+        if value is not _SKIP:
+            result[spec.name] = value
 
     return result
 
 
+@contextmanager
+def _gc_paused():
+    """
+    Suspend the cyclic garbage collector for a batch. Batches allocate many
+    short-lived containers that are freed by reference counting anyway, and
+    the collector would otherwise rescan the whole heap repeatedly.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _is_null(value: Any) -> bool:
+    return value is None or value is _SKIP or (type(value) is str and value == '')
+
+
+def _typed_value(value: Any, kind: str) -> Any:
+    """A cell as its column's declared kind; nulls and unconvertible values become None"""
+    if _is_null(value):
+        return None
+    try:
+        if kind == "float":
+            return float(value)
+        if kind == "int":
+            return int(value)
+        if kind == "bool":
+            return bool(value)
+    except (TypeError, ValueError):
+        return None
+    if kind == "json" or isinstance(value, (dict, list)):
+        return _dumps_compact(value)
+    return str(value)
+
+
+class _NumericColumn:
+    """Numbers in a NumPy array; null cells (None, '' or absent) are kept sparsely"""
+
+    def __init__(self, values: list, dtype):
+        self.nulls = {i: v for i, v in enumerate(values) if _is_null(v)}
+        self.data = np.array([0 if i in self.nulls else v for i, v in enumerate(values)], dtype=dtype)
+
+    def __getitem__(self, i: int) -> Any:
+        if i in self.nulls:
+            return self.nulls[i]
+        return self.data[i].item()
+
+    def tolist(self) -> list:
+        values = self.data.tolist()
+        for i, v in self.nulls.items():
+            values[i] = v
+        return values
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + 16 * len(self.nulls)
+
+
+class _CategoricalColumn:
+    """Dictionary-encoded values: int32 codes into the list of distinct values"""
+
+    def __init__(self, values: list):
+        index = {}
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, v in enumerate(values):
+            # Key on the type too, so that True, 1 and 1.0 stay distinct
+            codes[i] = index.setdefault((type(v), v), len(index))
+        self.codes = codes
+        self.categories = [v for _, v in index]
+
+    def __getitem__(self, i: int) -> Any:
+        return self.categories[self.codes[i]]
+
+    def tolist(self) -> list:
+        categories = self.categories
+        return [categories[code] for code in self.codes.tolist()]
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + 8 * len(self.categories)
+
+
+class _ObjectColumn(list):
+    """Unhashable values (nested objects) kept as they are"""
+
+    def tolist(self) -> list:
+        return list(self)
+
+    @property
+    def nbytes(self) -> int:
+        return 8 * len(self)
+
+
+def _encode_column(values: list):
+    """Pick the most compact column representation that round-trips `values` exactly"""
+    kinds = {type(v) for v in values if not _is_null(v)}
+    if kinds == {bool}:
+        return _NumericColumn(values, np.bool_)
+    if kinds == {float}:
+        return _NumericColumn(values, np.float64)
+    if kinds == {int} and all(-2**63 <= v < 2**63 for v in values if not _is_null(v)):
+        return _NumericColumn(values, np.int64)
+    try:
+        return _CategoricalColumn(values)
+    except TypeError:
+        return _ObjectColumn(values)
+
+
+class MaterialTable:
+    """
+    Column-oriented processed materials.
+
+    Holds the same data as a list of process_material_doc() rows without
+    per-row dictionaries: numeric and boolean columns live in NumPy arrays
+    and repeated strings are dictionary-encoded. Cells an extractor skipped
+    are remembered, so to_records() reproduces process_material_doc exactly.
+    """
+
+    # Documents serialized and extracted together by extend()
+    BATCH_SIZE = 256
+
+    def __init__(self, columns: Optional[List[str]] = None):
+        wanted = set(columns) if columns is not None else None
+        self._specs = [spec for spec in MATERIAL_COLUMNS if wanted is None or spec.name in wanted]
+        # Top-level fields the columns read; Full_Properties needs the whole document
+        self._fields = None if any(spec.name == 'Full_Properties' for spec in self._specs) else \
+            frozenset(field for spec in self._specs for field in spec.fields)
+        self._pending = {spec.name: [] for spec in self._specs}
+        self._encoded = {}
+        self._length = 0
+
+    @classmethod
+    def from_docs(cls, docs: Iterator[Any], columns: Optional[List[str]] = None) -> "MaterialTable":
+        table = cls(columns)
+        table.extend(docs)
+        return table
+
+    def append(self, doc: Any):
+        """Process one summary document into the table"""
+        self.extend([doc])
+
+    def extend(self, docs: Iterator[Any]):
+        """
+        Process a batch of summary documents a column at a time. Extractors
+        with a batch() method run over all documents at once, and nested
+        sub-documents are looked up once for all the columns read from them.
+        """
+        docs = list(docs)
+        with _gc_paused():
+            # Chunked so only a bounded number of serialized documents is alive at once
+            for start in range(0, len(docs), self.BATCH_SIZE):
+                dicts = [_serialize_fields(doc, self._fields) for doc in docs[start:start + self.BATCH_SIZE]]
+                parents = {}
+                for spec in self._specs:
+                    batch = getattr(spec.extract, 'batch', None)
+                    if batch is not None:
+                        values = batch(dicts, parents)
+                    else:
+                        extract = spec.extract
+                        values = [extract(d) for d in dicts]
+                    self._pending[spec.name].extend(values)
+                self._length += len(dicts)
+
+    def _column(self, name: str):
+        pending = self._pending[name]
+        if pending:
+            if name in self._encoded:
+                pending = self._encoded[name].tolist() + pending
+            self._encoded[name] = _encode_column(pending)
+            self._pending[name] = []
+        return self._encoded.get(name, _ObjectColumn())
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def columns(self) -> List[str]:
+        """Columns that have a value in at least one row"""
+        return [spec.name for spec in self._specs
+                if any(v is not _SKIP for v in self.column(spec.name))]
+
+    def column(self, name: str) -> list:
+        """All values of one column; skipped cells (and unknown columns) are _SKIP"""
+        if name not in self._pending:
+            return [_SKIP] * self._length
+        return self._column(name).tolist()
+
+    def get(self, row: int, name: str, default: Any = None) -> Any:
+        if name not in self._pending:
+            return default
+        value = self._column(name)[row]
+        return default if value is _SKIP else value
+
+    def to_records(self, columns: Optional[List[str]] = None, fill: Any = _SKIP) -> List[dict]:
+        """
+        Rows as dictionaries. By default they match process_material_doc;
+        with `columns` the keys follow that order and cells that are absent
+        are set to `fill` (or left out when `fill` is _SKIP).
+        """
+        names = columns if columns is not None else [spec.name for spec in self._specs]
+        values = [self.column(name) for name in names]
+        records = []
+        for i in range(self._length):
+            record = {}
+            for name, column in zip(names, values):
+                value = column[i]
+                if value is _SKIP:
+                    if fill is _SKIP:
+                        continue
+                    value = fill
+                record[name] = value
+            records.append(record)
+        return records
+
+    @property
+    def specs(self) -> List[ColumnSpec]:
+        return list(self._specs)
+
+    def typed_column(self, name: str) -> list:
+        """One column converted to its ColumnSpec kind, with None for missing values"""
+        kind = _COLUMNS_BY_NAME[name].kind
+        return [_typed_value(value, kind) for value in self.column(name)]
+
+    def to_table(self) -> dict:
+        """{"columns": [...], "rows": [[...], ...]} with absent cells as None"""
+        names = self.columns
+        values = [[None if v is _SKIP else v for v in self.column(name)] for name in names]
+        return {"columns": names, "rows": [list(row) for row in zip(*values)]}
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the encoded columns"""
+        return sum(self._column(spec.name).nbytes for spec in self._specs)
+
+
+def process_material_docs(docs: Iterator[Any], columns: Optional[List[str]] = None) -> MaterialTable:
+    """
+    Batch form of process_material_doc. The table's to_records() equals
+    [process_material_doc(doc, columns) for doc in docs].
+    """
+    return MaterialTable.from_docs(docs, columns)
+
+
+def _is_id_lookup(search_params: dict) -> bool:
+    """True when a search only filters on an explicit list of material IDs"""
+    filters = {k for k in search_params if k not in ("fields", "num_chunks", "chunk_size")}
+    return filters == {"material_ids"}
+
+
+def _sync_cache_version(tool: str):
+    """Periodically compare the cache against the live database version"""
+    if not _summary_cache.version_check_due():
+        return
+    with _mp_session(tool) as mpr:
+        _summary_cache.set_db_version(getattr(mpr, "db_version", None))
+
+
+def _cached_summary_search(tool: str, search_params: dict) -> List[dict]:
+    """
+    Read-through summary search returning serialized documents.
+
+    Concurrent calls with the same normalized parameters share one lookup and
+    upstream request; the returned list must not be modified.
+    """
+    docs, _ = _single_flight.do(
+        "summary", SummaryCache.query_key(search_params), lambda: _summary_search(tool, search_params)
+    )
+    return docs
+
+
+def _summary_search(tool: str, search_params: dict) -> List[dict]:
+    """
+    Queries that only select material IDs are resolved per material, fetching
+    just the IDs missing from the cache; any other query is looked up in the
+    query index by its normalized parameters.
+    """
+    fields = search_params.get("fields") or SUMMARY_FIELDS
+    _sync_cache_version(tool)
+
+    if _is_id_lookup(search_params):
+        ids = list(search_params["material_ids"])
+        found = _summary_cache.get_docs(ids, fields)
+        missing = [mid for mid in ids if mid not in found]
+        if missing:
+            with _mp_session(tool) as mpr:
+                _summary_cache.set_db_version(getattr(mpr, "db_version", None))
+                fetched = [
+                    serialize_object(doc)
+                    for doc in mpr.materials.summary.search(**dict(search_params, material_ids=missing))
+                ]
+            _summary_cache.put_docs(fetched, fields)
+            found.update((str(doc.get("material_id")), doc) for doc in fetched)
+        docs = [found[mid] for mid in ids if mid in found]
+        limit = search_params.get("chunk_size")
+        return docs[:limit] if limit else docs
+
+    key = SummaryCache.query_key(search_params)
+    docs = _summary_cache.get_query(key, fields)
+    if docs is None:
+        with _mp_session(tool) as mpr:
+            _summary_cache.set_db_version(getattr(mpr, "db_version", None))
+            docs = [serialize_object(doc) for doc in mpr.materials.summary.search(**search_params)]
+        _summary_cache.put_query(key, docs, fields)
+    return docs
+
+
+def _encode_cursor(state: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state, default=str).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> dict:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not {"params", "offset", "page_size"} <= set(state):
+            raise ValueError
+        return state
+    except ValueError:
+        raise ValueError("Invalid cursor; pass the next_cursor value from a previous response")
+
+
+def _end_cursor(cursor: str) -> str:
+    """`cursor` marked as following the last result"""
+    return _encode_cursor(dict(_decode_cursor(cursor), exhausted=True))
+
+
+def _public_cursor(cursor: Optional[str]) -> Optional[str]:
+    """
+    The next_cursor a response shows: None once the results are exhausted.
+    Searches return a cursor even then, so that a truncated last page can
+    still be resumed.
+    """
+    if cursor and _decode_cursor(cursor).get("exhausted"):
+        return None
+    return cursor
+
+
+def _rewind_cursor(cursor: str, kept: int, omitted: int) -> str:
+    """
+    The cursor resuming after the first `kept` rows of a page whose last
+    `omitted` rows were dropped. Offsets normally count returned rows; a scan
+    that skips rows records the scan position after each match instead, and
+    a ranked scan the sort key of each row.
+    """
+    state = _decode_cursor(cursor)
+    state.pop("exhausted", None)
+    if "positions" in state:
+        positions, start = state.pop("positions"), state.pop("start")
+        state["offset"] = positions[kept - 1] if kept else start
+    else:
+        if "keys" in state:
+            keys, start = state.pop("keys"), state.pop("start")
+            state["after"] = keys[kept - 1] if kept else start
+        state["offset"] -= omitted
+    return _encode_cursor(state)
+
+
+def _fetch_summary_page(tool: str, search_params: dict, page: int, page_size: int, cached: bool = True) -> List[dict]:
+    """
+    Fetch one 1-based page of a summary search. Uncached pages bypass the
+    summary cache, for projection scans that are rarely read again and would
+    only evict useful documents.
+    """
+    params = dict(search_params, _page=page, chunk_size=page_size, num_chunks=1)
+    if cached:
+        return _cached_summary_search(tool, params)
+    with _mp_session(tool) as mpr:
+        return [serialize_object(doc) for doc in mpr.materials.summary.search(**params)]
+
+
+def _iter_summary_pages(
+    tool: str,
+    search_params: dict,
+    page_size: int,
+    first_page: int,
+    last_page: int,
+    cached: bool = True
+) -> Iterator[List[dict]]:
+    """
+    Yield pages first_page..last_page in order (through the summary cache
+    unless `cached` is False).
+
+    Up to PAGE_CONCURRENCY pages are fetched ahead in the background while the
+    caller processes the current one. Iteration stops after the first short
+    page, which marks the end of the result set.
+    """
+    pending = deque()
+    next_page = first_page
+
+    def submit():
+        nonlocal next_page
+        pending.append(_page_fetcher.submit(
+            tool, _fetch_summary_page, tool, search_params, next_page, page_size, cached
+        ))
+        next_page += 1
+
+    while next_page <= last_page and len(pending) < PAGE_CONCURRENCY:
+        submit()
+    try:
+        while pending:
+            docs = pending.popleft().result()
+            if len(docs) < page_size:
+                yield docs
+                return
+            if next_page <= last_page:
+                submit()
+            yield docs
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _paginated_search(
+    tool: str,
+    search_params: dict,
+    columns: Optional[List[str]],
+    num_results: int,
+    cursor: Optional[str] = None
+) -> tuple:
+    """
+    Return up to `num_results` processed materials of a summary search.
+
+    A `cursor` resumes a previous query (its stored parameters take
+    precedence). Pages are processed into a MaterialTable as they arrive, so
+    only the rows being returned are kept in memory. Returns
+    (table, search_params, next_cursor).
+    """
+    if cursor:
+        state = _decode_cursor(cursor)
+        columns = state.get("columns")
+        search_params = dict(state["params"], fields=fields_for_columns(columns))
+        offset, page_size = state["offset"], state["page_size"]
+    else:
+        offset, page_size = 0, max(1, min(num_results, PAGE_SIZE))
+    num_results = max(1, num_results)
+
+    if _is_id_lookup(search_params):
+        # An explicit ID list is bounded already; no continuation needed
+        docs = _cached_summary_search(tool, dict(search_params, chunk_size=num_results, num_chunks=1))
+        return process_material_docs(docs, columns), search_params, None
+
+    first_page = offset // page_size + 1
+    last_page = (offset + num_results - 1) // page_size + 1
+    position = (first_page - 1) * page_size
+    results = MaterialTable(columns)
+    exhausted = False
+    for docs in _iter_summary_pages(tool, search_params, page_size, first_page, last_page):
+        # The part of this page that falls inside the requested window
+        start = min(max(offset - position, 0), len(docs))
+        stop = min(max(offset + num_results - position, 0), len(docs))
+        results.extend(docs[start:stop])
+        position += len(docs)
+        exhausted = len(docs) < page_size
+
+    # More results remain if the last page was full or extended past the window
+    next_cursor = _encode_cursor({
+        "params": {k: v for k, v in search_params.items() if k != "fields"},
+        "columns": columns,
+        "offset": offset + len(results),
+        "page_size": page_size,
+        "exhausted": exhausted and position <= offset + len(results),
+    })
+    return results, search_params, next_cursor
+
+
+class PropertyFilter(NamedTuple):
+    """
+    A property search_materials_by_property filters on: the summary.search
+    parameter Materials Project evaluates it with (None when it can only be
+    evaluated locally), the summary document field holding it and its local
+    index column (None when not indexed)
+    """
+    param: Optional[str]
+    field: str
+    column: Optional[str]
+    flag: bool = False
+
+
+PROPERTY_FILTERS = {
+    "band_gap": PropertyFilter("band_gap", "band_gap", "band_gap"),
+    "formation_energy_per_atom": PropertyFilter(
+        "formation_energy", "formation_energy_per_atom", "formation_energy_per_atom"
+    ),
+    "energy_above_hull": PropertyFilter("energy_above_hull", "energy_above_hull", "energy_above_hull"),
+    "energy_per_atom": PropertyFilter("total_energy", "energy_per_atom", None),
+    "bulk_modulus": PropertyFilter("k_vrh", "bulk_modulus", "bulk_modulus"),
+    "shear_modulus": PropertyFilter("g_vrh", "shear_modulus", "shear_modulus"),
+    "density": PropertyFilter("density", "density", "density"),
+    "volume": PropertyFilter("volume", "volume", "volume"),
+    "nelements": PropertyFilter("num_elements", "nelements", "nelements"),
+    "nsites": PropertyFilter("num_sites", "nsites", None),
+    "efermi": PropertyFilter("efermi", "efermi", None),
+    "total_magnetization": PropertyFilter("total_magnetization", "total_magnetization", "total_magnetization"),
+    "cbm": PropertyFilter(None, "cbm", None),
+    "vbm": PropertyFilter(None, "vbm", None),
+    "is_stable": PropertyFilter("is_stable", "is_stable", "is_stable", flag=True),
+    "is_metal": PropertyFilter("is_metal", "is_metal", "is_metal", flag=True),
+    "is_gap_direct": PropertyFilter("is_gap_direct", "is_gap_direct", None, flag=True),
+    "theoretical": PropertyFilter("theoretical", "theoretical", None, flag=True),
+    "is_magnetic": PropertyFilter(None, "is_magnetic", "is_magnetic", flag=True),
+}
+PROPERTY_ALIASES = {
+    "formation_energy": "formation_energy_per_atom",
+    "num_elements": "nelements",
+    "num_sites": "nsites",
+    "k_vrh": "bulk_modulus",
+    "g_vrh": "shear_modulus",
+}
+
+# Properties Materials Project can sort by (`_sort_fields`); other sorts use a bounded heap
+SERVER_SORT_FIELDS = frozenset((
+    "band_gap", "formation_energy_per_atom", "energy_above_hull", "energy_per_atom", "density", "volume",
+    "nelements", "nsites", "efermi", "total_magnetization",
+))
+SORT_ORDERS = ("asc", "desc")
+
+# Pushed-down ranges need finite bounds; open ends are sent as +/-OPEN_BOUND
+OPEN_BOUND = 1e10
+# Share of materials assumed to pass a predicate when the local index cannot estimate it
+DEFAULT_SELECTIVITY = {"flag": 0.5, "range": 0.25, "bound": 0.5}
+
+_FILTER_TERM = re.compile(r"([A-Za-z_]+)\s*(>=|<=|=)\s*(\S*)")
+
+
+def _property_name(name: str) -> str:
+    name = name.strip().lower()
+    name = PROPERTY_ALIASES.get(name, name)
+    if name not in PROPERTY_FILTERS:
+        raise ValueError(
+            f"Invalid property '{name}'. Valid options: {sorted([*PROPERTY_FILTERS, *PROPERTY_ALIASES])}"
+        )
+    return name
+
+
+def _add_predicate(predicates: dict, name: str, constraint: Any):
+    """Intersect `constraint` with any predicate already on the same property"""
+    if name not in predicates:
+        predicates[name] = constraint
+    elif PROPERTY_FILTERS[name].flag:
+        if predicates[name] != constraint:
+            raise ValueError(f"Contradictory filters on '{name}'")
+    else:
+        (low, high), (new_low, new_high) = predicates[name], constraint
+        predicates[name] = (
+            low if new_low is None else new_low if low is None else max(low, new_low),
+            high if new_high is None else new_high if high is None else min(high, new_high),
+        )
+
+
+def _parse_filters(filters: str) -> dict:
+    """
+    Predicates of a filter string such as
+    "band_gap=1..3,energy_above_hull<=0.05,bulk_modulus>=100,is_stable=true"
+    as property -> (low, high) with None for an open end, or property -> bool.
+    A bare number is an equality; repeated properties intersect.
+    """
+    predicates = {}
+    for term in filter(None, (t.strip() for t in filters.split(","))):
+        match = _FILTER_TERM.fullmatch(term)
+        if not match:
+            raise ValueError(f"Invalid filter '{term}'; use e.g. band_gap=1..3, density<=4 or is_stable=true")
+        name, op, value = _property_name(match.group(1)), match.group(2), match.group(3)
+        try:
+            if PROPERTY_FILTERS[name].flag:
+                if op != "=" or value.lower() not in ("true", "false"):
+                    raise ValueError
+                constraint = value.lower() == "true"
+            else:
+                low, sep, high = value.partition("..")
+                if op != "=":
+                    if sep:
+                        raise ValueError
+                    low, high = (value, "") if op == ">=" else ("", value)
+                elif not sep:
+                    high = low
+                if not (low or high):
+                    raise ValueError
+                constraint = (float(low) if low else None, float(high) if high else None)
+        except ValueError:
+            raise ValueError(f"Invalid filter '{term}'; use e.g. band_gap=1..3, density<=4 or is_stable=true")
+        _add_predicate(predicates, name, constraint)
+    return predicates
+
+
+def _property_value(value: Any) -> Any:
+    # Elastic moduli are stored as {"voigt", "reuss", "vrh"}
+    return value.get("vrh") if isinstance(value, dict) else value
+
+
+def _predicate_matches(value: Any, constraint: Any) -> bool:
+    """Whether a summary document value satisfies a flag or (low, high) range"""
+    value = _property_value(value)
+    if value is None:
+        return False
+    if isinstance(constraint, bool):
+        return bool(value) is constraint
+    low, high = constraint
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+def _predicate_selectivity(name: str, constraint: Any) -> float:
+    """Estimated share of materials passing a predicate: exact from the local index when synced"""
+    column = PROPERTY_FILTERS[name].column
+    if column is not None and _local_index.supports(column):
+        return _local_index.selectivity(column, constraint)
+    if isinstance(constraint, bool):
+        return DEFAULT_SELECTIVITY["flag"]
+    return DEFAULT_SELECTIVITY["range" if None not in constraint else "bound"]
+
+
+def _split_predicates(predicates: dict) -> tuple:
+    """
+    (summary.search parameters, local predicates): every predicate Materials
+    Project can evaluate is pushed down; the rest are ordered most selective
+    first, so a row is rejected after as few checks as possible.
+    """
+    search_params, local = {}, []
+    for name, constraint in predicates.items():
+        prop = PROPERTY_FILTERS[name]
+        if prop.param is None:
+            local.append((name, constraint))
+        elif prop.flag:
+            search_params[prop.param] = constraint
+        else:
+            low, high = constraint
+            search_params[prop.param] = (
+                -OPEN_BOUND if low is None else low, OPEN_BOUND if high is None else high
+            )
+    local.sort(key=lambda predicate: _predicate_selectivity(*predicate))
+    return search_params, dict(local)
+
+
+def _filtered_search(
+    tool: str,
+    search_params: dict,
+    local_filters: dict,
+    columns: Optional[List[str]],
+    num_results: int,
+    state: Optional[dict] = None
+) -> tuple:
+    """
+    _paginated_search for predicates Materials Project cannot evaluate.
+
+    The pushed-down query is scanned with only the material ID and the fields
+    of `local_filters` (applied in their given order), then the requested
+    fields are fetched by ID for the matches alone, so rows failing a local
+    predicate are never downloaded in full. Returns (table, next_cursor, scanned).
+    """
+    if state is not None:
+        columns = state.get("columns")
+        search_params, local_filters = state["params"], state["filters"]
+        offset, page_size = state["offset"], state["page_size"]
+    else:
+        offset, page_size = 0, PAGE_SIZE
+    num_results = max(1, num_results)
+    tests = [(PROPERTY_FILTERS[name].field, constraint) for name, constraint in local_filters.items()]
+    scan_params = {k: v for k, v in search_params.items() if k != "fields"}
+    scan_params["fields"] = ["material_id", *dict.fromkeys(field for field, _ in tests)]
+
+    first_page = offset // page_size + 1
+    position = (first_page - 1) * page_size
+    matched, positions, scanned, resume = [], [], 0, None
+    for docs in _iter_summary_pages(tool, scan_params, page_size, first_page, sys.maxsize, cached=False):
+        for i in range(min(max(offset - position, 0), len(docs)), len(docs)):
+            scanned += 1
+            if all(_predicate_matches(docs[i].get(field), constraint) for field, constraint in tests):
+                matched.append(str(docs[i].get("material_id")))
+                positions.append(position + i + 1)
+                if len(matched) == num_results:
+                    resume = position + i + 1
+                    break
+        position += len(docs)
+        if resume is not None:
+            break
+
+    fields = fields_for_columns(columns)
+    docs = _cached_summary_search(tool, {"material_ids": matched, "fields": fields}) if matched else []
+    next_cursor = _encode_cursor({
+        "params": {k: v for k, v in search_params.items() if k != "fields"},
+        "filters": local_filters,
+        "columns": columns,
+        "offset": position if resume is None else resume,
+        "page_size": page_size,
+        "exhausted": resume is None,
+        # Scan position after each match, so a truncated page can be resumed
+        "start": offset,
+        "positions": positions,
+    })
+    return process_material_docs(docs, columns), next_cursor, scanned
+
+
+def _ranked_search(
+    tool: str,
+    search_params: dict,
+    local_filters: dict,
+    sort: tuple,
+    columns: Optional[List[str]],
+    num_results: int,
+    state: Optional[dict] = None
+) -> tuple:
+    """
+    The first `num_results` materials by a (property, descending) `sort`
+    Materials Project cannot do itself.
+
+    The pushed-down query is streamed with only the material ID, the sort
+    field and the fields of `local_filters`, and a bounded heap keeps the
+    best num_results rows, so memory stays O(k) however many materials
+    match. Ties are broken by material ID, which makes the sort key unique:
+    the cursor records the key of the last row returned, and each following
+    page keeps only the rows ranked strictly after it. Every page streams the
+    query again. The requested fields are then fetched by ID for the
+    returned page alone.
+    Returns (table, next_cursor, scanned).
+    """
+    after = None
+    if state is not None:
+        columns = state.get("columns")
+        search_params, local_filters, sort = state["params"], state["filters"], state["sort"]
+        offset = state["offset"]
+        if state.get("after") is not None:
+            value, id_key, material_id = state["after"]
+            after = (value, tuple(id_key), material_id)
+    else:
+        offset = 0
+    num_results = max(1, num_results)
+    name, descending = sort
+    field = PROPERTY_FILTERS[name].field
+    tests = [(PROPERTY_FILTERS[n].field, constraint) for n, constraint in local_filters.items()]
+    scan_params = {k: v for k, v in search_params.items() if k != "fields"}
+    scan_params["fields"] = ["material_id", *dict.fromkeys([field, *(f for f, _ in tests)])]
+    scanned = 0
+
+    def candidates() -> Iterator[tuple]:
+        nonlocal scanned
+        for docs in _iter_summary_pages(tool, scan_params, PAGE_SIZE, 1, sys.maxsize, cached=False):
+            scanned += len(docs)
+            for doc in docs:
+                value = _property_value(doc.get(field))
+                if value is not None and all(_predicate_matches(doc.get(f), c) for f, c in tests):
+                    material_id = str(doc.get("material_id"))
+                    yield -value if descending else value, _material_id_key(material_id), material_id
+
+    # One extra row tells whether another page follows
+    best = heapq.nsmallest(num_results + 1, (c for c in candidates() if after is None or c > after))
+    page = best[:num_results]
+    ids = [material_id for _, _, material_id in page]
+    docs = _cached_summary_search(tool, {"material_ids": ids, "fields": fields_for_columns(columns)}) if ids else []
+
+    next_cursor = _encode_cursor({
+        "params": {k: v for k, v in search_params.items() if k != "fields"},
+        "filters": local_filters,
+        "sort": [name, descending],
+        "columns": columns,
+        "offset": offset + len(ids),
+        "after": page[-1] if page else after,
+        "page_size": num_results,
+        "exhausted": len(best) <= num_results,
+        # Sort key of each row, so a truncated page can be resumed
+        "start": after,
+        "keys": page,
+    })
+    return process_material_docs(docs, columns), next_cursor, scanned
+
+
+def _local_search(
+    tool: str,
+    predicates: dict,
+    elements: Optional[List[str]],
+    columns: List[str],
+    num_results: int,
+    state: Optional[dict] = None,
+    sort: Optional[tuple] = None
+) -> tuple:
+    """
+    Property search answered from the local index: materials matching every
+    predicate in ID order, or by a (property, descending) `sort`, built from
+    the index when it holds every requested column and otherwise fetched by
+    ID through the summary cache.
+    Returns (table, next_cursor).
+    """
+    if state is not None:
+        columns = state.get("columns")
+        predicates, elements = state["params"]["predicates"], state["params"]["elements"]
+        sort = state["params"].get("sort")
+    offset = state["offset"] if state is not None else 0
+    num_results = max(1, num_results)
+
+    ranges, flags = {}, {}
+    for name, constraint in predicates.items():
+        prop = PROPERTY_FILTERS[name]
+        if prop.flag:
+            flags[prop.column] = constraint
+        else:
+            ranges[prop.column] = tuple(constraint)
+    rows = _local_index.query(ranges, elements, flags)
+    if sort:
+        rows = _local_index.rank(rows, PROPERTY_FILTERS[sort[0]].column, sort[1])
+    page = rows[offset:offset + num_results]
+    if set(columns) <= LOCAL_INDEX_COLUMNS:
+        docs = _local_index.documents(page)
+    else:
+        ids = _local_index.load()["material_id"][page].tolist()
+        docs = _cached_summary_search(tool, {"material_ids": ids, "fields": fields_for_columns(columns)}) if ids else []
+
+    next_cursor = _encode_cursor({
+        "params": {"predicates": predicates, "elements": elements, "sort": sort},
+        "columns": columns,
+        "offset": offset + len(page),
+        "page_size": num_results,
+        "local": True,
+        "exhausted": offset + len(page) >= len(rows),
+    })
+    return process_material_docs(docs, columns), next_cursor
+
+
+def _iter_search_tables(
+    tool: str,
+    search_params: dict,
+    columns: Optional[List[str]],
+    num_results: int
+) -> Iterator[MaterialTable]:
+    """
+    Yield the first `num_results` materials of a search as one MaterialTable
+    per upstream page, as the pages arrive, for writers that stream them out.
+    """
+    if _is_id_lookup(search_params):
+        docs = _cached_summary_search(tool, dict(search_params, chunk_size=num_results, num_chunks=1))
+        yield process_material_docs(docs, columns)
+        return
+
+    page_size = max(1, min(num_results, PAGE_SIZE))
+    remaining = num_results
+    for docs in _iter_summary_pages(tool, search_params, page_size, 1, (num_results - 1) // page_size + 1):
+        docs = docs[:remaining]
+        remaining -= len(docs)
+        if docs:
+            yield process_material_docs(docs, columns)
+
+
+def _build_search_params(
+    material_ids: Optional[str] = None,
+    formula: Optional[str] = None,
+    chemsys: Optional[str] = None,
+    elements: Optional[str] = None,
+    band_gap_min: Optional[float] = None,
+    band_gap_max: Optional[float] = None,
+    is_stable: Optional[bool] = None,
+    is_metal: Optional[bool] = None,
+    is_magnetic: Optional[bool] = None
+) -> dict:
+    """summary.search filters from the tools' common filter arguments"""
+    search_params = {}
+
+    if material_ids:
+        ids = [mid.strip() for mid in material_ids.split(",")]
+        search_params["material_ids"] = ids
+
+    if formula:
+        search_params["formula"] = formula
+
+    if chemsys:
+        search_params["chemsys"] = chemsys
+
+    if elements:
+        elem_list = [e.strip() for e in elements.split(",")]
+        search_params["elements"] = elem_list
+
+    if band_gap_min is not None or band_gap_max is not None:
+        bg_min = band_gap_min if band_gap_min is not None else 0
+        bg_max = band_gap_max if band_gap_max is not None else 100
+        search_params["band_gap"] = (bg_min, bg_max)
+
+    if is_stable is not None:
+        search_params["is_stable"] = is_stable
+
+    if is_metal is not None:
+        search_params["is_metal"] = is_metal
+
+    if is_magnetic is not None:
+        search_params["is_magnetic"] = is_magnetic
+
+    return search_params
+
+
 def _fetch_material_data_core(
     material_ids: Optional[str] = None,
     formula: Optional[str] = None,
@@ -344,556 +3610,1302 @@ def _fetch_material_data_core(
     is_stable: Optional[bool] = None,
     is_metal: Optional[bool] = None,
     is_magnetic: Optional[bool] = None,
-    num_results: int = 10
+    num_results: int = 10,
+    tool: str = "fetch_full_material_data",
+    columns: Optional[List[str]] = None,
+    cursor: Optional[str] = None
 ) -> dict:
     """
     Core function to fetch material data from Materials Project.
-    Returns a dictionary with status and data.
+    Only the summary fields needed for `columns` are requested (all when None).
+    A `cursor` from a previous result continues that query.
+    Returns a dictionary with status, data (a MaterialTable) and the next cursor.
     """
     try:
-        with MPRester(API_KEY) as mpr:
-            search_params = {"num_chunks": 1, "chunk_size": num_results}
+        search_params = _build_search_params(
+            material_ids, formula, chemsys, elements, band_gap_min, band_gap_max,
+            is_stable, is_metal, is_magnetic
+        )
 
-            if material_ids:
-                ids = [mid.strip() for mid in material_ids.split(",")]
-                search_params["material_ids"] = ids
+        search_params["fields"] = fields_for_columns(columns)
 
-            if formula:
-                search_params["formula"] = formula
+        results, search_params, next_cursor = _paginated_search(
+            tool, search_params, columns, num_results, cursor
+        )
 
-            if chemsys:
-                search_params["chemsys"] = chemsys
+        return {
+            "status": "success",
+            "count": len(results),
+            "query_params": {k: str(v) for k, v in search_params.items() if k != "fields"},
+            "data": results,
+            "next_cursor": next_cursor,
+            "timestamp": datetime.now().isoformat()
+        }
 
-            if elements:
-                elem_list = [e.strip() for e in elements.split(",")]
-                search_params["elements"] = elem_list
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
+
+
+@mcp.tool
+@_offload
+def fetch_full_material_data(
+    material_ids: Optional[str] = None,
+    formula: Optional[str] = None,
+    chemsys: Optional[str] = None,
+    elements: Optional[str] = None,
+    band_gap_min: Optional[float] = None,
+    band_gap_max: Optional[float] = None,
+    is_stable: Optional[bool] = None,
+    is_metal: Optional[bool] = None,
+    is_magnetic: Optional[bool] = None,
+    num_results: int = 10,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    detail_level: str = "standard",
+    format: Optional[str] = None
+) -> str:
+    """
+    Fetch full material data from Materials Project using summary.search.
+
+    Args:
+        material_ids: Comma-separated material IDs (e.g., "mp-149,mp-1234")
+        formula: Chemical formula (e.g., "Si", "Fe2O3")
+        chemsys: Chemical system (e.g., "Li-Fe-O")
+        elements: Comma-separated elements to include (e.g., "Si,O")
+        band_gap_min: Minimum band gap in eV
+        band_gap_max: Maximum band gap in eV
+        is_stable: Filter for thermodynamically stable materials
+        is_metal: Filter for metallic materials
+        is_magnetic: Filter for magnetic materials
+        num_results: Maximum number of results (default 10)
+        fields: Comma-separated output columns or summary fields to return
+                (e.g., "Band_Gap_eV,Formula" or "band_gap,symmetry"). Only the
+                data needed for these columns is downloaded. Default: all.
+        cursor: `next_cursor` from a previous response to fetch the next page
+                of the same query (other filters are then ignored)
+        detail_level: "summary" (key properties only), "standard" (all
+                      columns, default) or "full" (also the raw document
+                      as a nested `Full_Properties` object)
+        format: Response encoding - "json" (indented), "compact", "table"
+                (record lists as columns + rows) or "truncated" (compact,
+                size-capped). Default: the server's MP_RESPONSE_FORMAT
 
-            if band_gap_min is not None or band_gap_max is not None:
-                bg_min = band_gap_min if band_gap_min is not None else 0
-                bg_max = band_gap_max if band_gap_max is not None else 100
-                search_params["band_gap"] = (bg_min, bg_max)
+    Returns:
+        JSON string with full material data including thermodynamic, electronic,
+        mechanical, magnetic, and symmetry properties, plus `next_cursor`
+        (null when there are no more results).
+    """
+    try:
+        columns = columns_for_detail_level(detail_level, fields)
+    except ValueError as e:
+        return encode_response({
+            "status": "error",
+            "message": str(e),
+            "timestamp": datetime.now().isoformat()
+        }, format)
+
+    result = _fetch_material_data_core(
+        material_ids=material_ids,
+        formula=formula,
+        chemsys=chemsys,
+        elements=elements,
+        band_gap_min=band_gap_min,
+        band_gap_max=band_gap_max,
+        is_stable=is_stable,
+        is_metal=is_metal,
+        is_magnetic=is_magnetic,
+        num_results=num_results,
+        columns=columns,
+        cursor=cursor
+    )
+    return encode_response(result, format)
+
+
+# SpacegroupAnalyzer's default tolerances; Materials Project's own symmetry field uses symprec 0.1
+SYMPREC = 0.01
+ANGLE_TOLERANCE = 5.0
+MP_SYMPREC = 0.1
+MP_ANGLE_TOLERANCE = 5.0
+
+
+def _symmetry_tolerances(symprec: Optional[float], angle_tolerance: Optional[float], use_mp_symmetry: bool) -> tuple:
+    """Requested tolerances, defaulting to Materials Project's when its symmetry is to be used"""
+    if symprec is None:
+        symprec = MP_SYMPREC if use_mp_symmetry else SYMPREC
+    if angle_tolerance is None:
+        angle_tolerance = MP_ANGLE_TOLERANCE if use_mp_symmetry else ANGLE_TOLERANCE
+    return symprec, angle_tolerance
+
+
+def _as_structure(structure: Any) -> Any:
+    if isinstance(structure, dict):
+        return _lazy_import("pymatgen.core", "Structure").from_dict(structure)
+    return structure
+
+
+def _symmetry_info(structure: Any, symprec: float = SYMPREC, angle_tolerance: float = ANGLE_TOLERANCE) -> dict:
+    """Space group analysis of a structure; empty if it fails"""
+    try:
+        sga = _lazy_import("pymatgen.symmetry.analyzer", "SpacegroupAnalyzer")(
+            structure, symprec=symprec, angle_tolerance=angle_tolerance
+        )
+        return {
+            "space_group_symbol": sga.get_space_group_symbol(),
+            "space_group_number": sga.get_space_group_number(),
+            "crystal_system": sga.get_crystal_system(),
+            "point_group": sga.get_point_group_symbol(),
+            "hall_symbol": sga.get_hall()
+        }
+    except Exception:
+        return {}
+
+
+def _structure_cell(structure: Any) -> Any:
+    """
+    Compact picklable form of a structure for the analysis workers: a
+    (lattice matrix, species, fractional coordinates) tuple when it is
+    ordered and carries no site properties (such as magmom, which the
+    analysis uses), otherwise the structure itself.
+    """
+    if structure.is_ordered and not structure.site_properties:
+        return (structure.lattice.matrix, [str(site.specie) for site in structure], structure.frac_coords)
+    return structure
+
+
+def _symmetry_batch(cells: list, symprec: float, angle_tolerance: float) -> list:
+    """Symmetry of a batch of structure cells; module level so that it runs in analysis workers"""
+    Lattice, Structure = _lazy_import("pymatgen.core", "Lattice"), _lazy_import("pymatgen.core", "Structure")
+
+    results = []
+    for cell in cells:
+        if isinstance(cell, tuple):
+            matrix, species, coords = cell
+            cell = Structure(Lattice(matrix), species, coords)
+        results.append(_symmetry_info(cell, symprec, angle_tolerance))
+    return results
+
+
+def _structure_hash(structure: Any) -> str:
+    """Digest of lattice, species, wrapped fractional coordinates and magnetic moments"""
+    digest = hashlib.sha256()
+    digest.update((np.round(structure.lattice.matrix, 5) + 0.0).tobytes())
+    digest.update(",".join(site.species_string for site in structure).encode())
+    digest.update((np.round(np.mod(structure.frac_coords, 1.0), 5) + 0.0).tobytes())
+    digest.update(json.dumps(structure.site_properties.get("magmom"), default=str).encode())
+    return digest.hexdigest()
+
+
+def _symmetry_keys(material_id: Optional[str], structure: Any, symprec: float, angle_tolerance: float) -> List[str]:
+    """Symmetry cache keys, most specific first: material ID, then structure hash, plus tolerances"""
+    tolerances = f"{float(symprec)!r}|{float(angle_tolerance)!r}"
+    keys = [f"sha:{_structure_hash(structure)}|{tolerances}"]
+    if material_id:
+        keys.insert(0, f"id:{material_id}|{tolerances}")
+    return keys
+
+
+def _mp_symmetry(symmetry: Any, symprec: float, angle_tolerance: float) -> Optional[dict]:
+    """Materials Project's precomputed symmetry in get_structure_details' layout, if its tolerances match"""
+    symmetry = serialize_object(symmetry) if symmetry is not None else None
+    if not symmetry or symmetry.get("symprec") is None or symmetry.get("angle_tolerance") is None:
+        return None
+    if abs(symmetry["symprec"] - symprec) > 1e-9 or abs(symmetry["angle_tolerance"] - angle_tolerance) > 1e-9:
+        return None
+    crystal_system = symmetry.get("crystal_system")
+    return {
+        "space_group_symbol": symmetry.get("symbol"),
+        "space_group_number": symmetry.get("number"),
+        "crystal_system": crystal_system.lower() if isinstance(crystal_system, str) else crystal_system,
+        "point_group": symmetry.get("point_group"),
+        # Not part of Materials Project's symmetry data
+        "hall_symbol": None
+    }
+
+
+def _with_source(symmetry: dict, source: str, symprec: float, angle_tolerance: float) -> dict:
+    return dict(symmetry, source=source, symprec=symprec, angle_tolerance=angle_tolerance)
+
+
+def _resolve_symmetry(items: List[tuple], symprec: float, angle_tolerance: float, compute: bool) -> list:
+    """
+    Symmetry of (material_id, structure, mp_symmetry) items, taken from
+    Materials Project's precomputed field when given with matching
+    tolerances, else from the symmetry cache, else (with `compute`) from a
+    local analysis that is then cached. Returns [(symmetry or None, cache
+    keys)], None marking analyses left to the caller.
+    """
+    resolved = [None] * len(items)
+    lookups = []
+    for i, (material_id, structure, mp_symmetry) in enumerate(items):
+        trusted = _mp_symmetry(mp_symmetry, symprec, angle_tolerance)
+        if trusted is not None:
+            resolved[i] = (_with_source(trusted, "materials_project", symprec, angle_tolerance), [])
+        else:
+            lookups.append((i, _symmetry_keys(material_id, structure, symprec, angle_tolerance)))
+
+    # Material keys first, then structure hashes for what is still missing
+    for level in (0, 1):
+        pending = [(i, keys) for i, keys in lookups if resolved[i] is None and len(keys) > level]
+        found = _summary_cache.get_symmetry([keys[level] for _, keys in pending])
+        for i, keys in pending:
+            if keys[level] in found:
+                resolved[i] = (_with_source(found[keys[level]], "cache", symprec, angle_tolerance), keys)
+                if level:
+                    _summary_cache.put_symmetry({keys[0]: found[keys[level]]})
+
+    computed = {}
+    for i, keys in lookups:
+        if resolved[i] is not None:
+            continue
+        if not compute:
+            resolved[i] = (None, keys)
+            continue
+        # Identical structures within the batch share one analysis
+        symmetry = computed.get(keys[-1]) or _symmetry_info(items[i][1], symprec, angle_tolerance)
+        computed.update((key, symmetry) for key in keys if symmetry)
+        resolved[i] = (_with_source(symmetry, "computed", symprec, angle_tolerance), keys)
+    _summary_cache.put_symmetry(computed)
+    return resolved
+
+
+# Site encodings of structure responses
+SITE_FORMATS = ("records", "arrays", "base64")
+SITE_DTYPES = ("float64", "float32")
+
+
+def _encode_array(values: np.ndarray, dtype: str) -> dict:
+    """Little-endian base64 buffer of a numeric array with its dtype and shape"""
+    data = np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder("<"))
+    return {"dtype": dtype, "shape": list(data.shape), "data": base64.b64encode(data.tobytes()).decode()}
+
+
+def _site_records(structure: Any, include_cartesian: bool) -> list:
+    """One object per site with its species, coordinates and properties"""
+    sites = []
+    for site in structure.sites:
+        site_info = {"species": str(site.specie), "coords_fractional": list(site.frac_coords)}
+        if include_cartesian:
+            site_info["coords_cartesian"] = list(site.coords)
+        site_info["properties"] = serialize_object(site.properties) if site.properties else {}
+        sites.append(site_info)
+    return sites
+
+
+def _site_arrays(structure: Any, site_format: str, dtype: str, include_cartesian: bool) -> dict:
+    """
+    Sites as a species table with per-site indices and Nx3 coordinate
+    arrays, as nested lists or (for "base64") encoded buffers.
+    """
+    species = [str(site.specie) for site in structure]
+    table = list(dict.fromkeys(species))
+    position = {name: i for i, name in enumerate(table)}
+    if site_format == "base64":
+        encode = functools.partial(_encode_array, dtype=dtype)
+    else:
+        encode = np.ndarray.tolist
+    sites = {
+        "species": table,
+        "species_index": [position[name] for name in species],
+        "coords_fractional": encode(structure.frac_coords),
+    }
+    if include_cartesian:
+        sites["coords_cartesian"] = encode(structure.cart_coords)
+    properties = structure.site_properties
+    if properties:
+        sites["properties"] = serialize_object(properties)
+    return sites
+
+
+def _check_site_options(site_format: str, coordinate_dtype: str):
+    if site_format not in SITE_FORMATS:
+        raise ValueError(f"Invalid site_format '{site_format}'. Available: {', '.join(SITE_FORMATS)}")
+    if coordinate_dtype not in SITE_DTYPES:
+        raise ValueError(f"Invalid coordinate_dtype '{coordinate_dtype}'. Available: {', '.join(SITE_DTYPES)}")
+
+
+def _describe_structure(
+    structure: Any,
+    site_format: str = "records",
+    coordinate_dtype: str = "float64",
+    include_cartesian: bool = True
+) -> dict:
+    """Lattice and sites of a structure, the sites encoded as `site_format`"""
+    structure = _as_structure(structure)
+    lattice = structure.lattice
+    lattice_info = {
+        "a": lattice.a,
+        "b": lattice.b,
+        "c": lattice.c,
+        "alpha": lattice.alpha,
+        "beta": lattice.beta,
+        "gamma": lattice.gamma,
+        "volume": lattice.volume,
+        "matrix": lattice.matrix.tolist()
+    }
+
+    if site_format == "records":
+        sites = _site_records(structure, include_cartesian)
+    else:
+        sites = _site_arrays(structure, site_format, coordinate_dtype, include_cartesian)
+
+    return {
+        "formula": structure.composition.reduced_formula,
+        "lattice": lattice_info,
+        "num_sites": len(structure),
+        "sites": sites,
+    }
+
+
+@mcp.tool
+@_offload
+def get_structure_details(
+    material_id: str,
+    symprec: Optional[float] = None,
+    angle_tolerance: Optional[float] = None,
+    use_mp_symmetry: bool = False,
+    site_format: str = "records",
+    coordinate_dtype: str = "float64",
+    include_cartesian: bool = True,
+    format: Optional[str] = None
+) -> str:
+    """
+    Get detailed crystal structure information for a specific material.
 
-            if is_stable is not None:
-                search_params["is_stable"] = is_stable
+    Symmetry results are cached per material and per structure for each
+    pair of tolerances.
 
-            if is_metal is not None:
-                search_params["is_metal"] = is_metal
+    Args:
+        material_id: Materials Project ID (e.g., "mp-149")
+        symprec: Distance tolerance of the symmetry analysis in Angstrom
+                 (default: 0.01, or Materials Project's 0.1 with use_mp_symmetry)
+        angle_tolerance: Angle tolerance of the symmetry analysis in degrees (default: 5)
+        use_mp_symmetry: Use Materials Project's precomputed symmetry instead of a
+                         local analysis when it was computed with the same tolerances
+                         (it has no Hall symbol); explicitly given tolerances that differ
+                         from Materials Project's fall back to a local analysis
+        site_format: "records" (one object per site), "arrays" (species table, per-site
+                     species_index and Nx3 coordinate lists) or "base64" (as "arrays",
+                     with coordinates as base64 little-endian buffers)
+        coordinate_dtype: "float64" or "float32" precision of "base64" coordinates
+        include_cartesian: Include cartesian coordinates (derivable from the lattice
+                           matrix and fractional coordinates)
+        format: Response encoding - "json" (indented), "compact", "table"
+                (record lists as columns + rows) or "truncated" (compact,
+                size-capped). Default: the server's MP_RESPONSE_FORMAT
 
-            if is_magnetic is not None:
-                search_params["is_magnetic"] = is_magnetic
+    Returns:
+        JSON string with lattice parameters, atomic sites, coordinates,
+        space group, and other structural details.
+    """
+    try:
+        _check_site_options(site_format, coordinate_dtype)
+        symprec, angle_tolerance = _symmetry_tolerances(symprec, angle_tolerance, use_mp_symmetry)
+        mp_symmetry = None
+        if use_mp_symmetry:
+            docs = _cached_summary_search("get_structure_details", {
+                "material_ids": [material_id],
+                "fields": ["material_id", "structure", "symmetry"]
+            })
+            if not docs:
+                raise ValueError(f"No structure found for {material_id}")
+            structure, mp_symmetry = _as_structure(docs[0]["structure"]), docs[0].get("symmetry")
+        else:
+            def fetch():
+                with _mp_session("get_structure_details") as mpr:
+                    return mpr.get_structure_by_material_id(material_id)
 
-            search_params["fields"] = SUMMARY_FIELDS
+            structure, _ = _single_flight.do("structure", material_id, fetch)
 
-            docs = mpr.materials.summary.search(**search_params)
+        [(symmetry, _)] = _resolve_symmetry(
+            [(material_id, structure, mp_symmetry)], symprec, angle_tolerance, compute=True
+        )
 
-            results = []
-            for doc in docs:
-                processed = process_material_doc(doc)
-                results.append(processed)
+        output = {
+            "status": "success",
+            "material_id": material_id,
+            **_describe_structure(structure, site_format, coordinate_dtype, include_cartesian),
+            "symmetry": symmetry,
+            "timestamp": datetime.now().isoformat()
+        }
 
-            return {
-                "status": "success",
-                "count": len(results),
-                "query_params": {k: str(v) for k, v in search_params.items() if k != "fields"},
-                "data": results,
-                "timestamp": datetime.now().isoformat()
-            }
+        return encode_response(output, format)
 
     except Exception as e:
-        return {
+        return encode_response({
             "status": "error",
+            "material_id": material_id,
             "message": str(e),
             "timestamp": datetime.now().isoformat()
-        }
+        }, format)
+
+
+def _fetch_structures(
+    tool: str,
+    material_ids: List[str],
+    symprec: float,
+    angle_tolerance: float,
+    use_mp_symmetry: bool,
+    compute: bool,
+    site_options: tuple
+) -> List[tuple]:
+    """
+    Fetch one chunk of structures in a single summary query and describe
+    them. Symmetry is resolved as far as _resolve_symmetry gets without
+    `compute`; unresolved entries carry the cell to analyse.
+    Returns (material_id, details, cell, cache keys) tuples.
+    """
+    fields = ["material_id", "structure"] + (["symmetry"] if use_mp_symmetry else [])
 
+    def fetch():
+        with _mp_session(tool) as mpr:
+            return mpr.materials.summary.search(material_ids=material_ids, fields=fields)
 
-@mcp.tool
-def fetch_full_material_data(
-    material_ids: Optional[str] = None,
-    formula: Optional[str] = None,
-    chemsys: Optional[str] = None,
-    elements: Optional[str] = None,
-    band_gap_min: Optional[float] = None,
-    band_gap_max: Optional[float] = None,
-    is_stable: Optional[bool] = None,
-    is_metal: Optional[bool] = None,
-    is_magnetic: Optional[bool] = None,
-    num_results: int = 10
-) -> str:
-    """
-    Fetch full material data from Materials Project using summary.search.
+    docs, _ = _single_flight.do("structures", (tuple(material_ids), tuple(fields)), fetch)
+    items = []
+    for doc in docs:
+        if not isinstance(doc, dict):
+            doc = {field: getattr(doc, field, None) for field in fields}
+        items.append((str(doc.get("material_id")), _as_structure(doc.get("structure")), doc.get("symmetry")))
 
-    Args:
-        material_ids: Comma-separated material IDs (e.g., "mp-149,mp-1234")
-        formula: Chemical formula (e.g., "Si", "Fe2O3")
-        chemsys: Chemical system (e.g., "Li-Fe-O")
-        elements: Comma-separated elements to include (e.g., "Si,O")
-        band_gap_min: Minimum band gap in eV
-        band_gap_max: Maximum band gap in eV
-        is_stable: Filter for thermodynamically stable materials
-        is_metal: Filter for metallic materials
-        is_magnetic: Filter for magnetic materials
-        num_results: Maximum number of results (default 10)
+    described = []
+    for (material_id, structure, _), (symmetry, keys) in zip(
+        items, _resolve_symmetry(items, symprec, angle_tolerance, compute)
+    ):
+        details = _describe_structure(structure, *site_options)
+        details["symmetry"] = symmetry
+        described.append((material_id, details, None if symmetry is not None else _structure_cell(structure), keys))
+    return described
 
-    Returns:
-        JSON string with full material data including thermodynamic, electronic,
-        mechanical, magnetic, and symmetry properties.
-    """
-    result = _fetch_material_data_core(
-        material_ids=material_ids,
-        formula=formula,
-        chemsys=chemsys,
-        elements=elements,
-        band_gap_min=band_gap_min,
-        band_gap_max=band_gap_max,
-        is_stable=is_stable,
-        is_metal=is_metal,
-        is_magnetic=is_magnetic,
-        num_results=num_results
-    )
-    return json.dumps(result, indent=2, default=str)
+
+def _store_symmetry(keys_and_results: List[tuple]):
+    _summary_cache.put_symmetry({
+        key: symmetry for keys, symmetry in keys_and_results if symmetry for key in keys
+    })
 
 
 @mcp.tool
-def get_structure_details(material_id: str) -> str:
+async def get_structures(
+    material_ids: str,
+    symprec: Optional[float] = None,
+    angle_tolerance: Optional[float] = None,
+    use_mp_symmetry: bool = False,
+    site_format: str = "records",
+    coordinate_dtype: str = "float64",
+    include_cartesian: bool = True,
+    ctx: Optional[Context] = None,
+    format: Optional[str] = None
+) -> str:
     """
-    Get detailed crystal structure information for a specific material.
+    Get crystal structure details for many materials at once.
+
+    Structures are fetched in chunks of MP_STRUCTURE_CHUNK_SIZE IDs per
+    summary query, several chunks concurrently. Symmetry comes from the
+    symmetry cache where possible; the remaining analyses start in worker
+    processes as soon as their chunk arrives. Progress is reported per
+    material as analyses complete.
 
     Args:
-        material_id: Materials Project ID (e.g., "mp-149")
+        material_ids: Comma-separated material IDs (e.g., "mp-149,mp-13,mp-22862")
+        symprec: Distance tolerance of the symmetry analysis in Angstrom
+                 (default: 0.01, or Materials Project's 0.1 with use_mp_symmetry)
+        angle_tolerance: Angle tolerance of the symmetry analysis in degrees (default: 5)
+        use_mp_symmetry: Use Materials Project's precomputed symmetry instead of a
+                         local analysis when it was computed with the same tolerances
+                         (it has no Hall symbol); explicitly given tolerances that differ
+                         from Materials Project's fall back to a local analysis
+        site_format: "records" (one object per site), "arrays" (species table, per-site
+                     species_index and Nx3 coordinate lists) or "base64" (as "arrays",
+                     with coordinates as base64 little-endian buffers)
+        coordinate_dtype: "float64" or "float32" precision of "base64" coordinates
+        include_cartesian: Include cartesian coordinates (derivable from the lattice
+                           matrix and fractional coordinates)
+        format: Response encoding - "json" (indented), "compact", "table"
+                (record lists as columns + rows) or "truncated" (compact,
+                size-capped). Default: the server's MP_RESPONSE_FORMAT
 
     Returns:
-        JSON string with lattice parameters, atomic sites, coordinates,
-        space group, and other structural details.
+        JSON string with the lattice, sites and symmetry of each material in
+        the requested order, plus the IDs that were not found.
     """
     try:
-        with MPRester(API_KEY) as mpr:
-            structure = mpr.get_structure_by_material_id(material_id)
-
-            lattice = structure.lattice
-            lattice_info = {
-                "a": lattice.a,
-                "b": lattice.b,
-                "c": lattice.c,
-                "alpha": lattice.alpha,
-                "beta": lattice.beta,
-                "gamma": lattice.gamma,
-                "volume": lattice.volume,
-                "matrix": lattice.matrix.tolist()
-            }
+        ids = list(dict.fromkeys(mid.strip() for mid in material_ids.split(",") if mid.strip()))
+        if not ids:
+            raise ValueError("No material IDs given")
+        _check_site_options(site_format, coordinate_dtype)
+        symprec, angle_tolerance = _symmetry_tolerances(symprec, angle_tolerance, use_mp_symmetry)
 
-            sites = []
-            for site in structure.sites:
-                site_info = {
-                    "species": str(site.specie),
-                    "coords_fractional": list(site.frac_coords),
-                    "coords_cartesian": list(site.coords),
-                    "properties": serialize_object(site.properties) if site.properties else {}
-                }
-                sites.append(site_info)
+        results = {}
+        use_processes = _analysis_pool.enabled and len(ids) > 1
 
-            analyzer_data = {}
+        async def completed(material_id: str, details: dict):
+            results[material_id] = details
+            if ctx is not None:
+                await ctx.report_progress(len(results), len(ids), f"{material_id} {details['formula']}")
+
+        async def analyse(batch: List[tuple]):
             try:
-                from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
-                sga = SpacegroupAnalyzer(structure)
-                analyzer_data = {
-                    "space_group_symbol": sga.get_space_group_symbol(),
-                    "space_group_number": sga.get_space_group_number(),
-                    "crystal_system": sga.get_crystal_system(),
-                    "point_group": sga.get_point_group_symbol(),
-                    "hall_symbol": sga.get_hall()
-                }
-            except Exception:
-                pass
-
-            output = {
-                "status": "success",
-                "material_id": material_id,
-                "formula": structure.composition.reduced_formula,
-                "lattice": lattice_info,
-                "num_sites": len(sites),
-                "sites": sites,
-                "symmetry": analyzer_data,
-                "timestamp": datetime.now().isoformat()
-            }
+                symmetries = await asyncio.wrap_future(_analysis_pool.submit(
+                    _symmetry_batch, [cell for _, _, cell, _ in batch], symprec, angle_tolerance
+                ))
+            except BrokenProcessPool as e:
+                _analysis_pool.restart()
+                symmetries = [{"error": f"Analysis worker failed: {e}"}] * len(batch)
+            else:
+                await asyncio.to_thread(
+                    _store_symmetry, [(keys, symmetry) for (_, _, _, keys), symmetry in zip(batch, symmetries)]
+                )
+            for (material_id, details, _, _), symmetry in zip(batch, symmetries):
+                details["symmetry"] = _with_source(symmetry, "computed", symprec, angle_tolerance)
+                await completed(material_id, details)
+
+        async def fetch_chunk(chunk: List[str]):
+            described = await asyncio.wrap_future(_page_fetcher.submit(
+                "get_structures", _fetch_structures, "get_structures", chunk,
+                symprec, angle_tolerance, use_mp_symmetry, not use_processes,
+                (site_format, coordinate_dtype, include_cartesian)
+            ))
+            pending = []
+            for entry in described:
+                if entry[2] is None:
+                    await completed(entry[0], entry[1])
+                else:
+                    pending.append(entry)
+            if not pending:
+                return
+            # One batch per worker keeps inter-process traffic per structure small
+            size = -(-len(pending) // _analysis_pool.max_workers)
+            await asyncio.gather(*(analyse(pending[i:i + size]) for i in range(0, len(pending), size)))
+
+        await asyncio.gather(*(
+            fetch_chunk(ids[i:i + STRUCTURE_CHUNK_SIZE]) for i in range(0, len(ids), STRUCTURE_CHUNK_SIZE)
+        ))
+
+        output = {
+            "status": "success",
+            "num_requested": len(ids),
+            "num_structures": len(results),
+            "structures": [{"material_id": mid, **results[mid]} for mid in ids if mid in results],
+            "missing": [mid for mid in ids if mid not in results],
+            "timestamp": datetime.now().isoformat()
+        }
 
-            return json.dumps(output, indent=2, default=str)
+        return encode_response(output, format)
 
     except Exception as e:
-        return json.dumps({
+        return encode_response({
             "status": "error",
-            "material_id": material_id,
             "message": str(e),
             "timestamp": datetime.now().isoformat()
-        }, indent=2)
+        }, format)
 
 
 @mcp.tool
+@_offload
 def search_materials_by_property(
-    property_name: str,
+    property_name: Optional[str] = None,
     min_value: Optional[float] = None,
     max_value: Optional[float] = None,
-    num_results: int = 20
+    num_results: int = 20,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    detail_level: str = "standard",
+    elements: Optional[str] = None,
+    use_local_index: Optional[bool] = None,
+    filters: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    order: str = "asc",
+    top_k: Optional[int] = None,
+    format: Optional[str] = None
 ) -> str:
     """
-    Search materials by specific property ranges.
+    Search materials by one or more property ranges and flags, optionally ranked.
 
     Args:
         property_name: Property to search (band_gap, formation_energy_per_atom,
-                      energy_above_hull, bulk_modulus, shear_modulus, density, volume)
+                      energy_above_hull, bulk_modulus, shear_modulus, density, volume, ...)
         min_value: Minimum value for the property
         max_value: Maximum value for the property
         num_results: Maximum number of results
+        fields: Comma-separated output columns or summary fields to return
+                (e.g., "Formula,Band_Gap_eV"). Default: all.
+        cursor: `next_cursor` from a previous response to fetch the next page
+                of the same search
+        detail_level: "summary", "standard" (default) or "full" (adds the raw
+                      document as a nested `Full_Properties` object)
+        elements: Comma-separated elements the materials must contain (e.g., "Li,O")
+        use_local_index: Answer the range query from the synced local index
+                         instead of Materials Project. Default: the server's
+                         MP_LOCAL_INDEX setting
+        filters: Comma-separated predicates all materials must satisfy, combined
+                 with property_name/min_value/max_value, e.g.
+                 "band_gap=1..3,energy_above_hull<=0.05,bulk_modulus>=100,is_stable=true".
+                 Ranges take "=low..high" (either end may be omitted), "=value",
+                 ">=" or "<="; flags (is_stable, is_metal, is_magnetic,
+                 is_gap_direct, theoretical) take "=true" or "=false"
+        sort_by: Numeric property to rank the results by (any range property
+                 of `filters`); materials without a value are left out
+        order: "asc" (default, smallest first) or "desc" (largest first)
+        top_k: Return only the best `top_k` materials by `sort_by`, without a
+               `next_cursor` (replaces num_results)
+        format: Response encoding - "json" (indented), "compact", "table"
+                (record lists as columns + rows) or "truncated" (compact,
+                size-capped). Default: the server's MP_RESPONSE_FORMAT
 
     Returns:
-        JSON string with materials matching the property criteria.
-    """
-    valid_properties = {
-        "band_gap": "band_gap",
-        "formation_energy": "formation_energy_per_atom",
-        "formation_energy_per_atom": "formation_energy_per_atom",
-        "energy_above_hull": "energy_above_hull",
-        "bulk_modulus": "bulk_modulus",
-        "shear_modulus": "shear_modulus",
-        "density": "density",
-        "volume": "volume",
-        "total_magnetization": "total_magnetization"
-    }
+        JSON string with materials matching every criterion and a
+        `next_cursor` for the following page (null when exhausted).
+    """
+    tool = "search_materials_by_property"
+    try:
+        columns = columns_for_detail_level(detail_level, fields)
+        state = _decode_cursor(cursor) if cursor else None
+
+        element_list = [e.strip() for e in elements.split(",")] if elements else None
+        if order not in SORT_ORDERS:
+            raise ValueError(f"Invalid order '{order}'. Valid options: {list(SORT_ORDERS)}")
+        if top_k is not None:
+            if top_k < 1:
+                raise ValueError(f"Invalid top_k {top_k}; it must be at least 1")
+            if not sort_by:
+                raise ValueError("top_k needs sort_by")
+            num_results = top_k
+        sort = None
+        if state is None:
+            predicates = _parse_filters(filters) if filters else {}
+            if property_name:
+                _add_predicate(predicates, _property_name(property_name), (min_value, max_value))
+            if sort_by:
+                sort = (_property_name(sort_by), order == "desc")
+                if PROPERTY_FILTERS[sort[0]].flag:
+                    raise ValueError(f"Cannot sort by the flag '{sort[0]}'")
+                # Ranking only covers materials that have a value
+                _add_predicate(predicates, sort[0], (None, None))
+            if not predicates:
+                raise ValueError("Pass property_name with min_value/max_value, filters or sort_by")
+            search_params, local_filters = _split_predicates(predicates)
+            # The index answers the search only if it holds a column for every predicate
+            local = (LOCAL_INDEX if use_local_index is None else use_local_index) and all(
+                PROPERTY_FILTERS[name].column is not None and _local_index.supports(PROPERTY_FILTERS[name].column)
+                for name in predicates
+            )
+        else:
+            # A cursor carries its query; the other filter arguments are ignored
+            predicates, search_params, local_filters = {}, {}, state.get("filters") or {}
+            local = bool(state.get("local"))
+            sort = state.get("sort")
+
+        # How the ranking is done: by the index, by Materials Project or by a bounded heap here
+        sort_method = None
+        if sort and local:
+            sort_method = "local_index"
+        elif sort and (state is None and PROPERTY_FILTERS[sort[0]].field in SERVER_SORT_FIELDS):
+            search_params["_sort_fields"] = ("-" if sort[1] else "") + PROPERTY_FILTERS[sort[0]].field
+            sort_method = "materials_project"
+        elif sort:
+            sort_method = "heap"
+
+        scanned = None
+        if local:
+            results, next_cursor = _local_search(tool, predicates, element_list, columns, num_results, state, sort)
+            source = {"source": "local_index", "index_synced": _local_index.meta.get("synced")}
+        elif sort_method == "heap":
+            if element_list:
+                search_params["elements"] = element_list
+            results, next_cursor, scanned = _ranked_search(
+                tool, search_params, local_filters, sort, columns, num_results, state
+            )
+            source = {"source": "materials_project"}
+        elif local_filters:
+            if element_list:
+                search_params["elements"] = element_list
+            results, next_cursor, scanned = _filtered_search(
+                tool, search_params, local_filters, columns, num_results, state
+            )
+            source = {"source": "materials_project"}
+        else:
+            if element_list:
+                search_params["elements"] = element_list
+            search_params["fields"] = fields_for_columns(columns)
+            results, _, next_cursor = _paginated_search(tool, search_params, columns, num_results, cursor)
+            source = {"source": "materials_project"}
+
+        output = {"status": "success", "count": len(results), **source}
+        if state is None:
+            output["filters"] = {
+                name: constraint if isinstance(constraint, bool) else {"min": constraint[0], "max": constraint[1]}
+                for name, constraint in predicates.items()
+            }
+            if property_name:
+                output["property_searched"] = property_name
+                output["range"] = {"min": min_value, "max": max_value}
+            if not local:
+                output["pushed_down"] = sorted(k for k in search_params if k != "fields")
+                output["evaluated_locally"] = list(local_filters)
+            if sort:
+                output["sort"] = {"by": sort[0], "order": order, "method": sort_method}
+        if top_k is not None and next_cursor:
+            next_cursor = _end_cursor(next_cursor)
+        if scanned is not None:
+            output["rows_scanned"] = scanned
+        output["data"] = results
+        output["next_cursor"] = next_cursor
+        output["timestamp"] = datetime.now().isoformat()
+
+        return encode_response(output, format)
 
-    if property_name.lower() not in valid_properties:
-        return json.dumps({
+    except Exception as e:
+        return encode_response({
             "status": "error",
-            "message": f"Invalid property. Valid options: {list(valid_properties.keys())}",
+            "message": str(e),
             "timestamp": datetime.now().isoformat()
-        }, indent=2)
+        }, format)
 
-    prop_key = valid_properties[property_name.lower()]
 
-    try:
-        with MPRester(API_KEY) as mpr:
-            search_params = {
-                "num_chunks": 1,
-                "chunk_size": num_results,
-                "fields": SUMMARY_FIELDS
-            }
+def _phase_diagram_record(tool: str, chemsys: str) -> tuple:
+    """
+    Resolve a chemical system to a cached or freshly fetched phase diagram record.
 
-            min_val = min_value if min_value is not None else -1e10
-            max_val = max_value if max_value is not None else 1e10
-            search_params[prop_key] = (min_val, max_val)
+    Returns (elements, source elements, record, entry cache outcome, fetch seconds);
+    the source is a larger cached system when the request is one of its subsystems.
+    The outcome is "hit", "subsystem", "miss" or "coalesced" (another call's
+    concurrent fetch was shared).
+    """
+    elements = frozenset(el.strip() for el in chemsys.split("-") if el.strip())
+    if not elements:
+        raise ValueError(f"Invalid chemical system '{chemsys}'")
+
+    _sync_cache_version(tool)
+    source, record = _phase_diagram_cache.lookup(elements, _summary_cache.db_version)
+    if record is not None:
+        return elements, source, record, "hit" if source == elements else "subsystem", 0.0
+
+    def fetch():
+        with _mp_session(tool) as mpr:
+            db_version = getattr(mpr, "db_version", None)
+            _summary_cache.set_db_version(db_version)
+            start = time.perf_counter()
+            entries = mpr.get_entries_in_chemsys("-".join(sorted(elements)))
+            fetch_seconds = time.perf_counter() - start
+        record = _PhaseDiagramRecord(entries, fetch_seconds, db_version)
+        _phase_diagram_cache.store(elements, record)
+        return record
+
+    # Concurrent requests for the same system share one fetch and, through
+    # the record, one hull build
+    record, shared = _single_flight.do("chemsys", elements, fetch)
+    if shared:
+        return elements, elements, record, "coalesced", 0.0
+    return elements, elements, record, "miss", record.fetch_seconds
 
-            docs = mpr.materials.summary.search(**search_params)
 
-            results = []
-            for doc in docs:
-                processed = process_material_doc(doc)
-                results.append(processed)
-
-            output = {
-                "status": "success",
-                "count": len(results),
-                "property_searched": property_name,
-                "range": {"min": min_value, "max": max_value},
-                "data": results,
-                "timestamp": datetime.now().isoformat()
+@mcp.tool
+@_offload
+def get_phase_diagram_info(chemsys: str, format: Optional[str] = None) -> str:
+    """
+    Get phase diagram information for a chemical system.
+
+    The convex hull is built on the server and cached together with the
+    entries per chemical system; a request for a subsystem of a cached
+    system (e.g. "Li-O" after "Li-Fe-O") is answered from the larger hull.
+
+    Args:
+        chemsys: Chemical system (e.g., "Li-Fe-O", "Si-O")
+        format: Response encoding - "json" (indented), "compact", "table"
+                (record lists as columns + rows) or "truncated" (compact,
+                size-capped). Default: the server's MP_RESPONSE_FORMAT
+
+    Returns:
+        JSON string with phase diagram entries, their formation energy,
+        energy above hull and decomposition products, the stable phases,
+        and the time spent fetching entries vs. constructing the hull.
+    """
+    try:
+        start = time.perf_counter()
+        elements, source, record, entries_cache, fetch_seconds = _phase_diagram_record(
+            "get_phase_diagram_info", chemsys
+        )
+        hull_built = record.hull()
+        analysis_built = record.analyse()
+
+        entry_data = []
+        stable_phases = []
+        for entry, analysis in zip(record.entries, record.analysis):
+            if source != elements and not _entry_elements(entry) <= elements:
+                continue
+            entry_info = {
+                "entry_id": str(entry.entry_id),
+                "composition": str(entry.composition.reduced_formula),
+                "energy": entry.energy,
+                "energy_per_atom": entry.energy_per_atom,
+                "correction": entry.correction,
+                "parameters": serialize_object(entry.parameters) if hasattr(entry, 'parameters') else {},
+                **analysis
             }
+            entry_data.append(entry_info)
+            if analysis["is_stable"]:
+                stable_phases.append({
+                    "entry_id": entry_info["entry_id"],
+                    "composition": entry_info["composition"],
+                    "formation_energy_per_atom": analysis["formation_energy_per_atom"],
+                })
+
+        output = {
+            "status": "success",
+            "chemsys": chemsys,
+            "elements": sorted(elements),
+            "num_entries": len(entry_data),
+            "num_stable": len(stable_phases),
+            "stable_phases": stable_phases,
+            "entries": entry_data,
+            "cache": {
+                "entries": entries_cache,
+                "hull": "built" if hull_built else "hit",
+                "source_chemsys": "-".join(sorted(source)),
+            },
+            "timing": {
+                "fetch_seconds": round(fetch_seconds, 4),
+                "hull_seconds": round(record.hull_seconds, 4) if hull_built else 0.0,
+                "decomposition_seconds": round(record.decomposition_seconds, 4) if analysis_built else 0.0,
+                "total_seconds": round(time.perf_counter() - start, 4),
+            },
+            "timestamp": datetime.now().isoformat()
+        }
 
-            return json.dumps(output, indent=2, default=str)
+        return encode_response(output, format)
 
     except Exception as e:
-        return json.dumps({
+        return encode_response({
             "status": "error",
+            "chemsys": chemsys,
             "message": str(e),
             "timestamp": datetime.now().isoformat()
-        }, indent=2)
+        }, format)
+
+
+def _parse_candidates(candidates: str) -> List[tuple]:
+    """
+    Split "formula:energy_per_atom" pairs separated by commas, semicolons or
+    newlines into (formula, energy, error) triples. A non-numeric energy is
+    reported on its own candidate (energy None), like an invalid formula.
+    """
+    parsed = []
+    for item in candidates.replace(";", ",").replace("\n", ",").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        formula, sep, energy = item.rpartition(":")
+        if not sep or not formula.strip():
+            raise ValueError(f"Candidate '{item}' is not of the form formula:energy_per_atom")
+        try:
+            value = float(energy)
+            if not np.isfinite(value):
+                raise ValueError
+            parsed.append((formula.strip(), value, None))
+        except ValueError:
+            parsed.append((formula.strip(), None, f"Candidate '{item}' has a non-numeric energy_per_atom"))
+    if not parsed:
+        raise ValueError("No candidates given")
+    return parsed
 
 
 @mcp.tool
-def get_phase_diagram_info(chemsys: str) -> str:
+@_offload
+def get_hull_distances(chemsys: str, candidates: str, format: Optional[str] = None) -> str:
     """
-    Get phase diagram information for a chemical system.
+    Energy above hull and decomposition of hypothetical compositions.
+
+    All candidates are evaluated in one vectorized pass against the cached
+    convex hull of the chemical system (shared with get_phase_diagram_info),
+    so the entries are fetched and the hull built at most once.
 
     Args:
-        chemsys: Chemical system (e.g., "Li-Fe-O", "Si-O")
+        chemsys: Chemical system the candidates belong to (e.g., "Li-Fe-P-O")
+        candidates: Comma- or newline-separated "formula:energy_per_atom" pairs in eV/atom,
+                    on the same energy scale as Materials Project entries
+                    (e.g., "LiFePO4:-6.91,Li2FeP2O7:-6.85")
+        format: Response encoding - "json" (indented), "compact", "table"
+                (record lists as columns + rows) or "truncated" (compact,
+                size-capped). Default: the server's MP_RESPONSE_FORMAT
 
     Returns:
-        JSON string with phase diagram entries and stability information.
+        JSON string with the formation energy, energy above hull (negative
+        below the hull) and decomposition products of each candidate.
     """
     try:
-        with MPRester(API_KEY) as mpr:
-            entries = mpr.get_entries_in_chemsys(chemsys)
+        start = time.perf_counter()
+        Composition = _lazy_import("pymatgen.core", "Composition")
 
-            entry_data = []
-            for entry in entries:
-                entry_info = {
-                    "entry_id": str(entry.entry_id),
-                    "composition": str(entry.composition.reduced_formula),
-                    "energy": entry.energy,
-                    "energy_per_atom": entry.energy_per_atom,
-                    "correction": entry.correction,
-                    "parameters": serialize_object(entry.parameters) if hasattr(entry, 'parameters') else {}
-                }
-                entry_data.append(entry_info)
+        parsed = _parse_candidates(candidates)
+        elements, source, record, entries_cache, fetch_seconds = _phase_diagram_record(
+            "get_hull_distances", chemsys
+        )
+        hull_built = record.hull()
 
-            output = {
-                "status": "success",
-                "chemsys": chemsys,
-                "num_entries": len(entry_data),
-                "entries": entry_data,
-                "timestamp": datetime.now().isoformat()
-            }
+        evaluate_start = time.perf_counter()
+        results = []
+        valid = []
+        for formula, energy, error in parsed:
+            result = {"formula": formula, "energy_per_atom": energy}
+            try:
+                if error:
+                    raise ValueError(error)
+                composition = Composition(formula)
+                extra = {el.symbol for el in composition.elements} - elements
+                if extra:
+                    raise ValueError(f"elements {sorted(extra)} are not in {chemsys}")
+                result["reduced_formula"] = composition.reduced_formula
+                valid.append((len(results), composition))
+            except Exception as e:
+                result["error"] = str(e)
+            results.append(result)
+
+        if valid:
+            formation, above_hull, decompositions = record.evaluate(
+                [composition for _, composition in valid],
+                [results[i]["energy_per_atom"] for i, _ in valid]
+            )
+            for k, (i, _) in enumerate(valid):
+                if np.isnan(above_hull[k]):
+                    results[i]["error"] = "No hull facet contains this composition"
+                    continue
+                results[i].update({
+                    "formation_energy_per_atom": float(formation[k]),
+                    "e_above_hull": float(above_hull[k]),
+                    "is_stable": bool(above_hull[k] <= record.diagram.numerical_tol),
+                    "decomposition": decompositions[k],
+                })
+
+        output = {
+            "status": "success",
+            "chemsys": chemsys,
+            "elements": sorted(elements),
+            "num_candidates": len(results),
+            "results": results,
+            "cache": {
+                "entries": entries_cache,
+                "hull": "built" if hull_built else "hit",
+                "source_chemsys": "-".join(sorted(source)),
+            },
+            "timing": {
+                "fetch_seconds": round(fetch_seconds, 4),
+                "hull_seconds": round(record.hull_seconds, 4) if hull_built else 0.0,
+                "evaluation_seconds": round(time.perf_counter() - evaluate_start, 4),
+                "total_seconds": round(time.perf_counter() - start, 4),
+            },
+            "timestamp": datetime.now().isoformat()
+        }
 
-            return json.dumps(output, indent=2, default=str)
+        return encode_response(output, format)
 
     except Exception as e:
-        return json.dumps({
+        return encode_response({
             "status": "error",
             "chemsys": chemsys,
             "message": str(e),
             "timestamp": datetime.now().isoformat()
-        }, indent=2)
+        }, format)
 
 
 @mcp.tool
-def compare_materials(material_ids: str) -> str:
+@_offload
+def compare_materials(
+    material_ids: str,
+    fields: Optional[str] = None,
+    format: Optional[str] = None
+) -> str:
     """
     Compare multiple materials side by side.
 
     Args:
         material_ids: Comma-separated material IDs (e.g., "mp-149,mp-1234,mp-5678")
+        fields: Comma-separated output columns or summary fields to compare
+                instead of the default key properties
+        format: Response encoding - "json" (indented), "compact", "table"
+                (record lists as columns + rows) or "truncated" (compact,
+                size-capped). Default: the server's MP_RESPONSE_FORMAT
 
     Returns:
         JSON string with comparison table of key properties.
     """
     try:
         ids = [mid.strip() for mid in material_ids.split(",")]
+        columns = resolve_columns(fields) or COMPARISON_COLUMNS
 
-        with MPRester(API_KEY) as mpr:
-            docs = mpr.materials.summary.search(
-                material_ids=ids,
-                fields=SUMMARY_FIELDS
-            )
+        def compare() -> list:
+            docs = _cached_summary_search("compare_materials", {
+                "material_ids": ids,
+                "fields": fields_for_columns(columns)
+            })
+            # Key comparison fields in the requested order, None where absent
+            return process_material_docs(docs, columns).to_records(columns, fill=None)
 
-            comparison = []
-            for doc in docs:
-                processed = process_material_doc(doc)
-                # Extract key comparison fields
-                key_props = {
-                    "Material_ID": processed.get("Material_ID"),
-                    "Formula": processed.get("Formula"),
-                    "Band_Gap_eV": processed.get("Band_Gap_eV"),
-                    "Is_Metal": processed.get("Is_Metal"),
-                    "Formation_Energy_eV_Atom": processed.get("Formation_Energy_eV_Atom"),
-                    "Energy_Above_Hull_eV_Atom": processed.get("Energy_Above_Hull_eV_Atom"),
-                    "Is_Stable": processed.get("Is_Stable"),
-                    "Density_g_cm3": processed.get("Density_g_cm3"),
-                    "Volume_A3": processed.get("Volume_A3"),
-                    "N_Sites": processed.get("N_Sites"),
-                    "Is_Magnetic": processed.get("Is_Magnetic"),
-                    "Total_Magnetization": processed.get("Total_Magnetization"),
-                    "Bulk_Modulus_VRH_GPa": processed.get("Bulk_Modulus_VRH_GPa"),
-                    "Shear_Modulus_VRH_GPa": processed.get("Shear_Modulus_VRH_GPa"),
-                    "Space_Group_Symbol": processed.get("Space_Group_Symbol"),
-                    "Crystal_System": processed.get("Crystal_System"),
-                }
-                comparison.append(key_props)
+        # Identical concurrent comparisons share the processed records, not just the documents
+        comparison, _ = _single_flight.do("comparison", (tuple(ids), tuple(columns)), compare)
 
-            output = {
-                "status": "success",
-                "num_materials": len(comparison),
-                "comparison": comparison,
-                "timestamp": datetime.now().isoformat()
-            }
+        output = {
+            "status": "success",
+            "num_materials": len(comparison),
+            "comparison": comparison,
+            "timestamp": datetime.now().isoformat()
+        }
 
-            return json.dumps(output, indent=2, default=str)
+        return encode_response(output, format)
 
     except Exception as e:
-        return json.dumps({
+        return encode_response({
             "status": "error",
             "message": str(e),
             "timestamp": datetime.now().isoformat()
-        }, indent=2)
+        }, format)
+
 
+# Excel sheets hold at most 16384 columns, one of which is the property column
+EXCEL_MAX_MATERIALS = 16383
 
-def _style_excel_workbook(ws, df: pd.DataFrame):
-    """Apply professional styling to Excel worksheet"""
-    header_fill = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid")
-    header_font = Font(bold=True, size=11, color="000000")
-    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    cell_alignment = Alignment(horizontal="left", vertical="top", wrap_text=True)
 
-    thin_border = Border(
-        left=Side(style='thin', color='B4B4B4'),
-        right=Side(style='thin', color='B4B4B4'),
-        top=Side(style='thin', color='B4B4B4'),
-        bottom=Side(style='thin', color='B4B4B4')
+def _comparison_styles() -> list:
+    """Named styles of the comparison sheet, shared by all of its cells"""
+    Alignment, Border, Font, NamedStyle, PatternFill, Side = (
+        _lazy_import("openpyxl.styles", name)
+        for name in ("Alignment", "Border", "Font", "NamedStyle", "PatternFill", "Side")
     )
 
-    # Style header row
-    for cell in ws[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-        cell.border = thin_border
+    side = Side(style='thin', color='000000')
+    border = Border(left=side, right=side, top=side, bottom=side)
+    return [
+        NamedStyle(
+            name="comparison_header",
+            fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+            font=Font(bold=True, color="FFFFFF", size=12),
+            alignment=Alignment(horizontal="center", vertical="center", wrap_text=True),
+            border=border,
+        ),
+        NamedStyle(
+            name="comparison_property",
+            fill=PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid"),
+            font=Font(bold=True, size=11),
+            alignment=Alignment(horizontal="left", vertical="center"),
+            border=border,
+        ),
+        NamedStyle(
+            name="comparison_value",
+            alignment=Alignment(horizontal="center", vertical="center", wrap_text=True),
+            border=border,
+        ),
+    ]
 
-    # Style data cells
-    for row in ws.iter_rows(min_row=2, max_row=ws.max_row, min_col=1, max_col=ws.max_column):
-        for cell in row:
-            cell.alignment = cell_alignment
-            cell.border = thin_border
 
-    # Column width settings
-    wide_columns = ['Full_Properties', 'Structure_Details', 'Has_Properties', 'Decomposes_To']
+def _format_excel_value(value: Any) -> str:
+    """Cell text of a material property; numbers to 4 significant digits"""
+    # Convert to string first to avoid MPID comparison issues
+    if value is None or value is _SKIP:
+        return 'N/A'
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        # Nested data (Full_Properties); Excel caps cells at 32767 characters
+        return json.dumps(value, default=str)[:32767]
+    str_value = str(value)
+    if str_value == '' or str_value == 'None':
+        return 'N/A'
+    return str_value
+
+
+def _create_comparison_excel(
+    materials_data: MaterialTable,
+    output_path: str,
+    columns: Optional[List[str]] = None
+):
+    """
+    Create horizontal comparison Excel format for multiple materials.
 
-    for col_idx, col_name in enumerate(df.columns, 1):
-        col_letter = get_column_letter(col_idx)
+    The sheet is streamed with a write-only workbook: each property row is
+    formatted from one table column and written out immediately, and all
+    cells refer to three shared named styles.
+    """
+    if not len(materials_data):
+        return
+    if len(materials_data) > EXCEL_MAX_MATERIALS:
+        raise ValueError(
+            f"Cannot export {len(materials_data)} materials side by side; "
+            f"Excel sheets fit at most {EXCEL_MAX_MATERIALS}"
+        )
 
-        if any(wc.lower() in col_name.lower() for wc in wide_columns):
-            ws.column_dimensions[col_letter].width = 70
-        else:
-            max_length = len(str(col_name))
-            for cell in ws[col_letter][1:ws.max_row]:
-                if cell.value:
-                    cell_len = len(str(cell.value).split('\n')[0])
-                    max_length = max(max_length, min(cell_len, 50))
-            ws.column_dimensions[col_letter].width = min(max(max_length + 2, 12), 50)
-
-    # Enable filter and freeze panes
-    ws.auto_filter.ref = ws.dimensions
+    Workbook = _lazy_import("openpyxl", "Workbook")
+    WriteOnlyCell = _lazy_import("openpyxl.cell", "WriteOnlyCell")
+    get_column_letter = _lazy_import("openpyxl.utils", "get_column_letter")
+
+    # Key properties to include in comparison (prioritize most important fields)
+    properties = columns or EXCEL_COMPARISON_COLUMNS
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Materials Comparison")
+    for style in _comparison_styles():
+        wb.add_named_style(style)
+
+    def styled(value: Any, style: str) -> Any:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+
+    # Header texts (material names); their column widths are set in the same pass,
+    # since a streamed sheet needs its column layout before the first row
+    header = [styled("Property", "comparison_header")]
+    ws.column_dimensions['A'].width = 30  # Property column
+    formulas = materials_data.column('Formula')
+    material_ids = materials_data.column('Material_ID')
+    for col_idx, (formula, mat_id) in enumerate(zip(formulas, material_ids), start=2):
+        formula = 'N/A' if formula is _SKIP else formula
+        mat_id = 'N/A' if mat_id is _SKIP else mat_id
+        header_text = f"{formula} ({mat_id})"
+        header.append(styled(header_text, "comparison_header"))
+        # Material columns: 25 wide unless the header needs more
+        ws.column_dimensions[get_column_letter(col_idx)].width = min(max(len(header_text) + 2, 25), 50)
+
+    # Row heights: 30 for the header row, 25 for property rows
+    ws.sheet_format.defaultRowHeight = 25
+    ws.sheet_format.customHeight = True
+    ws.row_dimensions[1].height = 30
     ws.freeze_panes = 'B2'
 
+    ws.append(header)
+    for prop in properties:
+        row = [styled(prop, "comparison_property")]
+        row.extend(styled(_format_excel_value(value), "comparison_value")
+                   for value in materials_data.column(prop))
+        ws.append(row)
 
-def _create_comparison_excel(materials_data: List[dict], output_path: str):
-    """Create horizontal comparison Excel format for multiple materials"""
-    if not materials_data:
-        return
+    wb.save(output_path)
 
-    # Define key properties to include in comparison (prioritize most important fields)
-    properties = [
-        ('Material_ID', 'Material_ID'),
-        ('Formula', 'Formula'),
-        ('Band_Gap_eV', 'Band_Gap_eV'),
-        ('Energy_Above_Hull_eV_Atom', 'Energy_Above_Hull_eV_Atom'),
-        ('Is_Stable', 'Is_Stable'),
-        ('Is_Metal', 'Is_Metal'),
-        ('Is_Magnetic', 'Is_Magnetic'),
-        ('Formation_Energy_eV_Atom', 'Formation_Energy_eV_Atom'),
-        ('Density_g_cm3', 'Density_g_cm3'),
-        ('Volume_A3', 'Volume_A3'),
-        ('N_Sites', 'N_Sites'),
-        ('N_Elements', 'N_Elements'),
-        ('Elements', 'Elements'),
-        ('Space_Group_Symbol', 'Space_Group_Symbol'),
-        ('Space_Group_Number', 'Space_Group_Number'),
-        ('Crystal_System', 'Crystal_System'),
-        ('Point_Group', 'Point_Group'),
-        ('CBM_eV', 'CBM_eV'),
-        ('VBM_eV', 'VBM_eV'),
-        ('Fermi_Energy_eV', 'Fermi_Energy_eV'),
-        ('Is_Gap_Direct', 'Is_Gap_Direct'),
-        ('Total_Magnetization', 'Total_Magnetization'),
-        ('Magnetic_Ordering', 'Magnetic_Ordering'),
-        ('Bulk_Modulus_VRH_GPa', 'Bulk_Modulus_VRH_GPa'),
-        ('Shear_Modulus_VRH_GPa', 'Shear_Modulus_VRH_GPa'),
-        ('Poisson_Ratio', 'Poisson_Ratio'),
-        ('Dielectric_Total', 'Dielectric_Total'),
-        ('Refractive_Index_n', 'Refractive_Index_n'),
-        ('Surface_Energy_J_m2', 'Surface_Energy_J_m2'),
-        ('Work_Function_eV', 'Work_Function_eV'),
-    ]
 
-    # Create workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Materials Comparison"
+class _TableExport:
+    """
+    Streams MaterialTables into a file one chunk at a time. Subclasses write
+    typed columns, with None for missing values.
+    """
 
-    # Define styles
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=12)
-    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    extension = ""
 
-    property_fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
-    property_font = Font(bold=True, size=11)
-    property_alignment = Alignment(horizontal="left", vertical="center")
+    def __init__(self, path: str, specs: List[ColumnSpec]):
+        self.path = path
+        self.specs = specs
+        self.rows = 0
 
-    data_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    def write(self, table: MaterialTable):
+        self._write(table)
+        self.rows += len(table)
 
-    border = Border(
-        left=Side(style='thin', color='000000'),
-        right=Side(style='thin', color='000000'),
-        top=Side(style='thin', color='000000'),
-        bottom=Side(style='thin', color='000000')
-    )
+    def _write(self, table: MaterialTable):
+        raise NotImplementedError
 
-    # Write header row (material names)
-    ws.cell(1, 1, "Property").fill = header_fill
-    ws.cell(1, 1).font = header_font
-    ws.cell(1, 1).alignment = header_alignment
-    ws.cell(1, 1).border = border
+    def close(self):
+        pass
 
-    for col_idx, mat in enumerate(materials_data, start=2):
-        formula = mat.get('Formula', 'N/A')
-        mat_id = mat.get('Material_ID', 'N/A')
-        header_text = f"{formula} ({mat_id})"
-        cell = ws.cell(1, col_idx, header_text)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-        cell.border = border
-
-    # Write data rows
-    for row_idx, (prop_display, prop_key) in enumerate(properties, start=2):
-        # Property name in first column
-        cell = ws.cell(row_idx, 1, prop_display)
-        cell.fill = property_fill
-        cell.font = property_font
-        cell.alignment = property_alignment
-        cell.border = border
-
-        # Material values in subsequent columns
-        for col_idx, mat in enumerate(materials_data, start=2):
-            value = mat.get(prop_key, None)
-
-            # Format value - convert to string first to avoid MPID comparison issues
-            if value is None:
-                display_value = 'N/A'
-            elif isinstance(value, bool):
-                display_value = str(value)
-            elif isinstance(value, (int, float)):
-                if isinstance(value, float):
-                    display_value = f"{value:.4g}"
-                else:
-                    display_value = str(value)
-            else:
-                # Convert to string first
-                str_value = str(value)
-                if str_value == '' or str_value == 'None':
-                    display_value = 'N/A'
-                else:
-                    display_value = str_value
 
-            cell = ws.cell(row_idx, col_idx, display_value)
-            cell.alignment = data_alignment
-            cell.border = border
+class _ArrowExport(_TableExport):
+    """Shared by the Parquet and Arrow IPC writers (needs pyarrow)"""
 
-    # Set column widths
-    ws.column_dimensions['A'].width = 30  # Property column
-    for col_idx in range(2, len(materials_data) + 2):
-        col_letter = get_column_letter(col_idx)
-        ws.column_dimensions[col_letter].width = 25  # Material columns
+    _ARROW_TYPES = {"float": "float64", "int": "int64", "bool": "bool_", "string": "string", "json": "string"}
 
-    # Set row heights
-    ws.row_dimensions[1].height = 30  # Header row
-    for row_idx in range(2, len(properties) + 2):
-        ws.row_dimensions[row_idx].height = 25
+    def __init__(self, path: str, specs: List[ColumnSpec]):
+        super().__init__(path, specs)
+        try:
+            pa = _lazy_import("pyarrow")
+        except ImportError:
+            raise ValueError(
+                "Parquet and Feather export need pyarrow: pip install \"mcp-materials-project[export]\""
+            )
+        self._pa = pa
+        self.schema = pa.schema([(spec.name, getattr(pa, self._ARROW_TYPES[spec.kind])()) for spec in specs])
+        self._writer = self._open()
 
-    # Freeze panes
-    ws.freeze_panes = 'B2'
+    def _open(self):
+        raise NotImplementedError
 
-    # Save workbook
-    wb.save(output_path)
+    def _write(self, table: MaterialTable):
+        arrays = [self._pa.array(table.typed_column(spec.name), type=field.type)
+                  for spec, field in zip(self.specs, self.schema)]
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self._writer.close()
+
+
+class _ParquetExport(_ArrowExport):
+    extension = ".parquet"
+
+    def _open(self):
+        ParquetWriter = _lazy_import("pyarrow.parquet", "ParquetWriter")
+        return ParquetWriter(self.path, self.schema, compression="zstd")
+
+
+class _FeatherExport(_ArrowExport):
+    """Arrow IPC file format (Feather v2)"""
+    extension = ".feather"
+
+    def _open(self):
+        self._sink = self._pa.OSFile(self.path, "wb")
+        return self._pa.ipc.new_file(self._sink, self.schema, options=self._pa.ipc.IpcWriteOptions(compression="zstd"))
+
+    def close(self):
+        super().close()
+        self._sink.close()
+
+
+class _CsvGzExport(_TableExport):
+    extension = ".csv.gz"
+
+    def __init__(self, path: str, specs: List[ColumnSpec]):
+        super().__init__(path, specs)
+        self._file = gzip.open(path, "wt", newline="", encoding="utf-8")
+        self._csv = csv.writer(self._file)
+        self._csv.writerow([spec.name for spec in specs])
+
+    def _write(self, table: MaterialTable):
+        columns = [table.typed_column(spec.name) for spec in self.specs]
+        self._csv.writerows(['' if v is None else v for v in row] for row in zip(*columns))
+
+    def close(self):
+        self._file.close()
+
+
+class _JsonlExport(_TableExport):
+    extension = ".jsonl"
+
+    def __init__(self, path: str, specs: List[ColumnSpec]):
+        super().__init__(path, specs)
+        self._file = open(path, "w", encoding="utf-8")
+
+    def _write(self, table: MaterialTable):
+        names = [spec.name for spec in self.specs]
+        columns = [table.typed_column(name) for name in names]
+        for row in zip(*columns):
+            self._file.write(_dumps_compact(dict(zip(names, row))))
+            self._file.write("\n")
+
+    def close(self):
+        self._file.close()
+
+
+# File formats of export_materials
+EXPORT_FORMATS = {
+    "parquet": _ParquetExport,
+    "feather": _FeatherExport,
+    "csv": _CsvGzExport,
+    "jsonl": _JsonlExport,
+}
 
 
 @mcp.tool
+@_offload
 def export_to_excel(
     material_ids: Optional[str] = None,
     formula: Optional[str] = None,
@@ -905,7 +4917,9 @@ def export_to_excel(
     is_metal: Optional[bool] = None,
     is_magnetic: Optional[bool] = None,
     num_results: int = 10,
-    output_filename: Optional[str] = None
+    output_filename: Optional[str] = None,
+    detail_level: str = "standard",
+    format: Optional[str] = None
 ) -> str:
     """
     Export material data to Excel file with professional formatting.
@@ -922,11 +4936,18 @@ def export_to_excel(
         is_magnetic: Filter for magnetic materials
         num_results: Maximum number of results (default 10)
         output_filename: Custom output filename (without path, e.g., "my_materials.xlsx")
+        detail_level: "summary" (key properties only), "standard" (default
+                      comparison rows) or "full" (adds the raw document as JSON)
+        format: Response encoding - "json" (indented), "compact", "table"
+                (record lists as columns + rows) or "truncated" (compact,
+                size-capped). Default: the server's MP_RESPONSE_FORMAT
 
     Returns:
         JSON string with export status and file path
     """
     try:
+        columns = columns_for_detail_level(detail_level, standard_columns=EXCEL_COMPARISON_COLUMNS)
+
         # Fetch data using core function (not the MCP tool)
         result_data = _fetch_material_data_core(
             material_ids=material_ids,
@@ -938,20 +4959,22 @@ def export_to_excel(
             is_stable=is_stable,
             is_metal=is_metal,
             is_magnetic=is_magnetic,
-            num_results=num_results
+            num_results=num_results,
+            tool="export_to_excel",
+            columns=columns
         )
 
         if result_data.get("status") != "success":
-            return json.dumps(result_data, indent=2)
+            return encode_response(result_data, format)
 
-        materials_data = result_data.get("data", [])
+        materials_data = result_data["data"]
 
-        if not materials_data:
-            return json.dumps({
+        if not len(materials_data):
+            return encode_response({
                 "status": "error",
                 "message": "No materials found matching the criteria",
                 "timestamp": datetime.now().isoformat()
-            }, indent=2)
+            }, format)
 
         # Generate output path
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -978,28 +5001,199 @@ def export_to_excel(
             output_path = os.path.join(output_dir, filename)
 
         # Always use horizontal comparison format
-        _create_comparison_excel(materials_data, output_path)
+        _create_comparison_excel(materials_data, output_path, columns)
 
-        return json.dumps({
+        return encode_response({
             "status": "success",
             "message": f"Exported {len(materials_data)} materials to Excel",
             "file_path": output_path,
             "num_materials": len(materials_data),
             "format": "horizontal_comparison",
             "timestamp": datetime.now().isoformat()
-        }, indent=2)
+        }, format)
+
+    except Exception as e:
+        return encode_response({
+            "status": "error",
+            "message": str(e),
+            "timestamp": datetime.now().isoformat()
+        }, format)
+
+
+@mcp.tool
+@_offload
+def export_materials(
+    material_ids: Optional[str] = None,
+    formula: Optional[str] = None,
+    chemsys: Optional[str] = None,
+    elements: Optional[str] = None,
+    band_gap_min: Optional[float] = None,
+    band_gap_max: Optional[float] = None,
+    is_stable: Optional[bool] = None,
+    is_metal: Optional[bool] = None,
+    is_magnetic: Optional[bool] = None,
+    num_results: int = 100,
+    file_format: str = "parquet",
+    output_filename: Optional[str] = None,
+    fields: Optional[str] = None,
+    detail_level: str = "standard",
+    format: Optional[str] = None
+) -> str:
+    """
+    Export material data to a Parquet, Feather (Arrow IPC), gzip CSV or JSONL file.
+
+    Columns are typed (numbers stay numeric, missing values are null) and
+    rows are written page by page as they arrive, so large exports run in
+    bounded memory.
+
+    Args:
+        material_ids: Comma-separated material IDs (e.g., "mp-149,mp-1234")
+        formula: Chemical formula (e.g., "Si", "Fe2O3")
+        chemsys: Chemical system (e.g., "Li-Fe-O")
+        elements: Comma-separated elements to include (e.g., "Si,O")
+        band_gap_min: Minimum band gap in eV
+        band_gap_max: Maximum band gap in eV
+        is_stable: Filter for thermodynamically stable materials
+        is_metal: Filter for metallic materials
+        is_magnetic: Filter for magnetic materials
+        num_results: Maximum number of materials to export (default 100)
+        file_format: "parquet" (default), "feather", "csv" (gzip-compressed) or "jsonl"
+        output_filename: Custom output filename (without path); the extension is added if missing
+        fields: Comma-separated output columns or summary fields to export. Default: all
+        detail_level: "summary", "standard" (default) or "full" (adds the raw
+                      document as a JSON string column)
+        format: Response encoding - "json" (indented), "compact", "table"
+                (record lists as columns + rows) or "truncated" (compact,
+                size-capped). Default: the server's MP_RESPONSE_FORMAT
+
+    Returns:
+        JSON string with export status, file path and number of materials
+    """
+    tmp_path = None
+    try:
+        writer_class = EXPORT_FORMATS.get(file_format.lower())
+        if writer_class is None:
+            raise ValueError(f"Invalid file_format '{file_format}'. Valid options: {list(EXPORT_FORMATS)}")
+        columns = columns_for_detail_level(detail_level, fields)
+
+        search_params = _build_search_params(
+            material_ids, formula, chemsys, elements, band_gap_min, band_gap_max,
+            is_stable, is_metal, is_magnetic
+        )
+        search_params["fields"] = fields_for_columns(columns)
+
+        output_dir = os.path.join(os.getcwd(), "output")
+        os.makedirs(output_dir, exist_ok=True)
+        if output_filename:
+            filename = output_filename
+        else:
+            stem = material_ids.split(',')[0].strip() if material_ids else (formula or "materials_export")
+            filename = f"{stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        if not filename.endswith(writer_class.extension):
+            filename += writer_class.extension
+        output_path = os.path.join(output_dir, filename)
+
+        # Written under a temporary name so a failed export leaves no partial file
+        tmp_path = output_path + ".part"
+        writer = None
+        started = time.perf_counter()
+        try:
+            for table in _iter_search_tables("export_materials", search_params, columns, num_results):
+                if writer is None:
+                    writer = writer_class(tmp_path, table.specs)
+                writer.write(table)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if writer is None or writer.rows == 0:
+            return encode_response({
+                "status": "error",
+                "message": "No materials found matching the criteria",
+                "timestamp": datetime.now().isoformat()
+            }, format)
+
+        os.replace(tmp_path, output_path)
+        tmp_path = None
+
+        return encode_response({
+            "status": "success",
+            "message": f"Exported {writer.rows} materials to {file_format.lower()}",
+            "file_path": output_path,
+            "file_format": file_format.lower(),
+            "num_materials": writer.rows,
+            "columns": [spec.name for spec in writer.specs],
+            "file_bytes": os.path.getsize(output_path),
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+            "timestamp": datetime.now().isoformat()
+        }, format)
 
     except Exception as e:
-        return json.dumps({
+        return encode_response({
             "status": "error",
             "message": str(e),
             "timestamp": datetime.now().isoformat()
-        }, indent=2)
+        }, format)
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@mcp.tool
+@_offload
+def get_server_diagnostics(format: Optional[str] = None) -> str:
+    """
+    Report server health and performance counters.
+
+    Args:
+        format: Response encoding - "json" (indented), "compact", "table"
+                (record lists as columns + rows) or "truncated" (compact,
+                size-capped). Default: the server's MP_RESPONSE_FORMAT
+
+    Returns:
+        JSON string with per-key MPRester pool state and the API key
+        source, per-tool latency metrics (including the client setup time
+        saved by reusing pooled clients), summary cache hit/miss counters,
+        cached phase diagrams, worker queue depths, coalesced vs upstream
+        request counts, rate-limit queue wait vs upstream latency per
+        priority class, local index state and background pre-warm timings.
+    """
+    output = {
+        "status": "success",
+        "client_pools": _client_pools.snapshot(),
+        "cache": _summary_cache.snapshot(),
+        "phase_diagrams": _phase_diagram_cache.snapshot(),
+        "workers": _dispatcher.snapshot(),
+        "page_fetchers": _page_fetcher.snapshot(),
+        "analysis_processes": _analysis_pool.snapshot(),
+        "prewarm": _prewarmer.snapshot(),
+        "coalescing": _single_flight.snapshot(),
+        "scheduler": _scheduler.snapshot(),
+        "local_index": _local_index.snapshot(),
+        "tools": _tool_metrics.snapshot(_client_pools.average_setup_seconds()),
+        "timestamp": datetime.now().isoformat()
+    }
+    return encode_response(output, format)
 
 
 def main():
-    """Entry point for the MCP server."""
-    mcp.run()
+    """
+    Entry point for the MCP server. `mcp-materials-project sync-index [--full]`
+    refreshes the local materials index instead of serving.
+    """
+    if sys.argv[1:2] == ["sync-index"]:
+        try:
+            print(json.dumps(_local_index.sync(full="--full" in sys.argv[2:]), indent=2))
+        finally:
+            _client_pools.close()
+        return
+    try:
+        mcp.run()
+    finally:
+        _dispatcher.shutdown()
+        _page_fetcher.shutdown()
+        _analysis_pool.shutdown()
+        _client_pools.close()
 
 
 if __name__ == "__main__":
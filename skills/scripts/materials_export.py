@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Materials Export CLI - Export materials data to Excel
+Materials Export CLI - Export materials data to Excel, Parquet, Feather, CSV or JSONL
 Usage: python materials_export.py [options]
 """
 
@@ -245,8 +245,45 @@ def style_excel_workbook(ws, df):
     ws.freeze_panes = 'B2'
 
 
+# File extension of each --format
+EXPORT_EXTENSIONS = {
+    "xlsx": ".xlsx",
+    "parquet": ".parquet",
+    "feather": ".feather",
+    "csv": ".csv.gz",
+    "jsonl": ".jsonl",
+}
+
+
+def typed_dataframe(materials_data):
+    """DataFrame with numeric and boolean columns typed and empty values as nulls"""
+    df = pd.DataFrame(materials_data).replace({'': None})
+    for col in df.columns:
+        values = df[col].dropna()
+        if len(values) and all(isinstance(v, bool) for v in values):
+            df[col] = df[col].astype("boolean")
+        elif len(values) and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            df[col] = pd.to_numeric(df[col])
+        else:
+            df[col] = df[col].astype("string")
+    return df
+
+
+def write_table_export(materials_data, output_path, fmt):
+    """Write materials as a typed table (Parquet/Feather need pyarrow)"""
+    df = typed_dataframe(materials_data)
+    if fmt == "parquet":
+        df.to_parquet(output_path, index=False, compression="zstd")
+    elif fmt == "feather":
+        df.to_feather(output_path, compression="zstd")
+    elif fmt == "csv":
+        df.to_csv(output_path, index=False, compression="gzip")
+    elif fmt == "jsonl":
+        df.to_json(output_path, orient="records", lines=True)
+
+
 def export_materials(args):
-    """Export materials to Excel"""
+    """Export materials to Excel or a table file format"""
     api_key = os.environ.get("MP_API_KEY")
     if not api_key:
         return {
@@ -311,21 +348,31 @@ def export_materials(args):
             output_dir = Path(args.output_dir)
             output_dir.mkdir(parents=True, exist_ok=True)
 
+            ext = EXPORT_EXTENSIONS[args.format]
             if args.output:
-                filename = args.output if args.output.endswith('.xlsx') else f"{args.output}.xlsx"
+                filename = args.output if args.output.endswith(ext) else f"{args.output}{ext}"
             elif args.material_ids:
                 # Use first material ID for filename when comparing multiple
                 first_id = args.material_ids.split(",")[0].strip()
-                filename = f"{first_id}_comparison_{timestamp}.xlsx"
+                filename = f"{first_id}_comparison_{timestamp}{ext}"
             elif args.material_id:
-                filename = f"{args.material_id}_{timestamp}.xlsx"
+                filename = f"{args.material_id}_{timestamp}{ext}"
             elif args.formula:
-                filename = f"{args.formula}_{timestamp}.xlsx"
+                filename = f"{args.formula}_{timestamp}{ext}"
             else:
-                filename = f"materials_export_{timestamp}.xlsx"
+                filename = f"materials_export_{timestamp}{ext}"
 
             output_path = output_dir / filename
 
+            if args.format != "xlsx":
+                write_table_export(materials_data, output_path, args.format)
+                return {
+                    "status": "success",
+                    "file_path": str(output_path),
+                    "num_materials": len(materials_data),
+                    "timestamp": datetime.now().isoformat()
+                }
+
             # Check if this is a comparison (multiple materials with --material-ids)
             use_comparison_format = args.material_ids and len(materials_data) >= 2
 
@@ -375,7 +422,7 @@ def export_materials(args):
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Export Materials Project data to Excel",
+        description="Export Materials Project data to Excel, Parquet, Feather, CSV or JSONL",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
@@ -390,6 +437,9 @@ Examples:
 
   # Export magnetic materials
   python materials_export.py --elements Fe,O --magnetic --output magnetic_materials.xlsx
+
+  # Export a large screen to Parquet for pandas/polars (needs pyarrow)
+  python materials_export.py --band-gap-min 1.0 --stable --limit 5000 --format parquet
         """
     )
 
@@ -406,6 +456,8 @@ Examples:
     parser.add_argument("--limit", type=int, default=10, help="Maximum results (default: 10)")
     parser.add_argument("--output", "-o", help="Output filename (without path)")
     parser.add_argument("--output-dir", default="./output", help="Output directory (default: ./output)")
+    parser.add_argument("--format", choices=list(EXPORT_EXTENSIONS), default="xlsx",
+                        help="Output format: xlsx (default), parquet, feather, csv (gzip) or jsonl")
 
     args = parser.parse_args()
 